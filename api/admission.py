@@ -0,0 +1,87 @@
+"""
+Contrôle d'admission de POST /chat : au plus max_in_flight requêtes en cours, les suivantes
+attendent dans une file bornée (max_queue) au plus max_wait_s ; au-delà, rejet immédiat
+(503 + Retry-After) plutôt qu'un empilement de timeouts sur Mistral pour tout le monde.
+Exécuté dans la boucle asyncio (middleware), avant le threadpool : une requête en file
+n'occupe pas de thread. Ordre d'arrivée respecté (FIFO), slot transmis directement.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+
+
+class AdmissionController:
+    """Sémaphore FIFO borné : acquire() retourne None (admis) ou la raison du rejet."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        max_wait_s: float,
+        on_change: Callable[[AdmissionController], None] | None = None,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        # Appelé à chaque changement de in_flight / queue_depth (jauges Prometheus)
+        self._on_change = on_change
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    async def acquire(self) -> str | None:
+        """None si admis (appeler release() ensuite) ; "queue_full" ou "timeout" si rejeté."""
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            self.in_flight += 1
+            self._changed()
+            return None
+        if self.queue_depth >= self.max_queue:
+            return "queue_full"
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._changed()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait_s)
+            return None
+        except asyncio.TimeoutError:
+            # Slot transmis au moment même du timeout (wait_for sur asyncio.timeout, Python >= 3.12)
+            self._release_if_granted(waiter)
+            return "timeout"
+        except asyncio.CancelledError:
+            # Client parti : rendre le slot s'il venait d'être transmis
+            self._release_if_granted(waiter)
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                self._remove(waiter)
+            self._changed()
+
+    def release(self) -> None:
+        """Libère un slot : transmis au plus ancien en attente, sinon rendu."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._changed()
+                return
+        self.in_flight -= 1
+        self._changed()
+
+    def _release_if_granted(self, waiter: asyncio.Future[None]) -> None:
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def _remove(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
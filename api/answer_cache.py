@@ -0,0 +1,205 @@
+"""
+Cache de réponses ChatResponse : correspondance exacte sur la question normalisée,
+puis quasi-doublons par similarité vectorielle dans une collection Qdrant dédiée.
+Les entrées sont scopées par collection indexée, rag_version et génération d'index
+(invalidation à chaque ingestion) : une même collection de cache sert plusieurs workspaces.
+L'existence de la collection de cache est vérifiée une fois puis mémorisée (pas d'aller-retour
+Qdrant supplémentaire par requête) ; elle n'est revérifiée qu'après l'échec d'une opération.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+import unicodedata
+import uuid
+from datetime import datetime, timezone
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+from shared.config import AnswerCacheSettings
+from shared.index_generation import read_index_generation
+from shared.schemas import ChatResponse
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Forme canonique : NFKC, minuscules, espaces réduits, ponctuation finale retirée."""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return text.rstrip(" ?!.…").strip()
+
+
+class AnswerCache:
+    """Cache partagé entre instances (stocké dans Qdrant), invalidé par génération d'index."""
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        index_collection: str,
+        settings: AnswerCacheSettings,
+    ) -> None:
+        self._client = client
+        self._index_collection = index_collection
+        self._settings = settings
+        self._generation: int | None = None
+        self._generation_read_at = 0.0
+        # Existence de la collection de cache (None : pas encore vérifiée)
+        self._exists: bool | None = None
+
+    @property
+    def collection_name(self) -> str:
+        return self._settings.collection_name
+
+    def current_generation(self) -> int:
+        """Génération d'index courante (relue au plus toutes les generation_refresh_s secondes)."""
+        now = time.monotonic()
+        stale = now - self._generation_read_at >= self._settings.generation_refresh_s
+        if self._generation is None or stale:
+            generation = read_index_generation(self._client, self._index_collection)
+            if self._generation is not None and generation != self._generation:
+                self._purge_other_generations(generation)
+            self._generation = generation
+            self._generation_read_at = now
+        return self._generation
+
+    def _has_collection(self) -> bool:
+        """
+        Vérifiée au premier appel puis mémorisée. Absente : les lookups ratent jusqu'au premier
+        put de cette instance, qui la crée (ou la trouve créée par une autre instance).
+        """
+        if self._exists is None:
+            self._exists = self._client.collection_exists(self.collection_name)
+        return self._exists
+
+    def _collection_lost(self) -> bool:
+        """Après l'échec d'une opération : revérifie l'existence (supprimée entre-temps ?)."""
+        self._exists = self._client.collection_exists(self.collection_name)
+        return not self._exists
+
+    def _point_id(self, normalized: str, rag_version: str, generation: int) -> str:
+        key = f"{self._index_collection}|{rag_version}|{generation}|{normalized}"
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+
+    def _collection_condition(self) -> qm.FieldCondition:
+        return qm.FieldCondition(
+            key="index_collection", match=qm.MatchValue(value=self._index_collection)
+        )
+
+    def _scope_filter(self, rag_version: str, generation: int) -> qm.Filter:
+        return qm.Filter(
+            must=[
+                self._collection_condition(),
+                qm.FieldCondition(key="rag_version", match=qm.MatchValue(value=rag_version)),
+                qm.FieldCondition(key="index_generation", match=qm.MatchValue(value=generation)),
+            ]
+        )
+
+    def get_exact(self, question: str, rag_version: str) -> ChatResponse | None:
+        """Lookup O(1) par ID déterministe (pas d'embedding nécessaire)."""
+        if not self._has_collection():
+            return None
+        generation = self.current_generation()
+        point_id = self._point_id(normalize_question(question), rag_version, generation)
+        try:
+            records = self._client.retrieve(
+                collection_name=self.collection_name, ids=[point_id], with_payload=True
+            )
+        except (UnexpectedResponse, ValueError):
+            if self._collection_lost():
+                return None
+            raise
+        if not records:
+            return None
+        return ChatResponse.model_validate(records[0].payload["response"])
+
+    def get_similar(self, query_vector: list[float], rag_version: str) -> ChatResponse | None:
+        """Quasi-doublon : plus proche voisin au-dessus du seuil de similarité, même scope."""
+        if not self._has_collection():
+            return None
+        generation = self.current_generation()
+        try:
+            points = self._client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                query_filter=self._scope_filter(rag_version, generation),
+                limit=1,
+                score_threshold=self._settings.similarity_threshold,
+                with_payload=True,
+            ).points
+        except (UnexpectedResponse, ValueError):
+            if self._collection_lost():
+                return None
+            raise
+        if not points:
+            return None
+        return ChatResponse.model_validate(points[0].payload["response"])
+
+    def put(self, question: str, query_vector: list[float], response: ChatResponse) -> None:
+        self._ensure_collection(len(query_vector))
+        generation = self.current_generation()
+        normalized = normalize_question(question)
+        point = qm.PointStruct(
+            id=self._point_id(normalized, response.rag_version, generation),
+            vector=query_vector,
+            payload={
+                "question_norm": normalized,
+                "index_collection": self._index_collection,
+                "rag_version": response.rag_version,
+                "index_generation": generation,
+                "response": response.model_dump(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+        try:
+            self._client.upsert(collection_name=self.collection_name, points=[point])
+        except (UnexpectedResponse, ValueError):
+            if not self._collection_lost():
+                raise
+            # Collection supprimée depuis la vérification mémorisée : recréée
+            self._ensure_collection(len(query_vector))
+            self._client.upsert(collection_name=self.collection_name, points=[point])
+
+    def _ensure_collection(self, vector_size: int) -> None:
+        if self._exists or self._client.collection_exists(self.collection_name):
+            self._exists = True
+            return
+        self._client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=qm.VectorParams(size=vector_size, distance=qm.Distance.COSINE),
+        )
+        self._client.create_payload_index(
+            self.collection_name, "index_collection", qm.PayloadSchemaType.KEYWORD
+        )
+        self._client.create_payload_index(
+            self.collection_name, "rag_version", qm.PayloadSchemaType.KEYWORD
+        )
+        self._client.create_payload_index(
+            self.collection_name, "index_generation", qm.PayloadSchemaType.INTEGER
+        )
+        self._exists = True
+        logger.info("Collection cache créée : %s (size=%s)", self.collection_name, vector_size)
+
+    def _purge_other_generations(self, generation: int) -> None:
+        """Supprime les entrées des générations précédentes (index réingéré) de cette collection."""
+        if not self._has_collection():
+            return
+        self._client.delete(
+            collection_name=self.collection_name,
+            points_selector=qm.FilterSelector(
+                filter=qm.Filter(
+                    must=[self._collection_condition()],
+                    must_not=[
+                        qm.FieldCondition(
+                            key="index_generation", match=qm.MatchValue(value=generation)
+                        )
+                    ]
+                )
+            ),
+        )
+        logger.info("Cache de réponses invalidé (génération d'index=%s)", generation)
@@ -0,0 +1,92 @@
+"""
+Registre des chaînes RAG par collection (multi-workspace) : cache LRU borné avec éviction
+des chaînes inactives. Les chaînes sont construites à la demande par une fabrique qui
+partage les clients (Qdrant, Cohere, Mistral) : une entrée ne coûte qu'un vectorstore.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from api.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class UnknownCollectionError(LookupError):
+    """Collection absente de la liste des collections servables, ou de Qdrant."""
+
+
+class ChainRegistry(Generic[T]):
+    """
+    LRU thread-safe clé → chaîne. get() construit à la demande (une seule construction
+    par clé même sous requêtes concurrentes), évince au-delà de max_size et après idle_ttl_s
+    sans utilisation.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], T],
+        max_size: int,
+        idle_ttl_s: float | None = None,
+        allowed: set[str] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._factory = factory
+        self._max_size = max_size
+        self._idle_ttl_s = idle_ttl_s
+        self._allowed = allowed
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[T, float]] = OrderedDict()
+        self._builds: SingleFlight[T] = SingleFlight()
+
+    def get(self, key: str) -> tuple[T, bool]:
+        """Retourne (chaîne, hit) ; hit=False si la chaîne vient d'être construite."""
+        if self._allowed is not None and key not in self._allowed:
+            raise UnknownCollectionError(key)
+        now = self._clock()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], now)
+                self._entries.move_to_end(key)
+                return entry[0], True
+        chain, _ = self._builds.do(key, lambda: self._build(key))
+        return chain, False
+
+    def _build(self, key: str) -> T:
+        start = time.perf_counter()
+        chain = self._factory(key)
+        with self._lock:
+            self._entries[key] = (chain, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.info("chain_registry evicted=%s reason=lru", evicted)
+        logger.info("chain_registry built=%s ms=%.0f", key, (time.perf_counter() - start) * 1000)
+        return chain
+
+    def _evict_idle(self, now: float) -> None:
+        if self._idle_ttl_s is None:
+            return
+        idle = [k for k, (_, used_at) in self._entries.items() if now - used_at > self._idle_ttl_s]
+        for key in idle:
+            del self._entries[key]
+            logger.info("chain_registry evicted=%s reason=idle", key)
+
+    def keys(self) -> list[str]:
+        """Clés en cache, de la moins à la plus récemment utilisée."""
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,91 @@
+"""
+Assemblage du contexte du prompt sous budget de tokens.
+Les chunks sont regroupés par page (pages dans l'ordre de pertinence), triés par chunk_index,
+le chevauchement entre chunks adjacents (chunk_overlap du splitter) est retiré et
+chaque page n'a qu'un seul en-tête [Source: titre]. Sans chevauchement réel, les chunks sont
+séparés par une ligne vide.
+"""
+from __future__ import annotations
+
+from langchain_core.documents import Document
+
+# Estimation sans tokenizer Mistral : ~4 caractères par token (texte FR/EN)
+CHARS_PER_TOKEN = 4
+_GAP = "\n[…]\n"
+_PAGE_SEPARATOR = "\n\n---\n\n"
+_PARAGRAPH = "\n\n"
+# En dessous (~3 mots), une fin/début identique est une coïncidence, pas l'overlap du splitter
+MIN_OVERLAP_CHARS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def strip_overlap(previous: str, current: str, max_overlap: int) -> str:
+    """
+    Retire de current le plus long préfixe (entre MIN_OVERLAP_CHARS et max_overlap) qui termine
+    previous ; sans tel chevauchement, current est précédé d'une ligne vide.
+    """
+    for size in range(min(max_overlap, len(previous), len(current)), MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(current[:size]):
+            return current[size:]
+    return _PARAGRAPH + current
+
+
+def _group_by_page(docs: list[Document]) -> list[list[Document]]:
+    """Groupes par page_id dans l'ordre du meilleur rang, chunks triés par chunk_index."""
+    pages: dict[str, list[Document]] = {}
+    for d in docs:
+        pages.setdefault(d.metadata.get("page_id", ""), []).append(d)
+    return [
+        sorted(chunks, key=lambda d: d.metadata.get("chunk_index", 0)) for chunks in pages.values()
+    ]
+
+
+def _merge_page(chunks: list[Document], max_overlap: int) -> list[tuple[str, Document]]:
+    """Segments de texte d'une page : chunks adjacents fusionnés sans chevauchement."""
+    segments: list[tuple[str, Document]] = []
+    previous: Document | None = None
+    for chunk in chunks:
+        text = chunk.page_content
+        if previous is not None:
+            index = chunk.metadata.get("chunk_index", 0)
+            if index == previous.metadata.get("chunk_index", 0) + 1:
+                text = strip_overlap(previous.page_content, text, max_overlap)
+            else:
+                text = _GAP + text
+        segments.append((text, chunk))
+        previous = chunk
+    return segments
+
+
+def pack_context(
+    docs: list[Document], max_tokens: int, max_overlap: int
+) -> tuple[str, list[Document]]:
+    """
+    Contexte compact sous budget de tokens.
+    Retourne (contexte, documents effectivement inclus) ; le premier chunk est toujours inclus
+    (tronqué si nécessaire) pour ne pas produire un contexte vide.
+    """
+    remaining = max_tokens * CHARS_PER_TOKEN
+    blocks: list[str] = []
+    used: list[Document] = []
+    for chunks in _group_by_page(docs):
+        header = f"[Source: {chunks[0].metadata.get('title', 'Sans titre')}]\n"
+        separator = _PAGE_SEPARATOR if blocks else ""
+        body = ""
+        for text, chunk in _merge_page(chunks, max_overlap):
+            if len(separator) + len(header) + len(body) + len(text) > remaining:
+                if not used:
+                    body = text[: max(0, remaining - len(header))]
+                    used.append(chunk)
+                # La suite de la page ne serait plus contiguë : page suivante
+                break
+            body += text
+            used.append(chunk)
+        if body:
+            block = separator + header + body
+            blocks.append(block)
+            remaining -= len(block)
+    return "".join(blocks), used
@@ -0,0 +1,64 @@
+"""
+Budgets de latence : deadline globale par requête + budget par étape (rerank, LLM).
+Une étape qui dépasse son budget lève StageTimeout ; l'appelant choisit la dégradation.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TypeVar
+
+from api.profiling import profile_in_thread
+
+T = TypeVar("T")
+
+# Les appels réseau synchrones (Cohere, Mistral) ne sont pas annulables : l'étape
+# abandonnée termine en arrière-plan dans ce pool, la requête, elle, repart tout de suite.
+_stage_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="rag-stage")
+
+
+class StageTimeout(Exception):
+    """Étape abandonnée car son budget (ou la deadline globale) est dépassé."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"stage {stage} exceeded its latency budget")
+        self.stage = stage
+
+
+class Deadline:
+    """Deadline d'une requête ; total_ms=None désactive le budget global."""
+
+    def __init__(self, total_ms: int | None) -> None:
+        self._expires_at = None if total_ms is None else time.monotonic() + total_ms / 1000
+
+    def remaining_s(self) -> float | None:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining_s()
+        return remaining is not None and remaining <= 0
+
+    def stage_timeout_s(self, stage_budget_ms: int | None) -> float | None:
+        """Timeout effectif d'une étape : min(budget de l'étape, temps restant global)."""
+        candidates = [self.remaining_s()]
+        if stage_budget_ms is not None:
+            candidates.append(stage_budget_ms / 1000)
+        candidates = [t for t in candidates if t is not None]
+        return min(candidates) if candidates else None
+
+    def run(self, stage: str, stage_budget_ms: int | None, fn: Callable[[], T]) -> T:
+        """Exécute fn dans le budget de l'étape ; lève StageTimeout sinon."""
+        timeout = self.stage_timeout_s(stage_budget_ms)
+        if timeout is None:
+            return fn()
+        if timeout <= 0:
+            raise StageTimeout(stage)
+        future = _stage_executor.submit(profile_in_thread(fn))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise StageTimeout(stage) from None
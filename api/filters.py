@@ -0,0 +1,41 @@
+"""
+Filtres de retrieval : ChatFilters → filtre payload Qdrant.
+Les métadonnées des chunks sont stockées sous la clé "metadata" du payload (QdrantVectorStore).
+"""
+from __future__ import annotations
+
+from qdrant_client.http import models as qm
+
+from shared.page_index import page_match
+from shared.schemas import ChatFilters
+
+METADATA_PREFIX = "metadata."
+
+
+def to_qdrant_filter(filters: ChatFilters | None) -> qm.Filter | None:
+    """Filtre Qdrant équivalent (None si aucun critère)."""
+    if filters is None:
+        return None
+    must: list[qm.Condition] = []
+    if filters.subtree_root_id:
+        root = filters.subtree_root_id
+        must.append(
+            qm.Filter(
+                should=[
+                    page_match([root]),
+                    qm.FieldCondition(
+                        key=f"{METADATA_PREFIX}ancestor_ids", match=qm.MatchAny(any=[root])
+                    ),
+                ]
+            )
+        )
+    if filters.page_ids:
+        must.append(page_match(filters.page_ids))
+    if filters.edited_after or filters.edited_before:
+        must.append(
+            qm.FieldCondition(
+                key=f"{METADATA_PREFIX}last_edited_time",
+                range=qm.DatetimeRange(gte=filters.edited_after, lte=filters.edited_before),
+            )
+        )
+    return qm.Filter(must=must) if must else None
@@ -0,0 +1,104 @@
+"""
+Routage LLM par requête : modèle rapide (MISTRAL_FAST_MODEL, plafond de sortie réduit) pour les
+questions simples (question courte, contexte empaqueté réduit) ou quand la latence observée du
+modèle principal (EWMA) dépasse le budget LLM restant ; modèle principal sinon.
+Si le modèle principal échoue ou dépasse son budget, repli sur le modèle rapide dans le temps
+restant de la deadline de la requête (RAG_BUDGET_TOTAL_MS), avant la réponse extractive.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+PRIMARY = "primary"
+FAST = "fast"
+
+
+class ModelRoute:
+    """Un modèle Mistral configuré (client LangChain déjà borné à max_tokens)."""
+
+    __slots__ = ("name", "model", "llm", "max_tokens")
+
+    def __init__(self, name: str, model: str, llm: Any, max_tokens: int) -> None:
+        self.name = name
+        self.model = model
+        self.llm = llm
+        self.max_tokens = max_tokens
+
+
+class LatencyEWMA:
+    """Moyenne mobile exponentielle des latences d'appel par route (ms), partagée entre requêtes."""
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> float | None:
+        with self._lock:
+            return self._values.get(name)
+
+    def observe(self, name: str, latency_ms: float) -> None:
+        with self._lock:
+            previous = self._values.get(name)
+            self._values[name] = latency_ms if previous is None else (
+                self.alpha * latency_ms + (1 - self.alpha) * previous
+            )
+
+
+class LLMRouter:
+    """Choix du modèle par requête ; routes = principal (obligatoire) et rapide."""
+
+    def __init__(
+        self,
+        primary: ModelRoute,
+        fast: ModelRoute,
+        simple_max_question_chars: int,
+        simple_max_context_tokens: int,
+        ewma_alpha: float,
+        fallback: bool = True,
+    ) -> None:
+        self.routes = {PRIMARY: primary, FAST: fast}
+        self.simple_max_question_chars = simple_max_question_chars
+        self.simple_max_context_tokens = simple_max_context_tokens
+        self.latency = LatencyEWMA(ewma_alpha)
+        self.fallback = fallback
+
+    def choose(
+        self, question: str, context_tokens: int, budget_ms: float | None
+    ) -> tuple[ModelRoute, str]:
+        """(route, raison) : simple, latency (principal trop lent pour le budget) ou complex."""
+        if (
+            len(question) <= self.simple_max_question_chars
+            and context_tokens <= self.simple_max_context_tokens
+        ):
+            return self.routes[FAST], "simple"
+        primary_ms = self.latency.get(PRIMARY)
+        fast_ms = self.latency.get(FAST)
+        if (
+            budget_ms is not None
+            and primary_ms is not None
+            and primary_ms > budget_ms
+            and (fast_ms is None or fast_ms < primary_ms)
+        ):
+            return self.routes[FAST], "latency"
+        return self.routes[PRIMARY], "complex"
+
+    def timed(self, route: ModelRoute, fn: Callable[[], T]) -> Callable[[], T]:
+        """
+        fn dont la durée alimente l'EWMA de la route, y compris un appel abandonné par la deadline
+        qui termine en arrière-plan (sa vraie latence pénalise le modèle pour les requêtes
+        suivantes).
+        """
+        def run() -> T:
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self.latency.observe(route.name, (time.perf_counter() - start) * 1000)
+
+        return run
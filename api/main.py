@@ -1,5 +1,6 @@
 """
-API RAG FastAPI (PRD ON-1). Endpoint /chat pour question → réponse + sources.
+API RAG FastAPI (PRD ON-1). Endpoint /chat pour question → réponse + sources,
+/chat/batch pour un lot de questions.
 """
 from __future__ import annotations
 
@@ -14,17 +15,28 @@ if _REPO_ROOT not in sys.path:
 from dotenv import load_dotenv  # noqa: E402
 load_dotenv(os.path.join(_REPO_ROOT, ".env"))
 
+import asyncio  # noqa: E402
 import time  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
+from typing import Annotated  # noqa: E402
 
 from fastapi import FastAPI, HTTPException, Request  # noqa: E402
+from fastapi.responses import FileResponse, JSONResponse, Response  # noqa: E402
 from pydantic import BaseModel, Field  # noqa: E402
 from slowapi import Limiter, _rate_limit_exceeded_handler  # noqa: E402
 from slowapi.errors import RateLimitExceeded  # noqa: E402
 from slowapi.util import get_remote_address  # noqa: E402
 
-from api.rag_chain import build_rag_chain  # noqa: E402
-from shared.config import APISettings, LangSmithSettings  # noqa: E402
-from shared.schemas import ChatResponse  # noqa: E402
+from api import metrics, profiling  # noqa: E402
+from api.admission import AdmissionController  # noqa: E402
+from api.answer_cache import AnswerCache, normalize_question  # noqa: E402
+from api.chain_registry import ChainRegistry, UnknownCollectionError  # noqa: E402
+from api.rag_chain import RAGWithSources, build_rag_chain  # noqa: E402
+from api.request_trace import RequestTrace  # noqa: E402
+from api.session_store import SessionStore, WorkingSet  # noqa: E402
+from api.single_flight import SingleFlight  # noqa: E402
+from shared.config import AnswerCacheSettings, APISettings, LangSmithSettings, ProfilingSettings  # noqa: E402
+from shared.schemas import ChatBatchResponse, ChatFilters, ChatResponse  # noqa: E402
 
 logging.basicConfig(
     level=logging.INFO,
@@ -45,15 +57,82 @@ if _langsmith.api_key and _langsmith.tracing:
 
 _api_settings = APISettings()
 limiter = Limiter(key_func=get_remote_address)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Construit la chaîne et chauffe les connexions avant d'accepter du trafic (cold start).
+    En cas d'échec (Qdrant/Cohere indisponible), nouvelles tentatives en arrière-plan :
+    /ready repasse à 200 sans redémarrage du pod.
+    """
+    await asyncio.to_thread(warm_up)
+    retry = None if _is_ready() else asyncio.create_task(_retry_warm_up())
+    try:
+        yield
+    finally:
+        if retry is not None:
+            retry.cancel()
+
+
 app = FastAPI(
     title="RAG Notion API",
     description="Assistant de recherche conversationnel sur la base Notion",
     version="0.1.0",
+    lifespan=lifespan,
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
+def _observe_admission(admission: AdmissionController) -> None:
+    metrics.ADMISSION_IN_FLIGHT.set(admission.in_flight)
+    metrics.ADMISSION_QUEUE_DEPTH.set(admission.queue_depth)
+
+
+# Contrôle d'admission de POST /chat (API_ADMISSION_*) ; None si désactivé
+_admission = (
+    AdmissionController(
+        max_in_flight=_api_settings.admission_max_in_flight,
+        max_queue=_api_settings.admission_max_queue,
+        max_wait_s=_api_settings.admission_max_wait_s,
+        on_change=_observe_admission,
+    )
+    if _api_settings.admission_enabled
+    else None
+)
+
+
+# Déclaré avant log_latency : les rejets 503 passent aussi par log_latency (middleware externe)
+@app.middleware("http")
+async def admit_chat(request: Request, call_next):
+    """
+    Borne les requêtes /chat simultanées avant le threadpool : attente en file FIFO au plus
+    API_ADMISSION_MAX_WAIT_S, puis 503 immédiat avec Retry-After (délestage).
+    """
+    admission = _admission
+    if admission is None or request.method != "POST" or request.url.path != "/chat":
+        return await call_next(request)
+    start = time.perf_counter()
+    rejected = await admission.acquire()
+    if rejected is not None:
+        metrics.ADMISSION_SHED.labels(reason=rejected).inc()
+        logger.warning(
+            "admission shed reason=%s in_flight=%s queue_depth=%s",
+            rejected, admission.in_flight, admission.queue_depth,
+        )
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service surchargé, réessayer plus tard."},
+            headers={"Retry-After": str(_api_settings.admission_retry_after_s)},
+        )
+    metrics.ADMISSION_WAIT.observe(time.perf_counter() - start)
+    try:
+        return await call_next(request)
+    finally:
+        admission.release()
+
+
 @app.middleware("http")
 async def log_latency(request: Request, call_next):
     """Métriques latence par requête (PRD OBS-1.1)."""
@@ -61,49 +140,385 @@ async def log_latency(request: Request, call_next):
     response = await call_next(request)
     duration_ms = (time.perf_counter() - start) * 1000
     logger.info("latency_ms=%.0f path=%s status=%s", duration_ms, request.url.path, response.status_code)
+    # Label = route déclarée (pas l'URL brute) pour borner la cardinalité
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.HTTP_REQUEST_DURATION.labels(path=path, status=str(response.status_code)).observe(
+        duration_ms / 1000
+    )
     return response
 
 
 class ChatRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=2000)
+    filters: ChatFilters | None = Field(
+        None, description="Restreindre la recherche (sous-arbre, pages, dates)"
+    )
+    collection: str | None = Field(
+        None, max_length=255,
+        description="Workspace (collection Qdrant) ; défaut : QDRANT_COLLECTION_NAME",
+    )
+    session_id: str | None = Field(
+        None, min_length=1, max_length=128,
+        description="Conversation : réutilise les chunks des tours précédents",
+    )
+
 
+class ChatBatchRequest(BaseModel):
+    questions: list[Annotated[str, Field(min_length=1, max_length=2000)]] = Field(
+        ..., min_length=1, max_length=_api_settings.batch_max_questions
+    )
+    collection: str | None = Field(
+        None, max_length=255, description="Workspace (collection Qdrant)"
+    )
 
-# Chaîne RAG initialisée au démarrage (singleton)
+
+# Chaîne RAG de la collection par défaut, initialisée au démarrage (singleton)
 _rag = None
+# Chaînes des autres collections (API_COLLECTIONS), dérivées de _rag : clients partagés
+_chains: ChainRegistry[RAGWithSources] | None = None
+_answer_caches: dict[str, AnswerCache] = {}
+_answer_cache_settings = AnswerCacheSettings()
+# Questions identiques en cours (même question normalisée, même rag_version) : une seule exécution
+_single_flight: SingleFlight[ChatResponse] = SingleFlight()
+_profiling_settings = ProfilingSettings()
+# Working sets des conversations, par (collection, session_id)
+_sessions = SessionStore(
+    max_sessions=_api_settings.session_max,
+    ttl_s=_api_settings.session_ttl_s,
+    max_chunks=_api_settings.session_max_chunks,
+    min_score=_api_settings.session_reuse_min_score,
+)
 
 
-def get_rag():
-    global _rag
+def get_rag(collection: str | None = None) -> RAGWithSources:
+    """
+    Chaîne de la collection demandée. La chaîne par défaut est construite une fois ;
+    les autres sont dérivées à la demande (même client Qdrant, mêmes clients Cohere/Mistral)
+    et gardées dans un cache LRU borné. Lève UnknownCollectionError hors API_COLLECTIONS
+    ou si la collection n'existe pas dans Qdrant.
+    """
+    global _rag, _chains
     if _rag is None:
         _rag = build_rag_chain()
-    return _rag
+    if collection is None or collection == _rag.collection_name:
+        return _rag
+    if _chains is None:
+        _chains = ChainRegistry(
+            _rag.for_collection,
+            max_size=_api_settings.chain_cache_size,
+            idle_ttl_s=_api_settings.chain_idle_ttl_s,
+            allowed=set(_api_settings.collections),
+        )
+    chain, hit = _chains.get(collection)
+    metrics.CHAIN_REGISTRY_LOOKUPS.labels(result="hit" if hit else "build").inc()
+    metrics.CHAINS_CACHED.set(len(_chains))
+    return chain
+
+
+def get_answer_cache(chain: RAGWithSources) -> AnswerCache | None:
+    """Cache de réponses de la collection de la chaîne (None si désactivé) ; client partagé."""
+    if not _answer_cache_settings.enabled:
+        return None
+    cache = _answer_caches.get(chain.collection_name)
+    if cache is None:
+        cache = AnswerCache(chain.vectorstore.client, chain.collection_name, _answer_cache_settings)
+        _answer_caches[chain.collection_name] = cache
+    return cache
+
+
+def _answer(
+    chain,
+    cache: AnswerCache | None,
+    question: str,
+    trace: RequestTrace,
+    filters: ChatFilters | None = None,
+    working_set: WorkingSet | None = None,
+) -> ChatResponse:
+    """Sert depuis le cache (exact puis quasi-doublon) sinon exécute la chaîne et met en cache."""
+    # Cache scopé par question seule : les requêtes filtrées ou en session ne le consultent pas
+    if cache is None or filters is not None or working_set is not None:
+        return chain.invoke(question, trace=trace, filters=filters, working_set=working_set)
+    cached = cache.get_exact(question, chain.rag_version)
+    if cached is not None:
+        logger.info("answer_cache hit=exact rag_version=%s", chain.rag_version)
+        metrics.ANSWER_CACHE_LOOKUPS.labels(result="exact", rag_version=chain.rag_version).inc()
+        return cached
+    with trace.stage("embed"):
+        query_vector = chain.embed_query(question)
+    cached = cache.get_similar(query_vector, chain.rag_version)
+    if cached is not None:
+        logger.info("answer_cache hit=similar rag_version=%s", chain.rag_version)
+        metrics.ANSWER_CACHE_LOOKUPS.labels(result="similar", rag_version=chain.rag_version).inc()
+        return cached
+    metrics.ANSWER_CACHE_LOOKUPS.labels(result="miss", rag_version=chain.rag_version).inc()
+    out = chain.invoke(question, query_vector=query_vector, trace=trace)
+    # Pas de cache pour les réponses vides ou dégradées (budget dépassé)
+    if out.sources and not out.degraded:
+        cache.put(question, query_vector, out)
+    return out
+
+
+# Readiness par dépendance, renseignée par warm_up() au démarrage
+_readiness: dict[str, bool] = {"chain": False}
+
+
+def warm_up() -> dict[str, bool]:
+    """
+    Construit la chaîne (clients Qdrant/Cohere/Mistral) puis, si activé, envoie des appels
+    de chauffe : infos collection Qdrant et embedding factice (connexions + TLS établis).
+    """
+    try:
+        chain = get_rag()
+        get_answer_cache(chain)
+        _readiness["chain"] = True
+    except Exception as e:
+        logger.exception("warmup chain build failed: %s", e)
+        return _readiness
+    if not _api_settings.warmup_enabled:
+        return _readiness
+    checks = {
+        "qdrant": lambda: chain.vectorstore.client.get_collection(
+            chain.vectorstore.collection_name
+        ),
+        "embeddings": lambda: chain.embed_query("warmup"),
+    }
+    for name, check in checks.items():
+        start = time.perf_counter()
+        try:
+            check()
+            _readiness[name] = True
+        except Exception as e:
+            _readiness[name] = False
+            logger.warning("warmup %s failed: %s", name, e)
+        logger.info(
+            "warmup %s ok=%s ms=%.0f", name, _readiness[name], (time.perf_counter() - start) * 1000
+        )
+    return _readiness
+
+
+def _is_ready() -> bool:
+    return all(_readiness.values())
+
+
+async def _retry_warm_up() -> None:
+    """Relance warm_up avec backoff exponentiel (API_WARMUP_RETRY_*) jusqu'à tout prêt."""
+    delay = _api_settings.warmup_retry_initial_s
+    attempt = 0
+    while not _is_ready():
+        await asyncio.sleep(delay)
+        attempt += 1
+        logger.info("warmup retry attempt=%s", attempt)
+        await asyncio.to_thread(warm_up)
+        delay = min(delay * 2, _api_settings.warmup_retry_max_s)
+    logger.info("warmup ready after %s retries", attempt)
 
 
 @app.get("/health")
 def health() -> dict:
+    """Liveness : le process répond (ne dit rien des dépendances)."""
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """Readiness : 200 seulement quand la chaîne est construite et les dépendances chauffées."""
+    is_ready = _is_ready()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "not_ready", "checks": _readiness},
+    )
+
+
+@app.get("/metrics")
+def prometheus_metrics() -> Response:
+    """Exposition Prometheus : latences par étape, sources, réponses suspectes, tokens, cache."""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+def _record_response(out: ChatResponse, trace: RequestTrace, question_len: int) -> None:
+    """Logs + métriques d'une réponse : étapes, sources, dégradations, réponses suspectes."""
+    version = out.rag_version
+    metrics.observe_trace(trace, version)
+    # Log basique pour coût/qualité : nombre de sources (OBS-1.2, OBS-2.1)
+    logger.info("chat sources_count=%s rag_version=%s", len(out.sources), version)
+    metrics.SOURCES_RETURNED.labels(rag_version=version).inc(len(out.sources))
+    if out.degraded:
+        logger.warning(
+            "degraded_response stages=%s rag_version=%s", ",".join(out.degraded), version
+        )
+        for stage in out.degraded:
+            metrics.DEGRADED_RESPONSES.labels(stage=stage, rag_version=version).inc()
+    # Détection basique réponses suspectes (PRD QLT-2.2)
+    if len(out.sources) == 0 and "je ne sais pas" not in out.answer.lower():
+        logger.warning("suspicious_response no_sources question_len=%s", question_len)
+        metrics.SUSPICIOUS_RESPONSES.labels(reason="no_sources", rag_version=version).inc()
+    if len(out.answer.strip()) < 20 and len(out.sources) == 0:
+        logger.warning("suspicious_response vague_or_empty answer_len=%s", len(out.answer))
+        metrics.SUSPICIOUS_RESPONSES.labels(reason="vague_or_empty", rag_version=version).inc()
+
+
+def _chain_or_404(collection: str | None) -> RAGWithSources:
+    try:
+        return get_rag(collection)
+    except UnknownCollectionError:
+        raise HTTPException(status_code=404, detail=f"Collection inconnue : {collection}")
+
+
+def _save_profile(
+    capture: profiling.ProfileCapture,
+    chain: RAGWithSources,
+    trace: RequestTrace,
+    question_len: int,
+    status: int,
+) -> None:
+    """Profil de la requête + contexte (rag_version, durées par étape) dans PROFILE_DIR."""
+    try:
+        path = capture.save(
+            _profiling_settings.dir,
+            {
+                "path": "/chat",
+                "status": status,
+                "rag_version": chain.rag_version,
+                "collection": chain.collection_name,
+                "question_len": question_len,
+                "stages_ms": {name: round(ms, 1) for name, ms in trace.stages_ms.items()},
+                "decisions": trace.decisions,
+            },
+            _profiling_settings.max_files,
+        )
+    except OSError as e:
+        logger.warning("profile save failed id=%s: %s", capture.id, e)
+        return
+    metrics.PROFILES_CAPTURED.labels(reason=capture.reason).inc()
+    logger.info(
+        "profile id=%s reason=%s duration_ms=%.0f rag_version=%s path=%s",
+        capture.id, capture.reason, capture.duration_ms, chain.rag_version, path,
+    )
+
+
 @app.post("/chat", response_model=ChatResponse)
 @limiter.limit(_api_settings.rate_limit_chat)
-def chat(request: Request, chat_request: ChatRequest) -> ChatResponse:
-    """Pose une question et reçoit une réponse sourcée (PRD ON-1.1)."""
+def chat(request: Request, response: Response, chat_request: ChatRequest) -> ChatResponse:
+    """
+    Pose une question et reçoit une réponse sourcée (PRD ON-1.1).
+    Profilage : en-tête X-Profile-Token (PROFILE_ADMIN_TOKEN) → X-Profile-Id dans la réponse,
+    profil consultable sur GET /debug/profiles/{id}.
+    """
+    chain = _chain_or_404(chat_request.collection)
+    trace = RequestTrace()
+    reason = profiling.profile_reason(
+        request.headers.get(profiling.PROFILE_HEADER), _profiling_settings
+    )
+    capture = profiling.try_capture(reason)
+    if capture is None:
+        return _chat(chain, chat_request, trace)
+    status = 500
     try:
-        chain = get_rag()
-        out = chain.invoke(chat_request.question)
-        # Log basique pour coût/qualité : nombre de sources (OBS-1.2, OBS-2.1)
-        logger.info("chat sources_count=%s rag_version=%s", len(out.sources), out.rag_version)
-        # Détection basique réponses suspectes (PRD QLT-2.2)
-        if len(out.sources) == 0 and "je ne sais pas" not in out.answer.lower():
-            logger.warning("suspicious_response no_sources question_len=%s", len(chat_request.question))
-        if len(out.answer.strip()) < 20 and len(out.sources) == 0:
-            logger.warning("suspicious_response vague_or_empty answer_len=%s", len(out.answer))
+        with capture:
+            out = _chat(chain, chat_request, trace, coalesce=False)
+        status = 200
+    finally:
+        _save_profile(capture, chain, trace, len(chat_request.question), status)
+    if capture.reason == "header":
+        response.headers[profiling.PROFILE_ID_HEADER] = capture.id
+    return out
+
+
+def _chat(
+    chain: RAGWithSources, chat_request: ChatRequest, trace: RequestTrace, coalesce: bool = True
+) -> ChatResponse:
+    """coalesce=False (requête profilée) : exécution propre, sans résultat partagé single-flight."""
+    try:
+        question, filters = chat_request.question, chat_request.filters
+        session_id = chat_request.session_id
+        cache = get_answer_cache(chain)
+        working_set = _sessions.get((chain.collection_name, session_id)) if session_id else None
+        if _api_settings.single_flight_enabled and coalesce:
+            filters_key = filters.model_dump_json() if filters else ""
+            key = (
+                chain.collection_name,
+                chain.rag_version,
+                normalize_question(question),
+                filters_key,
+                session_id,
+            )
+            out, shared = _single_flight.do(
+                key, lambda: _answer(chain, cache, question, trace, filters, working_set)
+            )
+            role = "follower" if shared else "leader"
+            metrics.SINGLE_FLIGHT_REQUESTS.labels(role=role, rag_version=chain.rag_version).inc()
+        else:
+            out = _answer(chain, cache, question, trace, filters, working_set)
+        # Décision propre à cette requête (absente pour un follower single-flight)
+        session_result = trace.decisions.get("session")
+        if session_result is not None:
+            metrics.SESSION_RETRIEVALS.labels(
+                result=session_result, rag_version=chain.rag_version
+            ).inc()
+        _record_response(out, trace, len(question))
         return out
     except Exception as e:
         logger.exception("Erreur RAG: %s", e)
         raise HTTPException(status_code=500, detail="Erreur lors de la génération de la réponse.")
 
 
+def _require_profile_admin(request: Request) -> None:
+    if not profiling.is_admin(request.headers.get(profiling.PROFILE_HEADER), _profiling_settings):
+        raise HTTPException(status_code=403, detail="Jeton de profilage invalide")
+
+
+def _profile_path(profile_id: str, suffix: str) -> str:
+    path = os.path.join(_profiling_settings.dir, profile_id + suffix)
+    if not profiling.is_profile_id(profile_id) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Profil inconnu : {profile_id}")
+    return path
+
+
+@app.get("/debug/profiles/{profile_id}")
+def get_profile(request: Request, profile_id: str) -> FileResponse:
+    """Résumé d'un profil : rag_version, durées par étape, fonctions les plus coûteuses (admin)."""
+    _require_profile_admin(request)
+    return FileResponse(_profile_path(profile_id, ".json"), media_type="application/json")
+
+
+@app.get("/debug/profiles/{profile_id}/pstats")
+def get_profile_pstats(request: Request, profile_id: str) -> FileResponse:
+    """Profil cProfile brut en pièce jointe (pstats, ex. snakeviz) (admin)."""
+    _require_profile_admin(request)
+    return FileResponse(
+        _profile_path(profile_id, ".prof"),
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.prof",
+    )
+
+
+@app.post("/chat/batch", response_model=ChatBatchResponse)
+@limiter.limit(_api_settings.rate_limit_chat_batch)
+def chat_batch(request: Request, batch_request: ChatBatchRequest) -> ChatBatchResponse:
+    """Lot de questions : embedding et recherche batchés, générations LLM en parallèle bornée."""
+    chain = _chain_or_404(batch_request.collection)
+    try:
+        # Étapes batchées (embed, search) : une trace pour le lot ; rerank, prompt, llm par question
+        batch_trace = RequestTrace()
+        traces = [RequestTrace() for _ in batch_request.questions]
+        results = chain.batch(
+            batch_request.questions,
+            max_concurrency=_api_settings.batch_llm_concurrency,
+            trace=batch_trace,
+            traces=traces,
+        )
+        logger.info("chat_batch questions=%s rag_version=%s", len(results), chain.rag_version)
+        metrics.observe_trace(batch_trace, chain.rag_version)
+        for question, out, trace in zip(batch_request.questions, results, traces):
+            _record_response(out, trace, len(question))
+        return ChatBatchResponse(results=results)
+    except Exception as e:
+        logger.exception("Erreur RAG batch: %s", e)
+        raise HTTPException(status_code=500, detail="Erreur lors de la génération des réponses.")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,102 @@
+"""
+Métriques Prometheus de l'API (PRD OBS-1.x) : histogrammes par étape de la chaîne RAG,
+compteurs sources / réponses suspectes / tokens LLM / cache, labellisés par rag_version.
+Exposées sur GET /metrics.
+"""
+from __future__ import annotations
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from api.request_trace import RequestTrace
+
+# Buckets en secondes : de ~5 ms (cache, Qdrant local) à 30 s (LLM lent)
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "rag_http_request_duration_seconds",
+    "Durée totale des requêtes HTTP",
+    ["path", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+STAGE_DURATION = Histogram(
+    "rag_stage_duration_seconds",
+    "Durée de chaque étape de la chaîne RAG (embed, search, rerank, prompt, llm)",
+    ["stage", "rag_version"],
+    buckets=_LATENCY_BUCKETS,
+)
+SOURCES_RETURNED = Counter(
+    "rag_sources_returned_total", "Sources renvoyées avec les réponses", ["rag_version"]
+)
+SUSPICIOUS_RESPONSES = Counter(
+    "rag_suspicious_responses_total",
+    "Réponses suspectes détectées (PRD QLT-2.2)",
+    ["reason", "rag_version"],
+)
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total", "Tokens LLM consommés", ["direction", "rag_version"]
+)
+ANSWER_CACHE_LOOKUPS = Counter(
+    "rag_answer_cache_lookups_total",
+    "Consultations du cache de réponses (exact, similar, miss)",
+    ["result", "rag_version"],
+)
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "rag_single_flight_requests_total",
+    "Requêtes /chat coalescées : leader (exécute la chaîne) ou follower (résultat partagé)",
+    ["role", "rag_version"],
+)
+DEGRADED_RESPONSES = Counter(
+    "rag_degraded_responses_total",
+    "Étapes dégradées faute de budget de latence",
+    ["stage", "rag_version"],
+)
+SESSION_RETRIEVALS = Counter(
+    "rag_session_retrievals_total",
+    "Requêtes en session : reuse (servies depuis le working set) ou search (Qdrant)",
+    ["result", "rag_version"],
+)
+CHAIN_REGISTRY_LOOKUPS = Counter(
+    "rag_chain_registry_lookups_total",
+    "Chaînes par collection : hit (cache LRU) ou build",
+    ["result"],
+)
+CHAINS_CACHED = Gauge("rag_chains_cached", "Chaînes par collection en cache")
+PROFILES_CAPTURED = Counter(
+    "rag_profiles_captured_total",
+    "Requêtes /chat profilées : header (admin) ou sampled",
+    ["reason"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "rag_admission_in_flight", "Requêtes /chat admises en cours d'exécution"
+)
+ADMISSION_QUEUE_DEPTH = Gauge("rag_admission_queue_depth", "Requêtes /chat en attente d'admission")
+ADMISSION_WAIT = Histogram(
+    "rag_admission_wait_seconds",
+    "Attente en file des requêtes /chat admises",
+    buckets=_LATENCY_BUCKETS,
+)
+ADMISSION_SHED = Counter(
+    "rag_admission_shed_total", "Requêtes /chat rejetées (503) : queue_full ou timeout", ["reason"]
+)
+POLICY_DECISIONS = Counter(
+    "rag_policy_decisions_total",
+    "Décisions des politiques adaptatives par requête (ex. rerank : skip ou rerank)",
+    ["policy", "choice", "rag_version"],
+)
+
+
+def observe_trace(trace: RequestTrace, rag_version: str) -> None:
+    """Reporte les durées par étape, les tokens et les décisions de politique d'une requête."""
+    for stage, ms in trace.stages_ms.items():
+        STAGE_DURATION.labels(stage=stage, rag_version=rag_version).observe(ms / 1000)
+    for policy, choice in trace.decisions.items():
+        POLICY_DECISIONS.labels(policy=policy, choice=choice, rag_version=rag_version).inc()
+    if trace.tokens_in:
+        LLM_TOKENS.labels(direction="in", rag_version=rag_version).inc(trace.tokens_in)
+    if trace.tokens_out:
+        LLM_TOKENS.labels(direction="out", rag_version=rag_version).inc(trace.tokens_out)
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Exposition texte Prometheus (corps, content-type)."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,174 @@
+"""
+Profilage à la demande de POST /chat : cProfile d'une requête, déclenché par l'en-tête admin
+X-Profile-Token ou échantillonné (PROFILE_SAMPLE_RATE). Les étapes exécutées dans le pool de
+Deadline (rerank, LLM) sont profilées dans leur thread puis fusionnées.
+Une seule requête profilée à la fois par process (surcoût borné ; un seul profileur actif par
+interpréteur à partir de Python 3.12) : les autres demandes sont servies sans profil.
+Chaque profil est stocké dans PROFILE_DIR : <id>.prof (pstats, ex. snakeviz) et <id>.json
+(rag_version, durées par étape, fonctions les plus coûteuses) ; rétention PROFILE_MAX_FILES.
+"""
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, TypeVar
+
+from shared.config import ProfilingSettings
+
+T = TypeVar("T")
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+_TOP_FUNCTIONS = 25
+
+# Capture active de la requête en cours (lue par Deadline.run pour les threads d'étape)
+_current: ContextVar[ProfileCapture | None] = ContextVar("profile_capture", default=None)
+_slot = threading.Lock()
+
+
+def is_admin(header_token: str | None, settings: ProfilingSettings) -> bool:
+    """Jeton X-Profile-Token valide (toujours faux sans PROFILE_ADMIN_TOKEN)."""
+    return bool(
+        header_token
+        and settings.admin_token
+        and hmac.compare_digest(header_token, settings.admin_token)
+    )
+
+
+def profile_reason(header_token: str | None, settings: ProfilingSettings) -> str | None:
+    """"header" (jeton admin valide), "sampled" (échantillonnage) ou None (pas de profil)."""
+    if is_admin(header_token, settings):
+        return "header"
+    if settings.sample_rate > 0 and random.random() < settings.sample_rate:
+        return "sampled"
+    return None
+
+
+def is_profile_id(value: str) -> bool:
+    return bool(_PROFILE_ID.match(value))
+
+
+def try_capture(reason: str | None) -> ProfileCapture | None:
+    """Capture à utiliser comme context manager, ou None (pas demandé, ou profil déjà en cours)."""
+    if reason is None or not _slot.acquire(blocking=False):
+        return None
+    return ProfileCapture(reason)
+
+
+class ProfileCapture:
+    """cProfile du thread de la requête + profils des étapes déléguées à d'autres threads."""
+
+    def __init__(self, reason: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.reason = reason
+        self.duration_ms = 0.0
+        self._profile = cProfile.Profile()
+        self._thread_profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._start = 0.0
+        self._token = None
+
+    def __enter__(self) -> ProfileCapture:
+        self._token = _current.set(self)
+        self._start = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._profile.disable()
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        _current.reset(self._token)
+        with self._lock:
+            # Une étape abandonnée (budget dépassé) qui termine plus tard n'est plus comptée
+            self._closed = True
+        _slot.release()
+
+    def run_in_thread(self, fn: Callable[[], T]) -> T:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python >= 3.12 : le profileur de la requête couvre déjà tous les threads
+            return fn()
+        try:
+            return fn()
+        finally:
+            profile.disable()
+            with self._lock:
+                if not self._closed:
+                    self._thread_profiles.append(profile)
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        for profile in self._thread_profiles:
+            stats.add(profile)
+        return stats
+
+    def save(self, directory: str, metadata: dict[str, Any], max_files: int) -> str:
+        """Écrit <id>.prof et <id>.json dans directory ; retourne le chemin du .json."""
+        os.makedirs(directory, exist_ok=True)
+        stats = self.stats()
+        stats.dump_stats(os.path.join(directory, f"{self.id}.prof"))
+        summary = {
+            "id": self.id,
+            "reason": self.reason,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            **metadata,
+            "top_functions": top_functions(stats),
+        }
+        path = os.path.join(directory, f"{self.id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        prune_profiles(directory, max_files)
+        return path
+
+
+def top_functions(stats: pstats.Stats, limit: int = _TOP_FUNCTIONS) -> list[dict[str, Any]]:
+    """Fonctions triées par temps propre (tottime) : les points chauds CPU."""
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "ncalls": ncalls,
+            "tottime_ms": round(tottime * 1000, 2),
+            "cumtime_ms": round(cumtime * 1000, 2),
+        })
+    return sorted(rows, key=lambda r: -r["tottime_ms"])[:limit]
+
+
+def prune_profiles(directory: str, max_files: int) -> None:
+    """Garde les max_files profils les plus récents (paires .prof / .json)."""
+    summaries = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in summaries[: max(0, len(summaries) - max_files)]:
+        stem = entry.name[: -len(".json")]
+        for suffix in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(directory, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def profile_in_thread(fn: Callable[[], T]) -> Callable[[], T]:
+    """fn profilé dans le thread qui l'exécute si la requête courante est profilée."""
+    capture = _current.get()
+    if capture is None:
+        return fn
+    return lambda: capture.run_in_thread(fn)
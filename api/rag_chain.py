@@ -5,13 +5,21 @@ Orchestration avec LangChain LCEL, sans agent.
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from langchain_cohere import CohereEmbeddings, CohereRerank
-from langchain_mistralai import ChatMistralAI
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
+from langchain_core.documents import Document
+from langchain_qdrant import QdrantVectorStore, RetrievalMode
+from qdrant_client.http import models as qm
 
+from api.chain_registry import UnknownCollectionError
+from api.context_packing import estimate_tokens, pack_context
+from api.deadline import Deadline, StageTimeout
+from api.filters import to_qdrant_filter
+from api.llm_router import FAST, PRIMARY, LLMRouter, ModelRoute
+from api.request_trace import RequestTrace
+from api.rerank_policy import RerankPolicy
+from api.session_store import WorkingSet
 from shared.config import (
     CohereSettings,
     MistralSettings,
@@ -19,17 +27,27 @@ from shared.config import (
     RAGPipelineSettings,
     get_rag_settings,
 )
+from shared.page_index import page_collection_name, restrict_to_pages, search_page_ids
 from shared.prompts import get_rag_prompt
-from shared.schemas import ChatResponse, ChatSource
+from shared.qdrant import build_qdrant_client
+from shared.schemas import ChatFilters, ChatResponse, ChatSource
+from shared.sparse import BM25SparseEmbeddings
 
 logger = logging.getLogger(__name__)
 
+# Nombre max de textes par requête d'embedding Cohere (au-delà, l'API rejette l'appel)
+COHERE_EMBED_MAX_TEXTS = 96
 
-def _format_docs(docs: list) -> str:
-    """Formate les documents pour le prompt."""
-    return "\n\n---\n\n".join(
-        f"[Source: {d.metadata.get('title', 'Sans titre')}]\n{d.page_content}"
-        for d in docs
+
+def _extractive_answer(docs: list, max_docs: int = 3) -> str:
+    """Réponse de repli (LLM hors budget) : extraits des meilleures sources, sans génération."""
+    extracts = "\n".join(
+        f"- {d.metadata.get('title', 'Sans titre')} : {d.page_content[:300].strip()}"
+        for d in docs[:max_docs]
+    )
+    return (
+        "Réponse générée indisponible dans le délai imparti. "
+        f"Extraits les plus pertinents :\n{extracts}"
     )
 
 
@@ -55,6 +73,17 @@ def _docs_to_sources(docs: list) -> list[ChatSource]:
     return sources
 
 
+def _point_to_document(point: Any, vectorstore: QdrantVectorStore) -> Document:
+    """Point Qdrant → Document LangChain (même format de payload que QdrantVectorStore)."""
+    payload = point.payload or {}
+    metadata = dict(payload.get(vectorstore.metadata_payload_key) or {})
+    metadata["_id"] = point.id
+    metadata["_score"] = point.score
+    return Document(
+        page_content=payload.get(vectorstore.content_payload_key, ""), metadata=metadata
+    )
+
+
 def build_retriever(
     qdrant: QdrantSettings,
     cohere: CohereSettings,
@@ -63,12 +92,29 @@ def build_retriever(
     """
     Retriever Qdrant avec MMR (diversité).
     search_type="mmr" avec fetch_k=top_k et lambda_mult=mmr_lambda.
+    En mode hybrid : dense + sparse BM25 fusionnés par RRF côté Qdrant (pas de MMR).
     """
-    client = QdrantClient(url=qdrant.url, api_key=qdrant.api_key)
+    # Import différé : SDK Cohere chargé à la construction, pas à l'import du module (cold start)
+    from langchain_cohere import CohereEmbeddings
+
+    client = build_qdrant_client(qdrant)
     embeddings = CohereEmbeddings(
         model="embed-multilingual-v3.0",
         cohere_api_key=cohere.api_key,
+        base_url=cohere.base_url,
     )
+    if rag_settings.retrieval_mode == "hybrid":
+        vectorstore = QdrantVectorStore(
+            client=client,
+            collection_name=qdrant.collection_name,
+            embedding=embeddings,
+            retrieval_mode=RetrievalMode.HYBRID,
+            sparse_embedding=BM25SparseEmbeddings(),
+        )
+        return vectorstore.as_retriever(
+            search_type="similarity",
+            search_kwargs={"k": rag_settings.top_n},
+        )
     vectorstore = QdrantVectorStore(
         client=client,
         collection_name=qdrant.collection_name,
@@ -85,16 +131,481 @@ def build_retriever(
     return retriever
 
 
+def resolve_page_collection(
+    client: Any, collection_name: str, rag_settings: RAGPipelineSettings
+) -> str | None:
+    """Index de pages à utiliser (RAG_TWO_STAGE_RETRIEVAL) ; None si désactivé ou pas construit."""
+    if not rag_settings.two_stage_retrieval:
+        return None
+    name = page_collection_name(collection_name)
+    if not client.collection_exists(name):
+        logger.warning("two_stage_retrieval : index de pages absent (%s), recherche à plat", name)
+        return None
+    return name
+
+
+class RAGWithSources:
+    """
+    Chaîne RAG : embedding question → MMR ou hybride Qdrant → (rerank) → prompt → LLM.
+    L'embedding de la question est exposé (embed_query) pour être réutilisé
+    par le cache de réponses sans second appel Cohere.
+    """
+
+    def __init__(
+        self,
+        *,
+        retriever: Any,
+        prompt: Any,
+        llm: Any,
+        rag_settings: RAGPipelineSettings,
+        rerank: Any | None = None,
+        rerank_policy: RerankPolicy | None = None,
+        page_collection: str | None = None,
+        llm_router: LLMRouter | None = None,
+    ) -> None:
+        self.retriever = retriever
+        self.vectorstore = retriever.vectorstore
+        self.prompt = prompt
+        self.llm = llm
+        self.rag_settings = rag_settings
+        self.rerank = rerank
+        self.rerank_policy = rerank_policy
+        # Retrieval en deux étapes : index de pages de la collection (None = recherche à plat)
+        self.page_collection = page_collection
+        # Routage LLM (RAG_LLM_ROUTING=adaptive) ; None = toujours self.llm
+        self.llm_router = llm_router
+
+    @property
+    def rag_version(self) -> str:
+        return self.rag_settings.rag_version
+
+    @property
+    def collection_name(self) -> str:
+        return self.vectorstore.collection_name
+
+    def for_collection(self, collection_name: str) -> RAGWithSources:
+        """
+        Même chaîne sur une autre collection : client Qdrant, embeddings, LLM et rerank partagés
+        (pas de nouvelles connexions). Lève UnknownCollectionError si la collection n'existe pas.
+        """
+        vs = self.vectorstore
+        if not vs.client.collection_exists(collection_name):
+            raise UnknownCollectionError(collection_name)
+        extra = {}
+        if vs.retrieval_mode == RetrievalMode.HYBRID:
+            extra = {
+                "sparse_embedding": vs.sparse_embeddings,
+                "sparse_vector_name": vs.sparse_vector_name,
+            }
+        # validate_collection_config=False : pas d'embedding factice de validation par construction
+        vectorstore = QdrantVectorStore(
+            client=vs.client,
+            collection_name=collection_name,
+            embedding=vs.embeddings,
+            retrieval_mode=vs.retrieval_mode,
+            vector_name=vs.vector_name,
+            validate_collection_config=False,
+            **extra,
+        )
+        retriever = vectorstore.as_retriever(
+            search_type=self.retriever.search_type,
+            search_kwargs=self.retriever.search_kwargs,
+        )
+        return RAGWithSources(
+            retriever=retriever,
+            prompt=self.prompt,
+            llm=self.llm,
+            rag_settings=self.rag_settings,
+            rerank=self.rerank,
+            rerank_policy=self.rerank_policy,
+            page_collection=resolve_page_collection(vs.client, collection_name, self.rag_settings),
+            llm_router=self.llm_router,
+        )
+
+    def embed_query(self, question: str) -> list[float]:
+        return self.vectorstore.embeddings.embed_query(question)
+
+    def embed_queries(self, questions: list[str]) -> list[list[float]]:
+        """
+        Embeddings de plusieurs questions (input_type=search_query) : un appel Cohere par tranche
+        de COHERE_EMBED_MAX_TEXTS, limite de textes par requête de l'API.
+        """
+        from langchain_cohere import CohereEmbeddings
+
+        embeddings = self.vectorstore.embeddings
+        if isinstance(embeddings, CohereEmbeddings):
+            return [
+                vector
+                for start in range(0, len(questions), COHERE_EMBED_MAX_TEXTS)
+                for vector in embeddings.embed(
+                    questions[start:start + COHERE_EMBED_MAX_TEXTS], input_type="search_query"
+                )
+            ]
+        return [embeddings.embed_query(q) for q in questions]
+
+    def _no_answer(self) -> ChatResponse:
+        return ChatResponse(
+            answer="Je ne sais pas. Aucun document pertinent trouvé.",
+            sources=[],
+            rag_version=self.rag_version,
+        )
+
+    def _query_request(
+        self,
+        question: str,
+        query_vector: list[float],
+        query_filter: qm.Filter | None = None,
+        mmr_candidates: int | None = None,
+    ) -> qm.QueryRequest:
+        """
+        Requête Qdrant d'une question : MMR dense (pool de mmr_candidates candidats, top_k par
+        défaut), ou dense + sparse fusionnés par RRF (hybrid).
+        """
+        if self.rag_settings.retrieval_mode == "hybrid":
+            sparse = self.vectorstore.sparse_embeddings.embed_query(question)
+            candidates = self.rag_settings.top_k
+            return qm.QueryRequest(
+                prefetch=[
+                    qm.Prefetch(
+                        query=query_vector,
+                        using=self.vectorstore.vector_name,
+                        filter=query_filter,
+                        limit=candidates,
+                    ),
+                    qm.Prefetch(
+                        query=qm.SparseVector(indices=sparse.indices, values=sparse.values),
+                        using=self.vectorstore.sparse_vector_name,
+                        filter=query_filter,
+                        limit=candidates,
+                    ),
+                ],
+                query=qm.FusionQuery(fusion=qm.Fusion.RRF),
+                filter=query_filter,
+                limit=self.rag_settings.top_n,
+                with_payload=True,
+            )
+        # MMR côté Qdrant (serveur et client >= 1.15) : diversity 0 = pertinence seule,
+        # d'où 1 - mmr_lambda (1 = pertinence max)
+        return qm.QueryRequest(
+            query=qm.NearestQuery(
+                nearest=query_vector,
+                mmr=qm.Mmr(
+                    diversity=1 - self.rag_settings.mmr_lambda,
+                    candidates_limit=mmr_candidates or self.rag_settings.top_k,
+                ),
+            ),
+            using=self.vectorstore.vector_name,
+            filter=query_filter,
+            limit=self.rag_settings.top_n,
+            with_payload=True,
+        )
+
+    def _search_many(
+        self,
+        questions: list[str],
+        query_vectors: list[list[float]],
+        query_filter: qm.Filter | None = None,
+    ) -> list[list[Document]]:
+        """Toutes les recherches en un appel Qdrant (query_batch_points), dans l'ordre d'entrée."""
+        filters = self._chunk_filters(query_vectors, query_filter)
+        return self._query_chunks(questions, query_vectors, filters)
+
+    def _query_chunks(
+        self,
+        questions: list[str],
+        query_vectors: list[list[float]],
+        filters: list[qm.Filter | None],
+    ) -> list[list[Document]]:
+        responses = self.vectorstore.client.query_batch_points(
+            collection_name=self.vectorstore.collection_name,
+            requests=[
+                self._query_request(q, v, f) for q, v, f in zip(questions, query_vectors, filters)
+            ],
+        )
+        return [[_point_to_document(p, self.vectorstore) for p in r.points] for r in responses]
+
+    def _chunk_filters(
+        self, query_vectors: list[list[float]], query_filter: qm.Filter | None
+    ) -> list[qm.Filter | None]:
+        """
+        Filtre de la recherche de chunks par question. En deux étapes : pages candidates
+        (un appel Qdrant sur l'index de pages, même filtre utilisateur) puis restriction à
+        leurs page_id.
+        """
+        if self.page_collection is None:
+            return [query_filter] * len(query_vectors)
+        page_ids = search_page_ids(
+            self.vectorstore.client,
+            self.page_collection,
+            query_vectors,
+            limit=self.rag_settings.page_candidates,
+            query_filter=query_filter,
+        )
+        return [restrict_to_pages(query_filter, ids) for ids in page_ids]
+
+    def _search(
+        self,
+        question: str,
+        query_vector: list[float],
+        query_filter: qm.Filter | None = None,
+    ) -> list[Document]:
+        return self._search_many([question], [query_vector], query_filter)[0]
+
+    def _search_for_rerank(
+        self,
+        question: str,
+        query_vector: list[float],
+        query_filter: qm.Filter | None,
+        trace: RequestTrace,
+    ) -> tuple[list[Document], bool]:
+        """
+        Recherche + décision de rerank. Avec une politique adaptative (mode mmr, scores cosinus) :
+        top_k denses bruts (sans MMR) en un appel Qdrant ; la politique lit leurs scores.
+        Distribution non piquée → tout le pool au rerank, sans autre appel. Distribution
+        piquée → pas de rerank : top_n par MMR côté Qdrant sur un pool réduit aux score_window
+        meilleurs candidats (la queue n'apporte rien), comme la politique always hors rerank.
+        Retourne (docs, rerank).
+        """
+        policy = self.rerank_policy
+        if self.rerank is None or policy is None or self.rag_settings.retrieval_mode != "mmr":
+            return self._search(question, query_vector, query_filter), self.rerank is not None
+        query_filter = self._chunk_filters([query_vector], query_filter)[0]
+        response = self.vectorstore.client.query_points(
+            collection_name=self.vectorstore.collection_name,
+            query=query_vector,
+            using=self.vectorstore.vector_name,
+            query_filter=query_filter,
+            limit=self.rag_settings.top_k,
+            with_payload=True,
+        )
+        docs = [_point_to_document(p, self.vectorstore) for p in response.points]
+        if not policy.should_skip([d.metadata["_score"] for d in docs]):
+            trace.decisions["rerank"] = "rerank"
+            return docs, True
+        trace.decisions["rerank"] = "skip"
+        candidates = max(policy.score_window, self.rag_settings.top_n)
+        response = self.vectorstore.client.query_batch_points(
+            collection_name=self.vectorstore.collection_name,
+            requests=[
+                self._query_request(question, query_vector, query_filter, mmr_candidates=candidates)
+            ],
+        )[0]
+        return [_point_to_document(p, self.vectorstore) for p in response.points], False
+
+    def _search_with_vectors(
+        self, question: str, query_vector: list[float]
+    ) -> tuple[list[Document], list[list[float]]]:
+        """Recherche qui renvoie aussi le vecteur dense de chaque chunk (working set de session)."""
+        query_filter = self._chunk_filters([query_vector], None)[0]
+        request = self._query_request(question, query_vector, query_filter)
+        request.with_vector = True
+        response = self.vectorstore.client.query_batch_points(
+            collection_name=self.vectorstore.collection_name, requests=[request]
+        )[0]
+        docs, vectors = [], []
+        for point in response.points:
+            vector = point.vector
+            if isinstance(vector, dict):
+                vector = vector.get(self.vectorstore.vector_name)
+            docs.append(_point_to_document(point, self.vectorstore))
+            vectors.append(vector)
+        return docs, vectors
+
+    def invoke(
+        self,
+        question: str,
+        query_vector: list[float] | None = None,
+        trace: RequestTrace | None = None,
+        filters: ChatFilters | None = None,
+        working_set: WorkingSet | None = None,
+    ) -> ChatResponse:
+        """
+        working_set (session) : la question est d'abord confrontée aux chunks déjà retrouvés
+        dans la conversation ; s'ils sont assez proches, ni recherche Qdrant ni rerank.
+        Ignoré pour les requêtes filtrées. Choix retenu dans trace.decisions["session"]
+        (reuse ou search).
+        """
+        trace = trace or RequestTrace()
+        deadline = Deadline(self.rag_settings.budget_total_ms)
+        if query_vector is None:
+            with trace.stage("embed"):
+                query_vector = self.embed_query(question)
+        if working_set is not None and filters is None:
+            docs = working_set.match(query_vector, self.rag_settings.top_n)
+            if docs is not None:
+                trace.decisions["session"] = "reuse"
+                logger.info(
+                    "session working_set reuse chunks=%s rag_version=%s",
+                    len(docs), self.rag_version,
+                )
+                return self._generate(question, docs, deadline, trace, rerank=False)
+            trace.decisions["session"] = "search"
+            with trace.stage("search"):
+                docs, vectors = self._search_with_vectors(question, query_vector)
+            working_set.add(docs, vectors)
+            return self._generate(question, docs, deadline, trace)
+        with trace.stage("search"):
+            docs, rerank = self._search_for_rerank(
+                question, query_vector, to_qdrant_filter(filters), trace
+            )
+        return self._generate(question, docs, deadline, trace, rerank=rerank)
+
+    def batch(
+        self,
+        questions: list[str],
+        max_concurrency: int = 8,
+        trace: RequestTrace | None = None,
+        traces: list[RequestTrace] | None = None,
+    ) -> list[ChatResponse]:
+        """
+        Plusieurs questions : embedding et appel Qdrant batchés (étapes du lot dans trace),
+        puis rerank + LLM en parallèle (max_concurrency), une trace par question dans traces.
+        Résultats dans l'ordre d'entrée.
+        """
+        if not questions:
+            return []
+        trace = trace or RequestTrace()
+        traces = traces or [RequestTrace() for _ in questions]
+        deadline_ms = self.rag_settings.budget_total_ms
+        with trace.stage("embed"):
+            query_vectors = self.embed_queries(questions)
+        with trace.stage("search"):
+            docs_per_question = self._search_many(questions, query_vectors)
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="rag-batch"
+        ) as pool:
+            return list(
+                pool.map(
+                    lambda item: self._generate(item[0], item[1], Deadline(deadline_ms), item[2]),
+                    zip(questions, docs_per_question, traces),
+                )
+            )
+
+    def _generate(
+        self,
+        question: str,
+        docs: list[Document],
+        deadline: Deadline,
+        trace: RequestTrace,
+        rerank: bool = True,
+    ) -> ChatResponse:
+        """(rerank) → prompt → LLM sur les documents retrouvés, dans les budgets de latence."""
+        degraded: list[str] = []
+        if not docs:
+            return self._no_answer()
+        if rerank and self.rerank is not None:
+            with trace.stage("rerank"):
+                docs = self._rerank_within_budget(question, docs, deadline, degraded)
+        with trace.stage("prompt"):
+            context, docs = pack_context(
+                docs,
+                max_tokens=self.rag_settings.context_max_tokens,
+                max_overlap=self.rag_settings.chunk_overlap,
+            )
+            result = self.prompt.invoke({"context": context, "question": question})
+        if not context.strip():
+            return self._no_answer()
+        try:
+            answer = self._call_llm(question, result, context, deadline, trace, degraded)
+        except StageTimeout:
+            logger.warning("degraded stage=llm rag_version=%s", self.rag_version)
+            degraded.append("llm_timeout")
+            answer = _extractive_answer(docs)
+        return ChatResponse(
+            answer=answer or "Je ne sais pas.",
+            sources=_docs_to_sources(docs),
+            rag_version=self.rag_version,
+            degraded=degraded,
+        )
+
+    def _call_llm(
+        self,
+        question: str,
+        prompt_value: Any,
+        context: str,
+        deadline: Deadline,
+        trace: RequestTrace,
+        degraded: list[str],
+    ) -> str:
+        """
+        LLM dans son budget (StageTimeout sinon). Avec routage : modèle choisi par le routeur,
+        puis repli sur le modèle rapide si le principal échoue ou dépasse son budget. Le repli
+        ne dispose que du temps restant de la deadline de la requête (RAG_BUDGET_TOTAL_MS) :
+        sans budget total, ou deadline épuisée, pas de repli.
+        """
+        budget_ms = self.rag_settings.budget_llm_ms
+        router = self.llm_router
+        if router is None:
+            with trace.stage("llm"):
+                message = deadline.run("llm", budget_ms, lambda: self.llm.invoke(prompt_value))
+            trace.record_llm_usage(message)
+            return message.content
+        timeout_s = deadline.stage_timeout_s(budget_ms)
+        context_tokens = estimate_tokens(context)
+        route_budget_ms = None if timeout_s is None else timeout_s * 1000
+        route, reason = router.choose(question, context_tokens, route_budget_ms)
+        trace.decisions["llm_route"] = route.name
+        logger.info(
+            "llm_route route=%s model=%s reason=%s context_tokens=%s question_chars=%s "
+            "rag_version=%s",
+            route.name, route.model, reason, context_tokens, len(question), self.rag_version,
+        )
+        try:
+            with trace.stage("llm"):
+                message = deadline.run(
+                    "llm", budget_ms, router.timed(route, lambda: route.llm.invoke(prompt_value))
+                )
+        except Exception as e:
+            remaining_s = deadline.remaining_s()
+            if route.name != PRIMARY or not router.fallback or not remaining_s:
+                raise
+            fast = router.routes[FAST]
+            logger.warning(
+                "llm_route fallback model=%s error=%s remaining_ms=%.0f rag_version=%s",
+                fast.model, type(e).__name__, remaining_s * 1000, self.rag_version,
+            )
+            trace.decisions["llm_route"] = "fallback"
+            degraded.append("llm_fallback")
+            with trace.stage("llm"):
+                # Budget d'étape ignoré : seul le temps restant de la requête borne le repli
+                message = deadline.run(
+                    "llm", None, router.timed(fast, lambda: fast.llm.invoke(prompt_value))
+                )
+        trace.record_llm_usage(message)
+        return message.content
+
+    def _rerank_within_budget(
+        self, question: str, docs: list[Document], deadline: Deadline, degraded: list[str]
+    ) -> list[Document]:
+        """Rerank dans son budget ; au-delà on garde l'ordre MMR."""
+        try:
+            # CohereRerank.compress_documents(documents, query) retourne les docs rerankés
+            return list(
+                deadline.run(
+                    "rerank",
+                    self.rag_settings.budget_rerank_ms,
+                    lambda: self.rerank.compress_documents(docs, question),
+                )
+            )
+        except StageTimeout:
+            logger.warning("degraded stage=rerank rag_version=%s", self.rag_version)
+            degraded.append("rerank_timeout")
+            return docs
+
+
 def build_rag_chain(
     qdrant: QdrantSettings | None = None,
     cohere: CohereSettings | None = None,
     mistral: MistralSettings | None = None,
     rag_settings: RAGPipelineSettings | None = None,
-) -> Any:
+) -> RAGWithSources:
     """
-    Chaîne LCEL : retriever → (optionnel rerank) → format_docs → prompt → LLM → str.
-    Retourne un runnable qui prend {"question": str} et produit (answer, sources).
+    Chaîne : retriever → (optionnel rerank) → pack_context → prompt → LLM → str.
+    Retourne un RAGWithSources dont invoke(question) produit une ChatResponse (answer, sources).
     """
+    from langchain_cohere import CohereRerank
+    from langchain_mistralai import ChatMistralAI
+
     from shared.config import APISettings, CohereSettings, MistralSettings, QdrantSettings
 
     qdrant = qdrant or QdrantSettings()
@@ -113,54 +624,58 @@ def build_rag_chain(
         mistral_api_key=mistral.api_key,
         temperature=mistral.temperature,
         max_tokens=mistral.max_tokens,
+        base_url=mistral.base_url,
     )
 
+    # Routage LLM (PRD latence) : modèle rapide pour les questions simples / principal trop lent
+    llm_router = None
+    if rag_settings.llm_routing == "adaptive":
+        if mistral.fast_model:
+            fast_llm = ChatMistralAI(
+                model=mistral.fast_model,
+                mistral_api_key=mistral.api_key,
+                temperature=mistral.temperature,
+                max_tokens=mistral.fast_max_tokens,
+                base_url=mistral.base_url,
+            )
+            llm_router = LLMRouter(
+                primary=ModelRoute(PRIMARY, mistral.model, llm, mistral.max_tokens),
+                fast=ModelRoute(FAST, mistral.fast_model, fast_llm, mistral.fast_max_tokens),
+                simple_max_question_chars=rag_settings.llm_route_simple_max_question_chars,
+                simple_max_context_tokens=rag_settings.llm_route_simple_max_context_tokens,
+                ewma_alpha=rag_settings.llm_route_ewma_alpha,
+                fallback=rag_settings.llm_route_fallback,
+            )
+        else:
+            logger.warning("RAG_LLM_ROUTING=adaptive sans MISTRAL_FAST_MODEL : routage désactivé")
+
+    rerank = None
     if rag_settings.rerank_enabled:
         rerank = CohereRerank(
             model="rerank-multilingual-v3.0",
             cohere_api_key=cohere.api_key,
+            base_url=cohere.base_url,
             top_n=rag_settings.top_n,
         )
 
-        class RAGWithSources:
-            def invoke(self, question: str) -> ChatResponse:
-                docs = retriever.invoke(question)
-                if not docs:
-                    return ChatResponse(
-                        answer="Je ne sais pas. Aucun document pertinent trouvé.",
-                        sources=[],
-                        rag_version=rag_settings.rag_version,
-                    )
-                # CohereRerank.compress_documents(query, documents) retourne les docs rerankés
-                top_docs = rerank.compress_documents(question, docs)
-                context = _format_docs(top_docs)
-                result = prompt.invoke({"context": context, "question": question})
-                answer = llm.invoke(result).content
-                return ChatResponse(
-                    answer=answer or "Je ne sais pas.",
-                    sources=_docs_to_sources(top_docs),
-                    rag_version=rag_settings.rag_version,
-                )
-
-        return RAGWithSources()
-
-    # Sans rerank : on doit quand même récupérer les docs pour les sources
-    class RAGWithSources:
-        def invoke(self, question: str) -> ChatResponse:
-            docs = retriever.invoke(question)
-            context = _format_docs(docs)
-            if not context.strip():
-                return ChatResponse(
-                    answer="Je ne sais pas. Aucun document pertinent trouvé.",
-                    sources=[],
-                    rag_version=rag_settings.rag_version,
-                )
-            result = prompt.invoke({"context": context, "question": question})
-            answer = llm.invoke(result).content
-            return ChatResponse(
-                answer=answer or "Je ne sais pas.",
-                sources=_docs_to_sources(docs),
-                rag_version=rag_settings.rag_version,
-            )
+    # Politique de rerank adaptatif (PRD latence) : rerank sauté quand le top dense domine
+    rerank_policy = None
+    if rerank is not None and rag_settings.rerank_policy == "adaptive":
+        rerank_policy = RerankPolicy(
+            min_margin=rag_settings.rerank_skip_min_margin,
+            max_entropy=rag_settings.rerank_skip_max_entropy,
+            score_window=rag_settings.rerank_score_window,
+        )
 
-    return RAGWithSources()
+    return RAGWithSources(
+        retriever=retriever,
+        prompt=prompt,
+        llm=llm,
+        rag_settings=rag_settings,
+        rerank=rerank,
+        rerank_policy=rerank_policy,
+        page_collection=resolve_page_collection(
+            retriever.vectorstore.client, qdrant.collection_name, rag_settings
+        ),
+        llm_router=llm_router,
+    )
@@ -0,0 +1,41 @@
+"""
+Trace d'une requête RAG : durée de chaque étape (embed, search, rerank, prompt, llm),
+tokens LLM et décisions des politiques adaptatives (ex. rerank → skip).
+Renseignée par RAGWithSources, lue par l'éval et les métriques.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+STAGES = ("embed", "search", "rerank", "prompt", "llm")
+
+
+class RequestTrace:
+    """Accumule les durées par étape (ms) et les tokens LLM d'une requête."""
+
+    def __init__(self) -> None:
+        self.stages_ms: dict[str, float] = {}
+        self.tokens_in = 0
+        self.tokens_out = 0
+        # Politique → choix retenu pour cette requête
+        self.decisions: dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stages_ms[name] = self.stages_ms.get(name, 0.0) + elapsed_ms
+
+    def record_llm_usage(self, message: object) -> None:
+        """Tokens entrée/sortie depuis usage_metadata (AIMessage LangChain), si fourni."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        self.tokens_in += int(usage.get("input_tokens", 0))
+        self.tokens_out += int(usage.get("output_tokens", 0))
+
+    def total_ms(self) -> float:
+        return sum(self.stages_ms.values())
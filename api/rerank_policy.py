@@ -0,0 +1,50 @@
+"""
+Politique de rerank adaptatif : décide par requête si le rerank Cohere est utile, d'après
+la distribution des scores denses bruts (cosinus, avant MMR) des meilleurs candidats.
+Distribution piquée (marge top-1 nette et entropie faible) → le top dense est fiable,
+rerank sauté et MMR sur les score_window meilleurs candidats seulement ; sinon rerank sur tout
+le pool de candidats.
+"""
+from __future__ import annotations
+
+import math
+
+# Température du softmax sur les cosinus (écarts de ~0.05 significatifs pour Cohere embed v3)
+_ENTROPY_TEMPERATURE = 0.05
+
+
+def top1_margin(scores: list[float]) -> float:
+    """Écart entre le meilleur score et le second (inf si un seul candidat)."""
+    ranked = sorted(scores, reverse=True)
+    return ranked[0] - ranked[1] if len(ranked) > 1 else math.inf
+
+
+def normalized_entropy(scores: list[float], temperature: float = _ENTROPY_TEMPERATURE) -> float:
+    """Entropie du softmax des scores, ramenée à [0, 1] (0 = un seul candidat dominant)."""
+    if len(scores) < 2:
+        return 0.0
+    top = max(scores)
+    weights = [math.exp((s - top) / temperature) for s in scores]
+    total = sum(weights)
+    entropy = -sum(w / total * math.log(w / total) for w in weights if w > 0)
+    return entropy / math.log(len(scores))
+
+
+class RerankPolicy:
+    """Saute le rerank si la marge top-1 atteint min_margin et l'entropie reste sous max_entropy."""
+
+    def __init__(self, min_margin: float, max_entropy: float, score_window: int) -> None:
+        self.min_margin = min_margin
+        self.max_entropy = max_entropy
+        # Meilleurs scores denses examinés (le reste du pool n'influe pas sur la décision)
+        self.score_window = score_window
+
+    def should_skip(self, scores: list[float]) -> bool:
+        """scores : cosinus denses triés par score décroissant."""
+        scores = scores[: self.score_window]
+        if not scores:
+            return False
+        return (
+            top1_margin(scores) >= self.min_margin
+            and normalized_entropy(scores) <= self.max_entropy
+        )
@@ -0,0 +1,101 @@
+"""
+Contexte de conversation côté serveur : par session, un working set des derniers chunks
+retrouvés (document + vecteur dense). Une question de suivi est servie depuis ce working set
+si elle y trouve un chunk assez proche ; sinon retour à Qdrant et le working set est enrichi.
+Sessions bornées en nombre (LRU) et expirées après inactivité (TTL).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class WorkingSet:
+    """Chunks récemment retrouvés d'une session (LRU borné à max_chunks)."""
+
+    def __init__(self, max_chunks: int, min_score: float) -> None:
+        self._max_chunks = max_chunks
+        self._min_score = min_score
+        self._lock = threading.Lock()
+        self._chunks: OrderedDict[Hashable, tuple[Document, np.ndarray]] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._chunks)
+
+    def match(self, query_vector: list[float], k: int) -> list[Document] | None:
+        """
+        Les k chunks les plus proches (cosinus) si le meilleur atteint min_score, sinon None
+        (working set vide ou trop éloigné de la question : recherche Qdrant nécessaire).
+        """
+        with self._lock:
+            if not self._chunks:
+                return None
+            ids = list(self._chunks)
+            matrix = np.stack([vector for _, vector in self._chunks.values()])
+            query = np.asarray(query_vector, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+            scores = matrix @ query / (norms + 1e-12)
+            order = np.argsort(-scores)[:k]
+            if scores[order[0]] < self._min_score:
+                return None
+            for i in order:
+                self._chunks.move_to_end(ids[i])
+            return [self._chunks[ids[i]][0] for i in order]
+
+    def add(self, docs: list[Document], vectors: list[list[float]]) -> None:
+        with self._lock:
+            for doc, vector in zip(docs, vectors):
+                key = doc.metadata.get("_id", id(doc))
+                self._chunks[key] = (doc, np.asarray(vector, dtype=np.float32))
+                self._chunks.move_to_end(key)
+            while len(self._chunks) > self._max_chunks:
+                self._chunks.popitem(last=False)
+
+
+class SessionStore:
+    """Working sets par session : LRU borné à max_sessions, expiration après ttl_s d'inactivité."""
+
+    def __init__(
+        self,
+        max_sessions: int,
+        ttl_s: float,
+        max_chunks: int,
+        min_score: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_sessions = max_sessions
+        self._ttl_s = ttl_s
+        self._max_chunks = max_chunks
+        self._min_score = min_score
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[Hashable, tuple[WorkingSet, float]] = OrderedDict()
+
+    def get(self, key: Hashable) -> WorkingSet:
+        """Working set de la session (créé si absent ou expiré)."""
+        now = self._clock()
+        with self._lock:
+            for expired in [
+                k for k, (_, used_at) in self._sessions.items() if now - used_at > self._ttl_s
+            ]:
+                del self._sessions[expired]
+            entry = self._sessions.get(key)
+            if entry is not None:
+                working_set = entry[0]
+            else:
+                working_set = WorkingSet(self._max_chunks, self._min_score)
+            self._sessions[key] = (working_set, now)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+            return working_set
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1 @@
+# bench — micro-benchmarks de performance (Qdrant, démarrage, mémoire)
@@ -0,0 +1,159 @@
+"""
+Benchmark cold start : temps d'import (python -X importtime) et temps jusqu'à la première réponse
+des points d'entrée api.main (GET /health via uvicorn) et offline.run_ingest (--help).
+Chaque mesure tourne dans un process neuf ; médiane sur --runs exécutions.
+Usage : uv run python -m bench.cold_start [--runs 5] [--max-import-ms 1500]
+    [--output bench_cold_start.json]
+--max-import-ms : code de sortie 1 si un import dépasse le seuil (détection de régression en CI).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ("api.main", "offline.run_ingest")
+
+
+def _importtime(module: str) -> list[tuple[int, int, str]]:
+    """Lignes de python -X importtime : (self µs, cumulé µs, module indenté par profondeur)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()[1:]))
+    return rows
+
+
+def import_ms(module: str) -> tuple[float, list[tuple[str, float]]]:
+    """Temps d'import cumulé du module (ms) et ses 10 dépendances directes les plus lourdes."""
+    rows = _importtime(module)
+    total = next(cum for _, cum, name in reversed(rows) if name.strip() == module)
+    # Dépendances directes : profondeur 1 (deux espaces d'indentation)
+    direct = [
+        (name.strip(), cum / 1000)
+        for _, cum, name in rows
+        if name.startswith("  ") and not name.startswith("   ")
+    ]
+    return total / 1000, sorted(direct, key=lambda item: -item[1])[:10]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def api_first_response_ms(timeout_s: float = 60.0) -> float:
+    """Lancement de uvicorn jusqu'au premier GET /health en 200 (lifespan / warm-up inclus)."""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ],
+        cwd=_REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout_s:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"api.main : pas de réponse sur /health en {timeout_s}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def ingest_first_response_ms() -> float:
+    """offline.run_ingest --help : démarrage du CLI jusqu'à sa première sortie."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "offline.run_ingest", "--help"],
+        cwd=_REPO_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Cold start : temps d'import et première réponse")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=None,
+        help="Seuil de régression sur le temps d'import",
+    )
+    p.add_argument(
+        "--skip-api-server",
+        action="store_true",
+        help="Ne pas lancer uvicorn (import seul pour api.main)",
+    )
+    p.add_argument("--output", default=None, help="Écrire les résultats en JSON")
+    args = p.parse_args()
+
+    results: dict[str, dict] = {}
+    for module in MODULES:
+        timings = [import_ms(module) for _ in range(args.runs)]
+        results[module] = {
+            "import_ms": statistics.median(t for t, _ in timings),
+            "heaviest_imports_ms": dict(timings[-1][1]),
+        }
+    if not args.skip_api_server:
+        results["api.main"]["first_response_ms"] = statistics.median(
+            api_first_response_ms() for _ in range(args.runs)
+        )
+    results["offline.run_ingest"]["first_response_ms"] = statistics.median(
+        ingest_first_response_ms() for _ in range(args.runs)
+    )
+
+    print(f"médiane sur {args.runs} process neufs")
+    print("module\timport_ms\tfirst_response_ms")
+    for module, r in results.items():
+        first = r.get("first_response_ms")
+        print(f"{module}\t{r['import_ms']:.0f}\t{'-' if first is None else f'{first:.0f}'}")
+        for name, ms in r["heaviest_imports_ms"].items():
+            print(f"  {name}\t{ms:.0f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.max_import_ms is not None:
+        over = [m for m, r in results.items() if r["import_ms"] > args.max_import_ms]
+        if over:
+            print(f"Régression : import > {args.max_import_ms:.0f} ms pour {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark mémoire de l'ingestion : pic de RSS du découpage + matérialisation pour l'upsert,
+Documents LangChain par chunk (ancien chemin) vs chunks compacts (offline.chunk_records).
+Pages synthétiques, pas d'appel Notion/Cohere/Qdrant ; chaque mode tourne dans un process neuf.
+Usage : uv run python -m bench.ingest_memory [--pages 5000] [--page-chars 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from langchain_core.documents import Document  # noqa: E402
+
+from offline.chunk_records import materialize_batches  # noqa: E402
+from offline.pipeline import UPSERT_BATCH_SIZE, build_text_splitter, prepare_chunk_records  # noqa: E402
+from shared.config import RAGPipelineSettings  # noqa: E402
+
+MODES = ("documents", "records")
+
+
+def _pages(count: int, page_chars: int) -> list[Document]:
+    sentence = "Les congés se posent dans l'outil RH après validation du manager. "
+    body = (sentence * (page_chars // len(sentence) + 1))[:page_chars]
+    return [
+        Document(
+            # Texte distinct par page (pas de partage de chaîne entre pages)
+            page_content=f"# Page {i}\n\n{body}{i}",
+            metadata={
+                "page_id": f"page-{i}",
+                "title": f"Page {i} — politique et procédures",
+                "source_url": f"https://www.notion.so/page{i:032d}",
+                "last_edited_time": "2025-06-01T10:00:00.000Z",
+                "ancestor_ids": [f"root-{i % 10}", f"section-{i % 100}"],
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def _legacy_chunks(documents: list[Document], settings: RAGPipelineSettings) -> list[Document]:
+    """Ancien chemin : split_documents (texte copié + dict de métadonnées par chunk)."""
+    splitter = build_text_splitter(settings)
+    chunks: list[Document] = []
+    for doc in documents:
+        for i, sub in enumerate(splitter.split_documents([doc])):
+            sub.metadata["chunk_index"] = i
+            chunks.append(sub)
+    return chunks
+
+
+def _run(mode: str, pages: int, page_chars: int) -> None:
+    """Exécuté dans le process enfant : imprime le nombre de chunks et le pic de RSS (Mo)."""
+    settings = RAGPipelineSettings()
+    documents = _pages(pages, page_chars)
+    if mode == "documents":
+        # add_documents(chunks) reçoit la liste complète : tous les Documents vivants à l'upsert
+        count = len(_legacy_chunks(documents, settings))
+    else:
+        records = prepare_chunk_records(documents, build_text_splitter(settings))
+        del documents
+        count = len(records)
+        for _batch in materialize_batches(records, UPSERT_BATCH_SIZE):
+            pass
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    print(f"{count}\t{peak_mb:.1f}")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Pic de RSS : Documents par chunk vs chunks compacts")
+    p.add_argument("--pages", type=int, default=5000)
+    p.add_argument("--page-chars", type=int, default=20000)
+    p.add_argument("--mode", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.mode:
+        _run(args.mode, args.pages, args.page_chars)
+        return
+
+    print(f"{args.pages} pages × {args.page_chars} caractères")
+    print("mode\tchunks\tpeak_rss_mb")
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.ingest_memory", "--mode", mode,
+             "--pages", str(args.pages), "--page-chars", str(args.page_chars)],
+            cwd=_REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        print(f"{mode}\t{out.stdout.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Load test de POST /chat sans crédit Cohere/Mistral : api.main:app (uvicorn) servi contre des
+fournisseurs factices (bench.provider_stubs : embed/rerank Cohere, chat Mistral à latence par
+token configurable) et un Qdrant serveur (--qdrant-url, défaut http://localhost:6333, ex.
+`just qdrant-bench`) amorcé avec des chunks synthétiques. Pour chaque niveau de concurrence :
+RPS, p50/p95/p99 et taux d'erreur. Sert à dimensionner la concurrence Cloud Run et le nombre
+d'instances. --embedded-qdrant (index Python en process, recherche exhaustive liée au CPU de l'API)
+ne sert qu'aux essais rapides : résultats étiquetés "embedded", non représentatifs de la production.
+Usage : uv run python -m bench.load_test [--concurrency 1,8,32] [--duration 30] [--llm-token-ms 15]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import httpx  # noqa: E402
+from qdrant_client import models as qm  # noqa: E402
+
+from bench.provider_stubs import EMBED_DIM, embed_text  # noqa: E402
+from offline.pipeline import ensure_collection  # noqa: E402
+from shared.config import QdrantSettings  # noqa: E402
+from shared.latency import summarize  # noqa: E402
+from shared.qdrant import build_qdrant_client  # noqa: E402
+
+COLLECTION = "rag_load_test"
+TOPICS = (
+    "congés", "télétravail", "notes de frais", "onboarding", "astreinte", "mutuelle",
+    "déploiement", "revue de code", "incident", "VPN", "support client", "facturation",
+)
+TEMPLATES = (
+    "Quelle est la procédure pour {topic} ?",
+    "Qui contacter au sujet de {topic} ?",
+    "Où trouver la documentation sur {topic} et {other} ?",
+    "Comment fonctionne {topic} pour un nouvel arrivant ?",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_http(url: str, proc: subprocess.Popen, timeout_s: float = 120.0) -> None:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout_s:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} : process terminé (code {proc.returncode})")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"{url} : pas de réponse 200 en {timeout_s}s")
+
+
+def _wait_qdrant(url: str, timeout_s: float = 10.0) -> None:
+    """Qdrant serveur joignable, sinon erreur explicite (démarrage : just qdrant-bench)."""
+    start = time.perf_counter()
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url.rstrip('/')}/readyz", timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            pass
+        if time.perf_counter() - start > timeout_s:
+            raise SystemExit(
+                f"Qdrant injoignable sur {url} : lancer `just qdrant-bench`, passer --qdrant-url, "
+                "ou --embedded-qdrant (non représentatif)"
+            )
+        time.sleep(0.5)
+
+
+def _uvicorn(app: str, port: int, env: dict[str, str], log, workers: int = 1) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=_REPO_ROOT,
+        env={**os.environ, **env},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def seed_corpus(settings: QdrantSettings, pages: int, chunks_per_page: int) -> int:
+    """Collection COLLECTION recréée, chunks synthétiques (vecteurs = embeddings du stub)."""
+    client = build_qdrant_client(settings)
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    ensure_collection(client, COLLECTION, EMBED_DIM)
+    rng = random.Random(0)
+    texts, payloads = [], []
+    for page in range(pages):
+        topic = TOPICS[page % len(TOPICS)]
+        for chunk in range(chunks_per_page):
+            text = (
+                f"Page {page} — {topic}. Procédure {chunk} : pour {topic}, contacter l'équipe "
+                f"{rng.choice(TOPICS)} puis suivre la documentation interne. " * 4
+            )
+            texts.append(text)
+            payloads.append({
+                "page_content": text,
+                "metadata": {
+                    "page_id": f"page-{page}",
+                    "title": f"{topic.capitalize()} ({page})",
+                    "source_url": f"https://www.notion.so/page{page:032d}",
+                    "last_edited_time": "2025-06-01T10:00:00.000Z",
+                    "chunk_index": chunk,
+                },
+            })
+    batch = 256
+    for start in range(0, len(texts), batch):
+        client.upsert(
+            COLLECTION,
+            points=qm.Batch(
+                ids=list(range(start, min(start + batch, len(texts)))),
+                vectors=[embed_text(t) for t in texts[start:start + batch]],
+                payloads=payloads[start:start + batch],
+            ),
+        )
+    # Mode embarqué : libère le verrou du répertoire avant le démarrage de l'API
+    client.close()
+    return len(texts)
+
+
+def _question(rng: random.Random) -> str:
+    topic, other = rng.sample(TOPICS, 2)
+    # Suffixe aléatoire : pas de coalescence single-flight entre requêtes concurrentes
+    return (
+        rng.choice(TEMPLATES).format(topic=topic, other=other) + f" (réf. {rng.randrange(10**6)})"
+    )
+
+
+async def run_level(base_url: str, concurrency: int, duration_s: float, seed: int) -> dict:
+    """concurrency clients en boucle fermée pendant duration_s : RPS, percentiles, erreurs."""
+    rng = random.Random(seed)
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    deadline = time.perf_counter() + duration_s
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.post("/chat", json={"question": _question(rng)})
+                    status = str(resp.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                statuses[status] += 1
+                if status == "200":
+                    latencies.append(elapsed_ms)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed_s = time.perf_counter() - start
+
+    total = sum(statuses.values())
+    errors = total - statuses["200"]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "rps": statuses["200"] / elapsed_s,
+        "latency_ms": summarize(latencies),
+        "error_rate": errors / total if total else 0.0,
+        "statuses": dict(statuses),
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Load test POST /chat contre des fournisseurs factices")
+    p.add_argument(
+        "--concurrency", default="1,8,32", help="Niveaux de concurrence (séparés par des virgules)"
+    )
+    p.add_argument("--duration", type=float, default=30.0, help="Durée de chaque niveau (s)")
+    p.add_argument("--warmup-requests", type=int, default=5)
+    p.add_argument("--pages", type=int, default=200)
+    p.add_argument("--chunks-per-page", type=int, default=10)
+    p.add_argument(
+        "--qdrant-url",
+        default="http://localhost:6333",
+        help="Qdrant serveur (ex: just qdrant-bench)",
+    )
+    p.add_argument("--qdrant-api-key", default=None)
+    p.add_argument(
+        "--embedded-qdrant",
+        action="store_true",
+        help="Index embarqué temporaire dans le process de l'API "
+        "(non représentatif de la production)",
+    )
+    p.add_argument(
+        "--api-workers", type=int, default=1, help="Workers uvicorn (> 1 : Qdrant serveur requis)"
+    )
+    p.add_argument(
+        "--rerank", action="store_true", help="Activer le rerank (RAG_RERANK_ENABLED=true)"
+    )
+    p.add_argument("--embed-ms", type=float, default=30.0, help="Latence du stub embed")
+    p.add_argument("--rerank-ms", type=float, default=60.0, help="Latence du stub rerank")
+    p.add_argument(
+        "--llm-ttft-ms", type=float, default=300.0, help="Délai avant premier token du stub Mistral"
+    )
+    p.add_argument(
+        "--llm-token-ms", type=float, default=15.0, help="Délai par token de sortie du stub Mistral"
+    )
+    p.add_argument("--llm-output-tokens", type=int, default=120)
+    p.add_argument("--output", default=None, help="Écrire les résultats en JSON")
+    p.add_argument(
+        "--api-log", default=None, help="Fichier recevant les logs de l'API et des stubs"
+    )
+    args = p.parse_args()
+    if args.api_workers > 1 and args.embedded_qdrant:
+        p.error(
+            "--api-workers > 1 : l'index embarqué n'accepte qu'un process, "
+            "utiliser un Qdrant serveur"
+        )
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    qdrant_mode = "embedded" if args.embedded_qdrant else "server"
+
+    tmp = tempfile.TemporaryDirectory(prefix="rag_load_test_")
+    if args.embedded_qdrant:
+        qdrant_env = {"QDRANT_LOCAL_PATH": tmp.name}
+        qdrant = QdrantSettings(url=None, local_path=tmp.name)
+    else:
+        _wait_qdrant(args.qdrant_url)
+        # QDRANT_LOCAL_PATH vide : un index embarqué configuré dans .env
+        # ne prend pas le pas sur l'URL
+        qdrant_env = {
+            "QDRANT_URL": args.qdrant_url,
+            "QDRANT_LOCAL_PATH": "",
+            "QDRANT_API_KEY": args.qdrant_api_key or "",
+        }
+        qdrant = QdrantSettings(url=args.qdrant_url, local_path=None, api_key=args.qdrant_api_key)
+    chunks = seed_corpus(qdrant, args.pages, args.chunks_per_page)
+
+    stubs_port, api_port = _free_port(), _free_port()
+    log = open(args.api_log, "w", encoding="utf-8") if args.api_log else subprocess.DEVNULL
+    stubs = _uvicorn("bench.provider_stubs:app", stubs_port, {
+        "STUB_EMBED_LATENCY_MS": str(args.embed_ms),
+        "STUB_RERANK_LATENCY_MS": str(args.rerank_ms),
+        "STUB_LLM_TTFT_MS": str(args.llm_ttft_ms),
+        "STUB_LLM_TOKEN_MS": str(args.llm_token_ms),
+        "STUB_LLM_OUTPUT_TOKENS": str(args.llm_output_tokens),
+    }, log)
+    stubs_url = f"http://127.0.0.1:{stubs_port}"
+    api = None
+    try:
+        _wait_http(f"{stubs_url}/docs", stubs)
+        api = _uvicorn("api.main:app", api_port, {
+            **qdrant_env,
+            "QDRANT_COLLECTION_NAME": COLLECTION,
+            "COHERE_API_KEY": "stub",
+            "COHERE_BASE_URL": stubs_url,
+            "MISTRAL_API_KEY": "stub",
+            "MISTRAL_BASE_URL": f"{stubs_url}/v1",
+            "MISTRAL_MAX_TOKENS": str(args.llm_output_tokens),
+            "RAG_RERANK_ENABLED": str(args.rerank).lower(),
+            "API_RATE_LIMIT_CHAT": "1000000/minute",
+            "ANSWER_CACHE_ENABLED": "false",
+            "LANGSMITH_TRACING": "false",
+        }, log, workers=args.api_workers)
+        api_url = f"http://127.0.0.1:{api_port}"
+        _wait_http(f"{api_url}/ready", api)
+        for i in range(args.warmup_requests):
+            httpx.post(f"{api_url}/chat", json={"question": f"chauffe {i}"}, timeout=60.0)
+
+        results = [asyncio.run(run_level(api_url, c, args.duration, seed=c)) for c in levels]
+    finally:
+        for proc in (api, stubs):
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+        if args.api_log:
+            log.close()
+        tmp.cleanup()
+
+    if args.embedded_qdrant:
+        print("ATTENTION : Qdrant embarqué (recherche Python dans le process de l'API), "
+              "chiffres non représentatifs de la production")
+    print(
+        f"{chunks} chunks, Qdrant {qdrant_mode}, {args.api_workers} worker(s) API, "
+        f"rerank={args.rerank}, LLM {args.llm_ttft_ms:.0f} ms + "
+        f"{args.llm_output_tokens} × {args.llm_token_ms:.0f} ms/token"
+    )
+    print("concurrency\trequests\trps\tp50_ms\tp95_ms\tp99_ms\terror_rate")
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"{r['concurrency']}\t{r['requests']}\t{r['rps']:.1f}\t{lat['p50']:.0f}\t{lat['p95']:.0f}"
+              f"\t{lat['p99']:.0f}\t{r['error_rate']:.1%}")
+        if r["error_rate"]:
+            print(f"  statuts : {r['statuses']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "chunks": chunks,
+                    "qdrant_mode": qdrant_mode,
+                    "args": vars(args),
+                    "levels": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark : recherche sur Qdrant distant (REST, gRPC) vs index embarqué exporté
+(offline.export_local, QdrantClient(path=...)). Même collection, mêmes requêtes.
+Usage : uv run python -m bench.local_index [--url http://localhost:6333] [--points 20000]
+    [--queries 500]
+Qdrant local : docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+from bench.qdrant_transport import COLLECTION, VECTOR_SIZE, bench_search, seed_collection  # noqa: E402
+from offline.export_local import export_local_index  # noqa: E402
+from shared.config import QdrantSettings  # noqa: E402
+from shared.latency import summarize  # noqa: E402
+from shared.qdrant import build_qdrant_client  # noqa: E402
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Qdrant distant vs index embarqué (latence de recherche)"
+    )
+    p.add_argument("--url", default="http://localhost:6333")
+    p.add_argument("--points", type=int, default=20000)
+    p.add_argument("--queries", type=int, default=500)
+    p.add_argument("--top-k", type=int, default=20)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(42)
+    rest = QdrantSettings(url=args.url, prefer_grpc=False)
+    grpc = QdrantSettings(url=args.url, prefer_grpc=True)
+    remote = seed_collection(rest, args.points, rng)
+    queries = rng.standard_normal((args.queries, VECTOR_SIZE)).astype(np.float32)
+    local_dir = tempfile.mkdtemp(prefix="bench_local_index_")
+    export_local_index(remote, COLLECTION, local_dir)
+    embedded = QdrantSettings(local_path=local_dir)
+
+    print(f"{args.points} points, {args.queries} requêtes, top_k={args.top_k}")
+    print("mode\tp50_ms\tp95_ms\tp99_ms\tmean_ms")
+    try:
+        for name, settings in (("rest", rest), ("grpc", grpc), ("embedded", embedded)):
+            client = build_qdrant_client(settings)
+            stats = summarize(bench_search(client, queries, args.top_k))
+            client.close()
+            print(f"{name}\t{stats['p50']:.2f}\t{stats['p95']:.2f}\t{stats['p99']:.2f}\t{stats['mean']:.2f}")
+    finally:
+        remote.delete_collection(COLLECTION)
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Serveur factice des fournisseurs pour le load test : mêmes routes et formats de réponse que
+Cohere (POST /v1/embed, POST /v2/rerank) et Mistral (POST /v1/chat/completions).
+Embeddings déterministes (hash des tokens), rerank par recouvrement de tokens, génération
+simulée : délai avant premier token + délai par token de sortie.
+Latences configurables par variables d'environnement (STUB_*), ex. :
+  STUB_EMBED_LATENCY_MS=30 STUB_LLM_TTFT_MS=300 STUB_LLM_TOKEN_MS=15 \\
+    uv run uvicorn bench.provider_stubs:app --port 8100
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+
+import numpy as np
+from fastapi import FastAPI, Request
+
+# embed-multilingual-v3.0
+EMBED_DIM = 1024
+_TOKEN = re.compile(r"\w+")
+
+
+def _env_ms(name: str, default: float) -> float:
+    return float(os.environ.get(name, default)) / 1000
+
+
+EMBED_LATENCY_S = _env_ms("STUB_EMBED_LATENCY_MS", 30)
+RERANK_LATENCY_S = _env_ms("STUB_RERANK_LATENCY_MS", 60)
+LLM_TTFT_S = _env_ms("STUB_LLM_TTFT_MS", 300)
+LLM_TOKEN_S = _env_ms("STUB_LLM_TOKEN_MS", 15)
+LLM_OUTPUT_TOKENS = int(os.environ.get("STUB_LLM_OUTPUT_TOKENS", 120))
+
+
+def embed_text(text: str, dim: int = EMBED_DIM) -> list[float]:
+    """Vecteur déterministe normalisé : somme de vecteurs pseudo-aléatoires par token."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in _TOKEN.findall(text.lower()) or [text]:
+        seed = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        vector += np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / (np.linalg.norm(vector) + 1e-12)).tolist()
+
+
+def _overlap(query: str, document: str) -> float:
+    q, d = set(_TOKEN.findall(query.lower())), set(_TOKEN.findall(document.lower()))
+    return len(q & d) / len(q) if q else 0.0
+
+
+def _rerank_text(document: str | dict) -> str:
+    return document.get("text", "") if isinstance(document, dict) else document
+
+
+app = FastAPI(title="Provider stubs (load test)")
+
+
+@app.post("/v1/embed")
+async def embed(request: Request) -> dict:
+    body = await request.json()
+    texts = body.get("texts") or []
+    await asyncio.sleep(EMBED_LATENCY_S)
+    vectors = [embed_text(t) for t in texts]
+    # embedding_types demandé (langchain-cohere) : réponse embeddings_by_type
+    types = body.get("embedding_types")
+    return {
+        "id": str(uuid.uuid4()),
+        "response_type": "embeddings_by_type" if types else "embeddings_floats",
+        "embeddings": {t: vectors for t in types} if types else vectors,
+        "texts": texts,
+        "meta": {
+            "api_version": {"version": "1"},
+            "billed_units": {"input_tokens": sum(len(t) // 4 for t in texts)},
+        },
+    }
+
+
+@app.post("/v2/rerank")
+async def rerank(request: Request) -> dict:
+    body = await request.json()
+    query = body.get("query", "")
+    documents = [_rerank_text(d) for d in body.get("documents") or []]
+    await asyncio.sleep(RERANK_LATENCY_S)
+    scored = sorted(
+        ((i, _overlap(query, doc)) for i, doc in enumerate(documents)), key=lambda item: -item[1]
+    )[: body.get("top_n") or len(documents)]
+    return {
+        "id": str(uuid.uuid4()),
+        "results": [{"index": i, "relevance_score": score} for i, score in scored],
+        "meta": {"api_version": {"version": "2"}, "billed_units": {"search_units": 1}},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request) -> dict:
+    body = await request.json()
+    prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages") or [])
+    output_tokens = min(LLM_OUTPUT_TOKENS, body.get("max_tokens") or LLM_OUTPUT_TOKENS)
+    await asyncio.sleep(LLM_TTFT_S + output_tokens * LLM_TOKEN_S)
+    return {
+        "id": str(uuid.uuid4()),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(["réponse"] * output_tokens)},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        },
+    }
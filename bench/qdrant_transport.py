@@ -0,0 +1,94 @@
+"""
+Micro-benchmark : latence de recherche Qdrant en REST vs gRPC sur un Qdrant local.
+Crée une collection temporaire de vecteurs aléatoires, mesure N recherches par transport.
+Usage : uv run python -m bench.qdrant_transport [--url http://localhost:6333] [--points 20000]
+    [--queries 500]
+Qdrant local : docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import numpy as np  # noqa: E402
+from qdrant_client import QdrantClient  # noqa: E402
+from qdrant_client.http import models as qm  # noqa: E402
+
+from shared.config import QdrantSettings  # noqa: E402
+from shared.latency import summarize  # noqa: E402
+from shared.qdrant import build_qdrant_client  # noqa: E402
+
+COLLECTION = "bench_transport"
+VECTOR_SIZE = 1024  # Cohere embed-multilingual-v3.0
+
+
+def seed_collection(
+    settings: QdrantSettings, points: int, rng: np.random.Generator
+) -> QdrantClient:
+    """Collection COLLECTION recréée : `points` vecteurs aléatoires, payloads de taille réaliste."""
+    client = build_qdrant_client(settings)
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        COLLECTION,
+        vectors_config=qm.VectorParams(size=VECTOR_SIZE, distance=qm.Distance.COSINE),
+    )
+    batch = 1000
+    for start in range(0, points, batch):
+        vectors = rng.standard_normal((min(batch, points - start), VECTOR_SIZE)).astype(np.float32)
+        client.upsert(
+            COLLECTION,
+            points=qm.Batch(
+                ids=list(range(start, start + len(vectors))),
+                vectors=vectors.tolist(),
+                payloads=[
+                    {"page_content": "x" * 400, "metadata": {"page_id": str(i)}}
+                    for i in range(len(vectors))
+                ],
+            ),
+        )
+    return client
+
+
+def bench_search(client: QdrantClient, queries: np.ndarray, top_k: int) -> list[float]:
+    """Latences (ms) de recherche top_k avec payload, après un appel de chauffe."""
+    # Premier appel hors mesure (connexion, handshake)
+    client.query_points(COLLECTION, query=queries[0].tolist(), limit=top_k, with_payload=True)
+    timings: list[float] = []
+    for q in queries:
+        start = time.perf_counter()
+        client.query_points(COLLECTION, query=q.tolist(), limit=top_k, with_payload=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Qdrant REST vs gRPC (latence de recherche)")
+    p.add_argument("--url", default="http://localhost:6333")
+    p.add_argument("--points", type=int, default=20000)
+    p.add_argument("--queries", type=int, default=500)
+    p.add_argument("--top-k", type=int, default=20)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(42)
+    rest = QdrantSettings(url=args.url, prefer_grpc=False)
+    grpc = QdrantSettings(url=args.url, prefer_grpc=True)
+    seed_collection(rest, args.points, rng)
+    queries = rng.standard_normal((args.queries, VECTOR_SIZE)).astype(np.float32)
+
+    print(f"{args.points} points, {args.queries} requêtes, top_k={args.top_k}")
+    print("transport\tp50_ms\tp95_ms\tp99_ms\tmean_ms")
+    for name, settings in (("rest", rest), ("grpc", grpc)):
+        stats = summarize(bench_search(build_qdrant_client(settings), queries, args.top_k))
+        print(f"{name}\t{stats['p50']:.2f}\t{stats['p95']:.2f}\t{stats['p99']:.2f}\t{stats['mean']:.2f}")
+    build_qdrant_client(rest).delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
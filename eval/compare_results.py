@@ -5,8 +5,69 @@ Usage : uv run python -m eval.compare_results results_a.json results_b.json
 from __future__ import annotations
 
 import json
+import os
 import sys
 
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from api.request_trace import STAGES  # noqa: E402
+from shared.latency import summarize  # noqa: E402
+
+
+def _jaccard(a: list[str], b: list[str]) -> float:
+    """Recouvrement des pages sources entre deux runs (1.0 = mêmes pages)."""
+    sa, sb = set(a), set(b)
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def _avg(values: list[float]) -> float:
+    return sum(values) / len(values) if values else 0
+
+
+def _stage_values(results: list[dict], stage: str) -> list[float]:
+    if stage == "total":
+        return [r["latency_ms"] for r in results if "latency_ms" in r]
+    return [r["stages_ms"][stage] for r in results if stage in r.get("stages_ms", {})]
+
+
+def print_latency_deltas(a: list[dict], b: list[dict]) -> None:
+    """p50/p95/p99 par étape pour A et B, et delta B - A (ms)."""
+    version_a = a[0].get("rag_version", "?") if a else "?"
+    version_b = b[0].get("rag_version", "?") if b else "?"
+    print(f"\nLatence (ms) A={version_a} B={version_b}")
+    print("stage\tp50_a\tp50_b\tΔp50\tp95_a\tp95_b\tΔp95\tp99_a\tp99_b\tΔp99")
+    for stage in ("total", *STAGES):
+        values_a, values_b = _stage_values(a, stage), _stage_values(b, stage)
+        if not values_a and not values_b:
+            continue
+        sa, sb = summarize(values_a), summarize(values_b)
+        cells = []
+        for q in ("p50", "p95", "p99"):
+            cells.append(f"{sa[q]:.0f}\t{sb[q]:.0f}\t{sb[q] - sa[q]:+.0f}")
+        print(f"{stage}\t" + "\t".join(cells))
+    tokens_a = _avg([r.get("tokens_in", 0) + r.get("tokens_out", 0) for r in a])
+    tokens_b = _avg([r.get("tokens_in", 0) + r.get("tokens_out", 0) for r in b])
+    print(f"Avg tokens A: {tokens_a:.0f}  B: {tokens_b:.0f}")
+
+
+def skip_rate(results: list[dict], policy: str = "rerank") -> float | None:
+    """Part des requêtes où la politique a choisi skip (None si la politique n'a pas décidé)."""
+    choices = [r["decisions"][policy] for r in results if policy in r.get("decisions", {})]
+    if not choices:
+        return None
+    return choices.count("skip") / len(choices)
+
+
+def choice_shares(results: list[dict], policy: str) -> dict[str, float]:
+    """Répartition des choix d'une politique (ex. llm_route : fast / primary / fallback)."""
+    choices = [r["decisions"][policy] for r in results if policy in r.get("decisions", {})]
+    return {c: choices.count(c) / len(choices) for c in sorted(set(choices))}
+
+
 def main() -> None:
     if len(sys.argv) != 3:
         print("Usage: compare_results.py <results_a.json> <results_b.json>")
@@ -28,6 +89,22 @@ def main() -> None:
     avg_sources_a = sum(r.get("sources_count", 0) for r in a) / len(a) if a else 0
     avg_sources_b = sum(r.get("sources_count", 0) for r in b) / len(b) if b else 0
     print(f"\nAvg sources A: {avg_sources_a:.1f}  B: {avg_sources_b:.1f}")
+    # Ex. hybrid sans rerank (A) vs MMR + rerank (B) : pages sources communes et latence
+    common = [qid for qid in ids if qid in by_id_a and qid in by_id_b]
+    overlap = _avg([
+        _jaccard(by_id_a[q].get("source_page_ids", []), by_id_b[q].get("source_page_ids", []))
+        for q in common
+    ])
+    print(f"Source overlap (Jaccard): {overlap:.2f}")
+    print_latency_deltas(a, b)
+    rate_a, rate_b = skip_rate(a), skip_rate(b)
+    if rate_a is not None or rate_b is not None:
+        fmt = lambda r: "-" if r is None else f"{r:.0%}"  # noqa: E731
+        print(f"Rerank skip rate A: {fmt(rate_a)}  B: {fmt(rate_b)}")
+    routes_a, routes_b = choice_shares(a, "llm_route"), choice_shares(b, "llm_route")
+    if routes_a or routes_b:
+        fmt_shares = lambda s: ", ".join(f"{c} {v:.0%}" for c, v in s.items()) or "-"  # noqa: E731
+        print(f"LLM routes A: {fmt_shares(routes_a)}  B: {fmt_shares(routes_b)}")
 
 
 if __name__ == "__main__":
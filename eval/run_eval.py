@@ -1,12 +1,15 @@
 """
 Script d'évaluation RAG sur un dataset de questions (PRD EVAL-1.1, EVAL-1.2).
 Usage : uv run python -m eval.run_eval [--dataset eval/dataset.json] [--output results.json]
+    [--concurrency 8]
 """
 from __future__ import annotations
 
 import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _REPO_ROOT = Path(__file__).resolve().parent.parent
@@ -17,6 +20,7 @@ from dotenv import load_dotenv  # noqa: E402
 load_dotenv(_REPO_ROOT / ".env")
 
 from api.rag_chain import build_rag_chain  # noqa: E402
+from api.request_trace import RequestTrace  # noqa: E402
 
 
 def load_dataset(path: str) -> list[dict]:
@@ -25,33 +29,57 @@ def load_dataset(path: str) -> list[dict]:
     return data if isinstance(data, list) else []
 
 
+def evaluate_question(chain, item: dict) -> dict:
+    """Exécute une question et mesure latence totale, durée par étape et tokens LLM."""
+    q = item["question"]
+    trace = RequestTrace()
+    start = time.perf_counter()
+    out = chain.invoke(q, trace=trace)
+    latency_ms = (time.perf_counter() - start) * 1000
+    return {
+        "id": item.get("id", ""),
+        "question": q,
+        "answer_length": len(out.answer),
+        "sources_count": len(out.sources),
+        "source_page_ids": [s.page_id for s in out.sources],
+        "latency_ms": round(latency_ms, 1),
+        "stages_ms": {name: round(ms, 1) for name, ms in trace.stages_ms.items()},
+        "tokens_in": trace.tokens_in,
+        "tokens_out": trace.tokens_out,
+        "decisions": dict(trace.decisions),
+        "degraded": out.degraded,
+        "retrieval_mode": chain.rag_settings.retrieval_mode,
+        "rerank_enabled": chain.rag_settings.rerank_enabled,
+        "rerank_policy": chain.rag_settings.rerank_policy,
+        "llm_routing": chain.rag_settings.llm_routing,
+        "rag_version": out.rag_version,
+    }
+
+
+def run_eval(chain, dataset: list[dict], concurrency: int) -> list[dict]:
+    """Questions exécutées en parallèle (concurrence bornée), résultats dans l'ordre du dataset."""
+    items = [item for item in dataset if item.get("question")]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda item: evaluate_question(chain, item), items))
+
+
 def main() -> None:
     import argparse
     p = argparse.ArgumentParser()
     p.add_argument("--dataset", default="eval/dataset.json", help="Fichier dataset JSON")
     p.add_argument("--output", default="eval/results.json", help="Fichier résultats JSON")
+    p.add_argument("--concurrency", type=int, default=8, help="Questions exécutées en parallèle")
     args = p.parse_args()
 
     dataset = load_dataset(args.dataset)
     chain = build_rag_chain()
-    results = []
-    for item in dataset:
-        q = item.get("question", "")
-        qid = item.get("id", "")
-        if not q:
-            continue
-        out = chain.invoke(q)
-        results.append({
-            "id": qid,
-            "question": q,
-            "answer_length": len(out.answer),
-            "sources_count": len(out.sources),
-            "rag_version": out.rag_version,
-        })
+    start = time.perf_counter()
+    results = run_eval(chain, dataset, args.concurrency)
+    elapsed_s = time.perf_counter() - start
     Path(args.output).parent.mkdir(parents=True, exist_ok=True)
     with open(args.output, "w", encoding="utf-8") as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"Évaluation terminée: {len(results)} questions → {args.output}")
+    print(f"Évaluation terminée: {len(results)} questions en {elapsed_s:.1f}s → {args.output}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+"""
+Représentation compacte des chunks pendant l'ingestion.
+Un PageRecord porte le texte de la page et ses métadonnées (partagées par tous ses chunks) ;
+un ChunkRecord ne garde que des offsets dans ce texte. Les Documents LangChain ne sont
+matérialisés qu'à la frontière embedding/upsert, par lots (materialize_batches).
+Un chunk représentant des quasi-doublons (offline.dedup) porte aussi les pages de ses doublons.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+
+class PageRecord:
+    __slots__ = ("text", "metadata")
+
+    def __init__(self, text: str, metadata: dict[str, Any]) -> None:
+        self.text = text
+        self.metadata = metadata
+
+
+class ChunkRecord:
+    __slots__ = ("page", "start", "end", "index", "duplicates")
+
+    def __init__(self, page: PageRecord, start: int, end: int, index: int) -> None:
+        self.page = page
+        self.start = start
+        self.end = end
+        self.index = index
+        self.duplicates: tuple[PageRecord, ...] = ()
+
+    @property
+    def text(self) -> str:
+        return self.page.text[self.start:self.end]
+
+    def to_document(self) -> Document:
+        metadata = {**self.page.metadata, "chunk_index": self.index}
+        if self.duplicates:
+            # Point partagé : toutes les pages (filtres, suppressions) ;
+            # source citée = la page du représentant
+            pages = [self.page, *self.duplicates]
+            metadata["page_ids"] = list(dict.fromkeys(p.metadata["page_id"] for p in pages))
+            metadata["ancestor_ids"] = list(
+                dict.fromkeys(a for p in pages for a in p.metadata.get("ancestor_ids") or [])
+            )
+        return Document(page_content=self.text, metadata=metadata)
+
+
+def page_record(doc: Document) -> PageRecord:
+    """Page à indexer : métadonnées normalisées une fois pour tous les chunks (texte non copié)."""
+    meta = doc.metadata
+    return PageRecord(
+        doc.page_content,
+        {
+            **meta,
+            "page_id": meta.get("page_id", ""),
+            "title": meta.get("title", ""),
+            "source_url": meta.get("source_url"),
+            "last_edited_time": meta.get("last_edited_time"),
+        },
+    )
+
+
+def split_page(page: PageRecord, splitter: RecursiveCharacterTextSplitter) -> list[ChunkRecord]:
+    """
+    Chunks d'une page en offsets. Même recherche de position que le splitter LangChain
+    (add_start_index) : chaque chunk est cherché après le début du chevauchement précédent.
+    """
+    records: list[ChunkRecord] = []
+    offset = 0
+    previous_len = 0
+    overlap = splitter._chunk_overlap
+    for i, chunk in enumerate(splitter.split_text(page.text)):
+        start = page.text.find(chunk, max(0, offset + previous_len - overlap))
+        records.append(ChunkRecord(page, start, start + len(chunk), i))
+        offset, previous_len = start, len(chunk)
+    return records
+
+
+def materialize_batches(
+    records: Sequence[ChunkRecord], batch_size: int
+) -> Iterator[list[Document]]:
+    """Documents par lots de batch_size : un seul lot vivant à la fois pendant l'upsert."""
+    for start in range(0, len(records), batch_size):
+        yield [r.to_document() for r in records[start:start + batch_size]]
@@ -0,0 +1,211 @@
+"""
+Réindexation blue/green : une ingestion complète écrit dans une nouvelle collection versionnée
+`<collection>__v<horodatage UTC>`, puis l'alias `<collection>` (lu par l'API) est basculé
+atomiquement. Les générations précédentes restent disponibles (rollback) pendant la fenêtre
+de rétention, puis sont supprimées.
+Un index d'avant le blue/green (collection physique portant le nom de l'alias) doit d'abord être
+converti par l'étape explicite migrate_to_alias (python -m offline.migrate_alias).
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+
+logger = logging.getLogger(__name__)
+
+VERSION_SEPARATOR = "__v"
+_VERSION_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+def versioned_collection_name(alias: str, now: datetime | None = None) -> str:
+    now = now or datetime.now(timezone.utc)
+    return f"{alias}{VERSION_SEPARATOR}{now.strftime(_VERSION_FORMAT)}"
+
+
+def _version_time(alias: str, collection_name: str) -> datetime | None:
+    """Horodatage d'une collection versionnée de cet alias (None si le nom ne correspond pas)."""
+    prefix = f"{alias}{VERSION_SEPARATOR}"
+    if not collection_name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(collection_name[len(prefix):], _VERSION_FORMAT).replace(
+            tzinfo=timezone.utc
+        )
+    except ValueError:
+        return None
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> str | None:
+    """Collection pointée par l'alias (None si l'alias n'existe pas)."""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+class LegacyCollectionError(RuntimeError):
+    """Collection physique portant le nom de l'alias : migration explicite requise."""
+
+    def __init__(self, alias: str) -> None:
+        super().__init__(
+            f"La collection {alias} n'est pas un alias (index d'avant le blue/green) : "
+            "lancer d'abord la migration (just migrate-alias)"
+        )
+        self.alias = alias
+
+
+def is_legacy_collection(client: QdrantClient, alias: str) -> bool:
+    """Collection physique (et non alias) portant le nom de l'alias."""
+    return alias in {c.name for c in client.get_collections().collections}
+
+
+def check_alias_ready(client: QdrantClient, alias: str) -> None:
+    """Lève LegacyCollectionError avant une réindexation complète qui ne pourrait pas basculer."""
+    if is_legacy_collection(client, alias):
+        raise LegacyCollectionError(alias)
+
+
+def swap_alias(client: QdrantClient, alias: str, target: str) -> str | None:
+    """
+    Bascule l'alias vers target en une seule opération (suppression + création atomiques
+    côté Qdrant).
+    Lève LegacyCollectionError si une collection physique porte le nom de l'alias (voir
+    migrate_to_alias). Retourne la collection précédemment pointée.
+    """
+    check_alias_ready(client, alias)
+    previous = resolve_alias(client, alias)
+    operations: list[qm.CreateAliasOperation | qm.DeleteAliasOperation] = []
+    if previous is not None:
+        operations.append(qm.DeleteAliasOperation(delete_alias=qm.DeleteAlias(alias_name=alias)))
+    operations.append(
+        qm.CreateAliasOperation(
+            create_alias=qm.CreateAlias(collection_name=target, alias_name=alias)
+        )
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+    logger.info("Alias %s : %s → %s", alias, previous, target)
+    return previous
+
+
+def bootstrap_alias(client: QdrantClient, alias: str, create: Callable[[str], None]) -> str | None:
+    """
+    Premier run sans réindexation complète (incrémental, --page-ids) : si ni alias ni collection
+    n'existe, crée une collection versionnée (create) et l'alias vers elle, pour qu'une
+    réindexation complète ultérieure puisse basculer. Retourne la collection créée (None sinon).
+    """
+    # collection_exists résout aussi les alias
+    if client.collection_exists(alias):
+        return None
+    target = versioned_collection_name(alias)
+    create(target)
+    swap_alias(client, alias, target)
+    return target
+
+
+def copy_collection(
+    source: QdrantClient,
+    target: QdrantClient,
+    collection_name: str,
+    batch_size: int,
+    target_name: str | None = None,
+) -> int:
+    """Recrée la collection (même config de vecteurs) puis copie les points par pages de scroll."""
+    target_name = target_name or collection_name
+    params = source.get_collection(collection_name).config.params
+    target.create_collection(
+        collection_name=target_name,
+        vectors_config=params.vectors,
+        sparse_vectors_config=params.sparse_vectors,
+    )
+    copied = 0
+    offset = None
+    while True:
+        records, offset = source.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            target.upsert(
+                collection_name=target_name,
+                points=[
+                    qm.PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records
+                ],
+            )
+            copied += len(records)
+        if offset is None:
+            return copied
+
+
+def latest_version(client: QdrantClient, alias: str) -> str | None:
+    """Collection versionnée la plus récente de cet alias (None si aucune)."""
+    versions = [
+        (created_at, c.name)
+        for c in client.get_collections().collections
+        if (created_at := _version_time(alias, c.name)) is not None
+    ]
+    return max(versions)[1] if versions else None
+
+
+def migrate_to_alias(client: QdrantClient, alias: str, batch_size: int = 256) -> str | None:
+    """
+    Migration unique d'un index d'avant le blue/green : la collection physique `alias` est copiée
+    dans une collection versionnée, puis remplacée par un alias vers cette copie.
+    Qdrant refuse un alias homonyme d'une collection : entre la suppression de l'original et la
+    création de l'alias (deux appels successifs, après la copie), le nom ne résout rien pendant
+    un bref instant — à lancer hors trafic. Idempotente : relancée après un échec entre les deux
+    appels, elle pointe l'alias vers la copie existante. Retourne la collection pointée (None si
+    rien à migrer).
+    """
+    if resolve_alias(client, alias) is not None:
+        logger.info("Alias %s déjà en place : rien à migrer", alias)
+        return None
+    if is_legacy_collection(client, alias):
+        target = versioned_collection_name(alias)
+        copied = copy_collection(client, client, alias, batch_size, target_name=target)
+        logger.info("Migration blue/green : %s copiée dans %s (%s points)", alias, target, copied)
+        client.delete_collection(alias)
+    else:
+        target = latest_version(client, alias)
+        if target is None:
+            logger.info("Ni collection ni alias %s : rien à migrer", alias)
+            return None
+    client.update_collection_aliases(
+        change_aliases_operations=[
+            qm.CreateAliasOperation(
+                create_alias=qm.CreateAlias(collection_name=target, alias_name=alias)
+            )
+        ]
+    )
+    logger.info("Migration blue/green : alias %s → %s", alias, target)
+    return target
+
+
+def garbage_collect_versions(
+    client: QdrantClient,
+    alias: str,
+    retention: timedelta,
+    now: datetime | None = None,
+) -> list[str]:
+    """Supprime les collections versionnées plus anciennes que retention, sauf celle de l'alias."""
+    now = now or datetime.now(timezone.utc)
+    current = resolve_alias(client, alias)
+    deleted: list[str] = []
+    for collection in client.get_collections().collections:
+        created_at = _version_time(alias, collection.name)
+        if created_at is None or collection.name == current:
+            continue
+        if now - created_at > retention:
+            client.delete_collection(collection.name)
+            deleted.append(collection.name)
+    if deleted:
+        logger.info(
+            "Générations supprimées (rétention %s) : %s", retention, ", ".join(sorted(deleted))
+        )
+    return deleted
@@ -0,0 +1,130 @@
+"""
+Déduplication des chunks quasi identiques avant embedding (lignes de base Notion créées depuis
+un même modèle). MinHash sur des shingles de mots, LSH par bandes pour les paires candidates,
+vérification de la similarité estimée puis regroupement (union-find).
+Un représentant par groupe est embeddé et stocké ; ses doublons y sont rattachés (page_ids).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from .chunk_records import ChunkRecord
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Premier de Mersenne 2^61 - 1 : hachage universel (a·x + b) mod p sur des shingles 32 bits
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text: str, size: int) -> set[int]:
+    """k-grammes de mots (casse ignorée) hachés sur 32 bits ; texte court = un seul shingle."""
+    words = _WORD.findall(text.lower())
+    grams = [words[i:i + size] for i in range(max(1, len(words) - size + 1))] if words else []
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(g).encode(), digest_size=4).digest(), "little")
+        for g in grams
+    }
+
+
+def minhash_signatures(
+    shingle_sets: Sequence[set[int]], num_perm: int, seed: int = 1
+) -> np.ndarray:
+    """Signatures MinHash (n × num_perm) ; ensemble vide = signature maximale (jamais candidate)."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    signatures = np.full((len(shingle_sets), num_perm), _PRIME, dtype=np.uint64)
+    for i, values in enumerate(shingle_sets):
+        if values:
+            x = np.fromiter(values, dtype=np.uint64, count=len(values))[:, None]
+            signatures[i] = ((x * a + b) % _PRIME).min(axis=0)
+    return signatures
+
+
+def lsh_bands(threshold: float, num_perm: int) -> int:
+    """Nombre de bandes b (b · r = num_perm) dont le seuil LSH (1/b)^(1/r) approche threshold."""
+    divisors = [b for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(divisors, key=lambda b: abs((1 / b) ** (b / num_perm) - threshold))
+
+
+def near_duplicate_groups(
+    texts: Sequence[str], threshold: float, num_perm: int = 128, shingle_size: int = 5
+) -> list[list[int]]:
+    """Groupes d'indices de textes quasi identiques (Jaccard estimée >= threshold), taille >= 2."""
+    shingle_sets = [shingles(t, shingle_size) for t in texts]
+    signatures = minhash_signatures(shingle_sets, num_perm)
+    bands = lsh_bands(threshold, num_perm)
+    rows = num_perm // bands
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets: dict[bytes, list[int]] = defaultdict(list)
+        for i, signature in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            if shingle_sets[i]:
+                buckets[signature.tobytes()].append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_first, root_other = find(first), find(other)
+                if root_first == root_other:
+                    continue
+                # Paire candidate LSH confirmée sur la signature complète
+                if np.mean(signatures[first] == signatures[other]) >= threshold:
+                    parent[max(root_first, root_other)] = min(root_first, root_other)
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(texts)):
+        groups[find(i)].append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def dedup_chunks(
+    chunks: list[ChunkRecord], threshold: float, num_perm: int = 128, shingle_size: int = 5
+) -> tuple[list[ChunkRecord], dict[str, Any]]:
+    """
+    Chunks à embedder : un représentant par groupe de quasi-doublons (le premier dans l'ordre
+    d'ingestion), auquel les pages des doublons sont rattachées. Retourne (chunks, statistiques).
+    """
+    groups = near_duplicate_groups([c.text for c in chunks], threshold, num_perm, shingle_size)
+    dropped: set[int] = set()
+    for group in groups:
+        representative = chunks[group[0]]
+        representative.duplicates = tuple(chunks[i].page for i in group[1:])
+        dropped.update(group[1:])
+    kept = [c for i, c in enumerate(chunks) if i not in dropped]
+    sizes = sorted((len(g) for g in groups), reverse=True)
+    stats = {
+        "chunks_in": len(chunks),
+        "chunks_out": len(kept),
+        "clusters": len(groups),
+        "duplicates_removed": len(dropped),
+        "largest_cluster": sizes[0] if sizes else 0,
+        "pages_in_clusters": len({chunks[i].page.metadata["page_id"] for g in groups for i in g}),
+    }
+    logger.info(
+        "dedup clusters=%s duplicates_removed=%s largest=%s chunks=%s→%s",
+        stats["clusters"], stats["duplicates_removed"], stats["largest_cluster"],
+        stats["chunks_in"], stats["chunks_out"],
+    )
+    for group in sorted(groups, key=len, reverse=True)[:5]:
+        logger.info(
+            "dedup cluster size=%s title=%r",
+            len(group),
+            chunks[group[0]].page.metadata.get("title"),
+        )
+    return kept, stats
@@ -0,0 +1,86 @@
+"""
+Export de l'index vers un Qdrant embarqué sur disque (réplicas en lecture, PRD OPS).
+Copie la collection (vecteurs dense + sparse, payloads) et son marqueur de génération
+dans un répertoire ouvert ensuite par l'API via QDRANT_LOCAL_PATH (QdrantClient(path=...)).
+Usage : python -m offline.export_local --output data/qdrant_local
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(os.path.join(_REPO_ROOT, ".env"))
+
+from qdrant_client import QdrantClient  # noqa: E402
+
+from offline.collection_versions import copy_collection  # noqa: E402
+from shared.config import QdrantSettings  # noqa: E402
+from shared.index_generation import meta_collection_name  # noqa: E402
+from shared.page_index import page_collection_name  # noqa: E402
+from shared.qdrant import build_qdrant_client  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def export_local_index(
+    source: QdrantClient,
+    collection_name: str,
+    output_path: str,
+    batch_size: int = 256,
+) -> int:
+    """
+    Exporte collection_name (et <collection>__meta, <collection>__pages si présentes)
+    vers output_path.
+    Écrit dans un répertoire temporaire puis le substitue : un export interrompu
+    ne laisse jamais un index partiel à output_path. Retourne le nombre de points copiés.
+    """
+    tmp_path = f"{output_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    target = QdrantClient(path=tmp_path)
+    try:
+        copied = copy_collection(source, target, collection_name, batch_size)
+        for companion in (
+            meta_collection_name(collection_name),
+            page_collection_name(collection_name),
+        ):
+            if source.collection_exists(companion):
+                copy_collection(source, target, companion, batch_size)
+    finally:
+        target.close()
+    old_path = f"{output_path}.old"
+    if os.path.exists(output_path):
+        os.replace(output_path, old_path)
+    os.replace(tmp_path, output_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    logger.info("Index exporté : %s (%s points) → %s", collection_name, copied, output_path)
+    return copied
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Export Qdrant → index embarqué sur disque")
+    parser.add_argument(
+        "--output", default="data/qdrant_local", help="Répertoire de l'index exporté"
+    )
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    qdrant = QdrantSettings()
+    export_local_index(
+        build_qdrant_client(qdrant), qdrant.collection_name, args.output, args.batch_size
+    )
+
+
+if __name__ == "__main__":
+    main()
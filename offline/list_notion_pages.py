@@ -18,6 +18,7 @@ load_dotenv(os.path.join(_REPO_ROOT, ".env"))
 
 from notion_client import AsyncClient  # noqa: E402
 
+from offline.notion_governor import notion_client  # noqa: E402
 from shared.config import NotionSettings  # noqa: E402
 
 
@@ -228,7 +229,7 @@ def main() -> None:
     args = p.parse_args()
 
     notion = NotionSettings()
-    client = AsyncClient(auth=notion.token)
+    client = notion_client(notion.token)
 
     if args.debug:
         target = args.database_id or (args.page_ids.split(",")[0].strip() if args.page_ids else "")
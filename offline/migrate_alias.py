@@ -0,0 +1,43 @@
+"""
+Migration unique vers le blue/green : convertit la collection physique QDRANT_COLLECTION_NAME
+(et <collection>__pages) en alias vers une copie versionnée. À lancer hors trafic, avant la
+première réindexation complète (qui échoue sinon avec LegacyCollectionError).
+Usage : python -m offline.migrate_alias
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(os.path.join(_REPO_ROOT, ".env"))
+
+from offline.collection_versions import migrate_to_alias  # noqa: E402
+from shared.config import QdrantSettings  # noqa: E402
+from shared.page_index import page_collection_name  # noqa: E402
+from shared.qdrant import build_qdrant_client  # noqa: E402
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Collection physique → alias blue/green")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    qdrant = QdrantSettings()
+    client = build_qdrant_client(qdrant)
+    for alias in (qdrant.collection_name, page_collection_name(qdrant.collection_name)):
+        migrate_to_alias(client, alias, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Régulateur partagé des appels Notion : token bucket au débit moyen documenté, concurrence
+adaptative AIMD (+1 par fenêtre de succès, /2 sur 429), pause globale sur Retry-After et
+nouvelles tentatives avec jitter sur 429 / 5xx / timeout.
+Tous les clients créés par notion_client() passent par le même régulateur (une intégration
+= un quota). Sans primitive asyncio liée à une boucle (les attentes sont des futures créées
+dans la boucle courante) : utilisable d'un asyncio.run() à l'autre.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, TypeVar
+
+import httpx
+from notion_client import AsyncClient
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from shared.config import NotionRateSettings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+_RETRYABLE_STATUSES = {409, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Erreur liée au quota ou à l'indisponibilité (à retenter), pas au contenu de la requête."""
+    if isinstance(error, HTTPResponseError):
+        return error.status in _RETRYABLE_STATUSES
+    return isinstance(error, (RequestTimeoutError, httpx.TransportError))
+
+
+def _retry_after_s(error: BaseException) -> float | None:
+    headers = getattr(error, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class NotionRateGovernor:
+    """Token bucket + AIMD + Retry-After, partagé par tous les appels Notion du process."""
+
+    def __init__(
+        self,
+        settings: NotionRateSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._settings = settings
+        self._clock = clock
+        self._tokens = float(settings.burst)
+        self._refilled_at = clock()
+        self._limit = float(min(settings.initial_concurrency, settings.max_concurrency))
+        self._in_flight = 0
+        # Appels en attente d'une place de concurrence, réveillés par _release (FIFO)
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._paused_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._settings.max_concurrency
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._tokens = min(
+            float(self._settings.burst), self._tokens + elapsed * self._settings.requests_per_second
+        )
+        self._refilled_at = now
+
+    async def _acquire(self) -> None:
+        while True:
+            now = self._clock()
+            self._refill(now)
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif self._in_flight >= int(self._limit):
+                await self._wait_for_slot()
+                continue
+            elif self._tokens < 1:
+                wait = (1 - self._tokens) / self._settings.requests_per_second
+            else:
+                self._tokens -= 1
+                self._in_flight += 1
+                self.requests += 1
+                return
+            await asyncio.sleep(wait)
+
+    async def _wait_for_slot(self) -> None:
+        """Attend qu'un appel en cours libère sa place (pas de scrutation périodique)."""
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Réveillé puis annulé : la place libérée revient au suivant
+            if waiter.done() and not waiter.cancelled():
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _wake(self) -> None:
+        """Réveille autant d'appels en attente que de places libres."""
+        free = int(self._limit) - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            # Future d'une boucle terminée (asyncio.run précédent) : déjà annulée
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _release(self, throttled: bool | None) -> None:
+        """throttled=None : appel abandonné (tâche annulée), place rendue sans ajuster la limite."""
+        self._in_flight -= 1
+        if throttled:
+            # Décroissance multiplicative
+            self._limit = max(1.0, self._limit / 2)
+        elif throttled is not None:
+            # Croissance additive : +1 après `limit` succès
+            self._limit = min(float(self._settings.max_concurrency), self._limit + 1 / self._limit)
+        self._wake()
+
+    def _backoff_s(self, attempt: int) -> float:
+        """Backoff exponentiel plafonné, full jitter."""
+        return random.uniform(0, min(self._settings.max_backoff_s, 0.5 * 2**attempt))
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Exécute fn sous le régulateur, avec nouvelles tentatives sur erreurs transitoires."""
+        attempt = 0
+        while True:
+            await self._acquire()
+            # Place toujours rendue, y compris sur CancelledError (map_bounded, timeout)
+            throttled: bool | None = None
+            try:
+                result = await fn()
+                throttled = False
+                return result
+            except Exception as e:
+                throttled = isinstance(e, HTTPResponseError) and e.status == 429
+                if not is_transient_error(e) or attempt >= self._settings.max_retries:
+                    raise
+                retry_after = _retry_after_s(e)
+                if throttled:
+                    self.throttled += 1
+                if retry_after is not None:
+                    # Quota de l'intégration : pause de tous les appels,
+                    # jitter pour désynchroniser la reprise
+                    delay = min(self._settings.max_backoff_s, retry_after) + random.uniform(0, 0.25)
+                    self._paused_until = max(self._paused_until, self._clock() + delay)
+                else:
+                    delay = self._backoff_s(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.info(
+                    "notion retry attempt=%s delay_s=%.2f error=%s concurrency=%s",
+                    attempt, delay, e, self.concurrency_limit,
+                )
+            finally:
+                self._release(throttled)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "concurrency_limit": self.concurrency_limit,
+        }
+
+
+async def map_bounded(fn: Callable[[T], Awaitable[U]], items: Sequence[T], limit: int) -> list[U]:
+    """
+    fn sur chaque élément avec au plus `limit` coroutines actives (pool de workers) : pas une
+    tâche en attente par page pour un grand workspace. Résultats dans l'ordre d'entrée.
+    """
+    results: list[Any] = [None] * len(items)
+    indices = iter(range(len(items)))
+
+    async def worker() -> None:
+        for i in indices:
+            results[i] = await fn(items[i])
+
+    await asyncio.gather(*(worker() for _ in range(min(limit, len(items)))))
+    return results
+
+
+class GovernedAsyncClient(AsyncClient):
+    """AsyncClient Notion : chaque requête passe par le régulateur (retries intégrés désactivés)."""
+
+    def __init__(self, governor: NotionRateGovernor, **kwargs: Any) -> None:
+        super().__init__(retry=False, **kwargs)
+        self._governor = governor
+
+    async def request(self, path: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        send = super().request
+        return await self._governor.call(lambda: send(path, method, *args, **kwargs))
+
+
+_governor: NotionRateGovernor | None = None
+
+
+def get_notion_governor() -> NotionRateGovernor:
+    global _governor
+    if _governor is None:
+        _governor = NotionRateGovernor(NotionRateSettings())
+    return _governor
+
+
+def notion_client(token: str) -> GovernedAsyncClient:
+    """Client Notion régulé par le régulateur du process."""
+    return GovernedAsyncClient(get_notion_governor(), auth=token)
@@ -10,6 +10,8 @@ from typing import Any
 from langchain_core.documents import Document
 from notion_client import AsyncClient
 
+from .notion_governor import get_notion_governor, is_transient_error, map_bounded, notion_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,6 +87,10 @@ async def fetch_page_content(client: AsyncClient, page_id: str) -> tuple[str, st
         full_text = "\n\n".join(parts)
         return title, full_text, last_edited
     except Exception as e:
+        # Quota / indisponibilité après toutes les tentatives :
+        # échec du run plutôt qu'une page perdue
+        if is_transient_error(e):
+            raise
         logger.warning("fetch_page_content failed for %s: %s", page_id, e)
         return "", "", None
 
@@ -93,20 +99,28 @@ async def _collect_all_page_ids(
     client: AsyncClient,
     root_page_ids: list[str],
     seen: set[str] | None = None,
+    ancestors: dict[str, list[str]] | None = None,
+    parent_chain: list[str] | None = None,
 ) -> list[str]:
     """
     À partir de pages racines, retourne toutes les page_id à indexer :
     les pages elles-mêmes, leurs sous-pages (child_page), et les lignes
     des tables (child_database) incluses dans ces pages.
+    Si ancestors est fourni, il est rempli avec page_id → pages parentes (filtre par sous-arbre).
     """
     if seen is None:
         seen = set()
+    if ancestors is None:
+        ancestors = {}
+    parent_chain = parent_chain or []
     result: list[str] = []
     for page_id in root_page_ids:
         if page_id in seen:
             continue
         seen.add(page_id)
         result.append(page_id)
+        ancestors[page_id] = parent_chain
+        child_chain = [*parent_chain, page_id]
         # Page = base en pleine page (ex. Journal) : les lignes sont des pages
         try:
             cursor = None
@@ -116,20 +130,26 @@ async def _collect_all_page_ids(
                     if item.get("object") == "page":
                         pid = item["id"]
                         if pid not in seen:
-                            sub = await _collect_all_page_ids(client, [pid], seen)
+                            sub = await _collect_all_page_ids(
+                                client, [pid], seen, ancestors, child_chain
+                            )
                             result.extend(sub)
                 cursor = resp.get("next_cursor")
                 if not cursor:
                     break
-        except Exception:
-            pass
+        except Exception as e:
+            # Page ordinaire (pas une base) : erreur attendue
+            if is_transient_error(e):
+                raise
         try:
             async for block in _iterate_block_children(client, page_id):
                 t = block.get("type")
                 if t == "child_page":
                     child_id = block.get("id")
                     if child_id and child_id not in seen:
-                        sub = await _collect_all_page_ids(client, [child_id], seen)
+                        sub = await _collect_all_page_ids(
+                            client, [child_id], seen, ancestors, child_chain
+                        )
                         result.extend(sub)
                 elif t == "child_database":
                     db_id = block.get("id")
@@ -143,25 +163,35 @@ async def _collect_all_page_ids(
                                 if item.get("object") == "page":
                                     pid = item["id"]
                                     if pid not in seen:
-                                        sub = await _collect_all_page_ids(client, [pid], seen)
+                                        sub = await _collect_all_page_ids(
+                                            client, [pid], seen, ancestors, child_chain
+                                        )
                                         result.extend(sub)
                             cursor = resp.get("next_cursor")
                             if not cursor:
                                 break
-                    except Exception:
-                        pass
+                    except Exception as e:
+                        if is_transient_error(e):
+                            raise
         except Exception as e:
+            if is_transient_error(e):
+                raise
             logger.warning("_collect_all_page_ids %s: %s", page_id, e)
     return result
 
 
-async def expand_page_ids(notion_token: str, root_page_ids: list[str]) -> list[str]:
+async def expand_page_ids(
+    notion_token: str,
+    root_page_ids: list[str],
+    ancestors: dict[str, list[str]] | None = None,
+) -> list[str]:
     """
     Étend les IDs de pages racines à toutes les pages à indexer
     (sous-pages + lignes des tables incluses). Pour cohérence liste / ingestion.
+    Remplit ancestors (page_id → pages parentes) s'il est fourni.
     """
-    client = AsyncClient(auth=notion_token)
-    return await _collect_all_page_ids(client, root_page_ids)
+    client = notion_client(notion_token)
+    return await _collect_all_page_ids(client, root_page_ids, ancestors=ancestors)
 
 
 async def load_notion_documents(
@@ -169,17 +199,21 @@ async def load_notion_documents(
     *,
     page_ids: list[str] | None = None,
     database_id: str | None = None,
+    known_ancestors: dict[str, list[str]] | None = None,
 ) -> list[Document]:
     """
     Charge des pages Notion en Documents LangChain.
     Soit page_ids (la page + ses sous-pages + les lignes des tables incluses),
     soit database_id (toutes les lignes de la base).
+    known_ancestors (issu de expand_page_ids) prime sur l'ascendance recalculée, qui est
+    relative aux page_ids passés (ex. ingestion incrémentale d'une sous-page seule).
     """
-    client = AsyncClient(auth=notion_token)
+    client = notion_client(notion_token)
     ids_to_fetch: list[str] = []
+    ancestors: dict[str, list[str]] = {}
 
     if page_ids:
-        ids_to_fetch = await _collect_all_page_ids(client, list(page_ids))
+        ids_to_fetch = await _collect_all_page_ids(client, list(page_ids), ancestors=ancestors)
     elif database_id:
         cursor = None
         while True:
@@ -187,15 +221,21 @@ async def load_notion_documents(
             for item in resp.get("results", []):
                 if item.get("object") == "page":
                     ids_to_fetch.append(item["id"])
+                    ancestors[item["id"]] = [database_id]
             cursor = resp.get("next_cursor")
             if not cursor:
                 break
     else:
         raise ValueError("Fournir page_ids ou database_id")
 
+    # Pages récupérées en parallèle : workers bornés au plafond de concurrence du régulateur Notion
+    contents = await map_bounded(
+        lambda page_id: fetch_page_content(client, page_id),
+        ids_to_fetch,
+        get_notion_governor().max_concurrency,
+    )
     documents: list[Document] = []
-    for page_id in ids_to_fetch:
-        title, full_text, last_edited = await fetch_page_content(client, page_id)
+    for page_id, (title, full_text, last_edited) in zip(ids_to_fetch, contents):
         if not full_text.strip() and not title:
             continue
         text = f"# {title}\n\n{full_text}" if title else full_text
@@ -206,10 +246,14 @@ async def load_notion_documents(
                 "title": title,
                 "source_url": _get_page_url(page_id),
                 "last_edited_time": last_edited or "",
+                "ancestor_ids": (known_ancestors or {}).get(page_id, ancestors.get(page_id, [])),
             },
         )
         documents.append(doc)
 
+    logger.info(
+        "Notion : %s pages chargées, régulateur %s", len(documents), get_notion_governor().stats()
+    )
     return documents
 
 
@@ -223,17 +267,21 @@ async def list_notion_page_versions(
     Retourne page_id → last_edited_time pour détection delta (ingestion incrémentale).
     Ne charge pas le contenu des pages.
     """
-    client = AsyncClient(auth=notion_token)
+    client = notion_client(notion_token)
     result: dict[str, str] = {}
 
     if page_ids:
-        for page_id in page_ids:
+        async def _version(page_id: str) -> None:
             try:
                 page = await client.pages.retrieve(page_id=page_id)
                 if page.get("last_edited_time"):
                     result[page_id] = page["last_edited_time"]
             except Exception as e:
+                if is_transient_error(e):
+                    raise
                 logger.warning("list_notion_page_versions %s: %s", page_id, e)
+
+        await map_bounded(_version, page_ids, get_notion_governor().max_concurrency)
         return result
 
     if database_id:
@@ -6,22 +6,44 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from datetime import timedelta
 from typing import Any
 
-from langchain_cohere import CohereEmbeddings
 from langchain_core.documents import Document
-from langchain_qdrant import QdrantVectorStore
+from langchain_qdrant import QdrantVectorStore, RetrievalMode
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 
 from shared.config import CohereSettings, QdrantSettings, RAGPipelineSettings, get_rag_settings
+from shared.index_generation import bump_index_generation
+from shared.page_index import (
+    PAGE_IDS_KEY,
+    page_collection_name,
+    page_match,
+    page_summary,
+    upsert_pages,
+)
+from shared.qdrant import build_qdrant_client
+from shared.sparse import BM25SparseEmbeddings
 
 from .checkpoint import get_checkpoint_path, load_checkpoint, save_checkpoint
+from .chunk_records import ChunkRecord, materialize_batches, page_record, split_page
+from .collection_versions import (
+    bootstrap_alias,
+    check_alias_ready,
+    garbage_collect_versions,
+    swap_alias,
+    versioned_collection_name,
+)
+from .dedup import dedup_chunks
 from .notion_loader import expand_page_ids, list_notion_page_versions, load_notion_documents
 
 logger = logging.getLogger(__name__)
 
+# Chunks matérialisés en Documents (puis embeddés et upsertés) par lots de cette taille
+UPSERT_BATCH_SIZE = 256
+
 
 def build_text_splitter(settings: RAGPipelineSettings) -> RecursiveCharacterTextSplitter:
     return RecursiveCharacterTextSplitter(
@@ -32,6 +54,20 @@ def build_text_splitter(settings: RAGPipelineSettings) -> RecursiveCharacterText
     )
 
 
+def prepare_chunk_records(
+    documents: list[Document],
+    splitter: RecursiveCharacterTextSplitter,
+) -> list[ChunkRecord]:
+    """
+    Découpe les documents en chunks compacts : offsets dans le texte de la page et métadonnées
+    (page_id, titre, etc.) partagées par page. Voir materialize_batches pour l'upsert.
+    """
+    chunks: list[ChunkRecord] = []
+    for doc in documents:
+        chunks.extend(split_page(page_record(doc), splitter))
+    return chunks
+
+
 def prepare_docs_with_metadata(
     documents: list[Document],
     splitter: RecursiveCharacterTextSplitter,
@@ -39,45 +75,63 @@ def prepare_docs_with_metadata(
     """
     Découpe les documents et attache les métadonnées (page_id, titre, etc.) à chaque chunk.
     """
-    chunks: list[Document] = []
-    for doc in documents:
-        meta = doc.metadata
-        page_id = meta.get("page_id", "")
-        title = meta.get("title", "")
-        source_url = meta.get("source_url")
-        last_edited = meta.get("last_edited_time")
-        sub_docs = splitter.split_documents([doc])
-        for i, sub in enumerate(sub_docs):
-            sub.metadata["page_id"] = page_id
-            sub.metadata["title"] = title
-            sub.metadata["source_url"] = source_url
-            sub.metadata["last_edited_time"] = last_edited
-            sub.metadata["chunk_index"] = i
-            chunks.append(sub)
-    return chunks
+    return [chunk.to_document() for chunk in prepare_chunk_records(documents, splitter)]
 
 
 def get_qdrant_client(qdrant: QdrantSettings) -> QdrantClient:
-    return QdrantClient(url=qdrant.url, api_key=qdrant.api_key)
+    return build_qdrant_client(qdrant)
 
 
 def ensure_collection(
     client: QdrantClient,
     collection_name: str,
     vector_size: int,
+    *,
+    sparse: bool = False,
 ) -> None:
-    """Crée la collection si elle n'existe pas (taille de vecteur Cohere embed)."""
-    collections = client.get_collections()
-    names = [c.name for c in collections.collections]
-    if collection_name not in names:
+    """
+    Crée la collection si elle n'existe pas (taille de vecteur Cohere embed).
+    sparse=True ajoute le vecteur creux BM25 (IDF calculé par Qdrant) pour la recherche hybride.
+    """
+    # collection_exists résout aussi les alias (collection blue/green)
+    if not client.collection_exists(collection_name):
+        sparse_config = None
+        if sparse:
+            sparse_config = {
+                QdrantVectorStore.SPARSE_VECTOR_NAME: qdrant_models.SparseVectorParams(
+                    modifier=qdrant_models.Modifier.IDF,
+                )
+            }
         client.create_collection(
             collection_name=collection_name,
             vectors_config=qdrant_models.VectorParams(
                 size=vector_size,
                 distance=qdrant_models.Distance.COSINE,
             ),
+            sparse_vectors_config=sparse_config,
         )
-        logger.info("Collection créée : %s (size=%s)", collection_name, vector_size)
+        logger.info(
+            "Collection créée : %s (size=%s, sparse=%s)", collection_name, vector_size, sparse
+        )
+
+
+# Index payload des filtres de retrieval
+# (métadonnées stockées sous "metadata" par QdrantVectorStore)
+PAYLOAD_INDEXES = {
+    "metadata.page_id": qdrant_models.PayloadSchemaType.KEYWORD,
+    "metadata.page_ids": qdrant_models.PayloadSchemaType.KEYWORD,
+    "metadata.ancestor_ids": qdrant_models.PayloadSchemaType.KEYWORD,
+    "metadata.last_edited_time": qdrant_models.PayloadSchemaType.DATETIME,
+}
+
+
+def ensure_payload_indexes(client: QdrantClient, collection_name: str) -> None:
+    """Crée les index payload manquants (filtres page, sous-arbre, date de modification)."""
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        if field_name not in existing:
+            client.create_payload_index(collection_name, field_name, field_schema=schema)
+            logger.info("Index payload créé : %s.%s (%s)", collection_name, field_name, schema)
 
 
 def delete_points_by_page_ids(
@@ -85,25 +139,73 @@ def delete_points_by_page_ids(
     collection_name: str,
     page_ids: list[str],
 ) -> None:
-    """Supprime tous les points dont le payload page_id est dans page_ids (PRD OFF-2.4)."""
+    """
+    Supprime tous les points des pages page_ids (PRD OFF-2.4), y compris les points
+    partagés par des quasi-doublons (voir pages_sharing_points).
+    """
     if not page_ids:
         return
     from qdrant_client.http import models as qm
 
     client.delete(
         collection_name=collection_name,
-        points_selector=qm.FilterSelector(
-            filter=qm.Filter(
+        points_selector=qm.FilterSelector(filter=page_match(page_ids)),
+    )
+    logger.info("Supprimés de Qdrant: %s pages", len(page_ids))
+
+
+def pages_sharing_points(
+    client: QdrantClient, collection_name: str, page_ids: list[str]
+) -> set[str]:
+    """
+    Pages rattachées aux mêmes points dédupliqués que page_ids : supprimer ces points retire
+    aussi leur contenu, elles sont donc réindexées avec page_ids.
+    """
+    if not page_ids:
+        return set()
+    linked: set[str] = set()
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=qdrant_models.Filter(
                 must=[
-                    qm.FieldCondition(
-                        key="page_id",
-                        match=qm.MatchAny(any=page_ids),
+                    qdrant_models.FieldCondition(
+                        key=PAGE_IDS_KEY, match=qdrant_models.MatchAny(any=page_ids)
                     )
                 ]
-            )
-        ),
-    )
-    logger.info("Supprimés de Qdrant: %s pages", len(page_ids))
+            ),
+            limit=256,
+            offset=offset,
+            with_payload=[PAGE_IDS_KEY],
+        )
+        for record in records:
+            linked.update((record.payload or {}).get("metadata", {}).get("page_ids") or [])
+        if offset is None:
+            return linked - set(page_ids)
+
+
+def index_pages(
+    client: QdrantClient,
+    collection_name: str,
+    embeddings: Any,
+    chunks: list[ChunkRecord],
+    summary_chars: int,
+) -> int:
+    """
+    Index de pages (retrieval en deux étapes) : un point par page des chunks, vecteur du titre
+    + début du contenu, métadonnées identiques aux chunks (filtres communs).
+    """
+    pages = list({c.page.metadata["page_id"]: c.page for c in chunks}.values())
+    for start in range(0, len(pages), UPSERT_BATCH_SIZE):
+        batch = [
+            (page_summary(p.metadata["title"], p.text, summary_chars), p.metadata)
+            for p in pages[start:start + UPSERT_BATCH_SIZE]
+        ]
+        vectors = embeddings.embed_documents([text for text, _ in batch])
+        upsert_pages(client, collection_name, batch, vectors)
+    logger.info("Indexées %s pages dans Qdrant (%s)", len(pages), collection_name)
+    return len(pages)
 
 
 def run_offline_pipeline(
@@ -118,8 +220,15 @@ def run_offline_pipeline(
     """
     Exécute la pipeline (sync). Si incremental=True et checkpoint présent :
     ne charge que les pages nouvelles ou modifiées, supprime les pages retirées de Notion (PRD OFF-2.4).
+    Sinon, sur tout le périmètre (base ou workspace), réindexation complète blue/green : nouvelle
+    collection versionnée, bascule de l'alias QDRANT_COLLECTION_NAME puis suppression des
+    générations hors rétention (pas de doublons). Avec page_ids (périmètre partiel), upsert dans
+    la collection servie : les autres pages restent indexées.
     """
     from datetime import datetime
+
+    from langchain_cohere import CohereEmbeddings
+
     from shared.config import CohereSettings, QdrantSettings
 
     qdrant = qdrant or QdrantSettings()
@@ -128,12 +237,39 @@ def run_offline_pipeline(
 
     client = get_qdrant_client(qdrant)
     vector_size = 1024
-    ensure_collection(client, qdrant.collection_name, vector_size)
+    hybrid = rag_settings.retrieval_mode == "hybrid"
+    # Complet (tout le périmètre) : nouvelle collection versionnée, alias basculé en fin de run
+    # (blue/green) ; incrémental ou page_ids : écriture dans la collection servie (via l'alias)
+    full_reindex = not rag_settings.incremental and page_ids is None
+    write_collection = qdrant.collection_name
+    # Index de pages : même cycle de vie que les chunks (alias <collection>__pages en blue/green)
+    pages_alias = page_collection_name(qdrant.collection_name)
+    write_pages = pages_alias if rag_settings.page_index_enabled else None
+    if not full_reindex:
+        # Premier run : collection versionnée + alias, jamais une collection au nom de l'alias
+        bootstrap_alias(
+            client,
+            write_collection,
+            lambda name: ensure_collection(client, name, vector_size, sparse=hybrid),
+        )
+        ensure_payload_indexes(client, write_collection)
+        if write_pages:
+            bootstrap_alias(
+                client, write_pages, lambda name: ensure_collection(client, name, vector_size)
+            )
+            ensure_payload_indexes(client, write_pages)
+    else:
+        # Avant le chargement Notion : un index d'avant le blue/green bloquerait la bascule finale
+        check_alias_ready(client, write_collection)
+        if write_pages:
+            check_alias_ready(client, write_pages)
 
+    # Ascendance des pages (page_id → parents) pour le filtre par sous-arbre
+    ancestors: dict[str, list[str]] = {}
     # État actuel Notion (page_id → last_edited_time)
     # Si page_ids fournis : étendre aux sous-pages et aux lignes des tables
     if page_ids is not None:
-        page_ids = asyncio.run(expand_page_ids(notion_token, page_ids))
+        page_ids = asyncio.run(expand_page_ids(notion_token, page_ids, ancestors))
     current_versions = asyncio.run(
         list_notion_page_versions(
             notion_token,
@@ -164,15 +300,27 @@ def run_offline_pipeline(
         to_delete = [pid for pid in prev_versions if pid not in current_versions]
         # Anciens chunks des pages modifiées (à remplacer)
         to_replace = [p for p in to_fetch if p in prev_versions]
-        pages_to_remove = list(set(to_delete) | set(to_replace))
+        # Pages dont des chunks dédupliqués partagent un point avec elles : réindexées aussi
+        linked = pages_sharing_points(
+            client, write_collection, list(set(to_delete) | set(to_replace))
+        )
+        linked_to_fetch = [p for p in sorted(linked) if p in current_versions and p not in to_fetch]
+        to_fetch += linked_to_fetch
+        pages_to_remove = list(set(to_delete) | set(to_replace) | set(linked_to_fetch))
         if pages_to_remove:
-            delete_points_by_page_ids(client, qdrant.collection_name, pages_to_remove)
+            delete_points_by_page_ids(client, write_collection, pages_to_remove)
+            if write_pages:
+                delete_points_by_page_ids(client, write_pages, pages_to_remove)
         if not to_fetch:
             logger.info("Ingestion incrémentale : rien à mettre à jour")
+            if pages_to_remove:
+                bump_index_generation(client, qdrant.collection_name)
             return {"documents_loaded": 0, "chunks_indexed": 0, "pages_deleted": len(to_delete)}
         # Charger uniquement les pages à mettre à jour
         documents = asyncio.run(
-            load_notion_documents(notion_token, page_ids=to_fetch, database_id=None)
+            load_notion_documents(
+                notion_token, page_ids=to_fetch, database_id=None, known_ancestors=ancestors
+            )
         )
     else:
         to_delete = []
@@ -182,11 +330,14 @@ def run_offline_pipeline(
                 notion_token,
                 page_ids=page_ids,
                 database_id=database_id,
+                known_ancestors=ancestors,
             )
         )
 
     if not documents:
         if rag_settings.incremental:
+            if pages_to_remove:
+                bump_index_generation(client, qdrant.collection_name)
             save_checkpoint(
                 checkpoint_path,
                 last_sync_time=datetime.utcnow().isoformat() + "Z",
@@ -196,19 +347,66 @@ def run_offline_pipeline(
         return {"documents_loaded": 0, "chunks_indexed": 0, "pages_deleted": len(to_delete)}
 
     splitter = build_text_splitter(rag_settings)
-    chunks = prepare_docs_with_metadata(documents, splitter)
-    logger.info("Documents: %s → Chunks: %s", len(documents), len(chunks))
+    chunks = prepare_chunk_records(documents, splitter)
+    documents_loaded = len(documents)
+    # Les PageRecord référencent les textes : les Documents d'origine ne sont plus nécessaires
+    del documents
+    logger.info("Documents: %s → Chunks: %s", documents_loaded, len(chunks))
+    # Quasi-doublons : un seul chunk embeddé et stocké par groupe (pages des doublons rattachées)
+    to_index, dedup_stats = chunks, None
+    if rag_settings.dedup_enabled:
+        to_index, dedup_stats = dedup_chunks(
+            chunks,
+            threshold=rag_settings.dedup_threshold,
+            num_perm=rag_settings.dedup_num_perm,
+            shingle_size=rag_settings.dedup_shingle_size,
+        )
+
+    if full_reindex:
+        write_collection = versioned_collection_name(qdrant.collection_name)
+        ensure_collection(client, write_collection, vector_size, sparse=hybrid)
+        ensure_payload_indexes(client, write_collection)
+        if write_pages:
+            write_pages = versioned_collection_name(pages_alias)
+            ensure_collection(client, write_pages, vector_size)
+            ensure_payload_indexes(client, write_pages)
 
     embeddings = CohereEmbeddings(
-        model="embed-multilingual-v3.0", cohere_api_key=cohere.api_key
+        model="embed-multilingual-v3.0", cohere_api_key=cohere.api_key, base_url=cohere.base_url
     )
-    vectorstore = QdrantVectorStore(
-        client=client,
-        collection_name=qdrant.collection_name,
-        embedding=embeddings,
-    )
-    ids = vectorstore.add_documents(chunks)
-    logger.info("Indexés %s chunks dans Qdrant", len(ids))
+    if hybrid:
+        # Vecteurs dense + sparse BM25 (une collection créée sans sparse doit être réindexée)
+        vectorstore = QdrantVectorStore(
+            client=client,
+            collection_name=write_collection,
+            embedding=embeddings,
+            retrieval_mode=RetrievalMode.HYBRID,
+            sparse_embedding=BM25SparseEmbeddings(),
+        )
+    else:
+        vectorstore = QdrantVectorStore(
+            client=client,
+            collection_name=write_collection,
+            embedding=embeddings,
+        )
+    indexed = 0
+    for batch in materialize_batches(to_index, UPSERT_BATCH_SIZE):
+        indexed += len(vectorstore.add_documents(batch))
+    logger.info("Indexés %s chunks dans Qdrant (%s)", indexed, write_collection)
+    pages_indexed = 0
+    if write_pages:
+        pages_indexed = index_pages(
+            client, write_pages, embeddings, chunks, rag_settings.page_summary_chars
+        )
+    if full_reindex:
+        retention = timedelta(hours=rag_settings.reindex_retention_hours)
+        swap_alias(client, qdrant.collection_name, write_collection)
+        garbage_collect_versions(client, qdrant.collection_name, retention)
+        if write_pages:
+            swap_alias(client, pages_alias, write_pages)
+            garbage_collect_versions(client, pages_alias, retention)
+    # Invalide le cache de réponses de l'API (réponses calculées sur l'ancien index)
+    index_generation = bump_index_generation(client, qdrant.collection_name)
 
     if rag_settings.incremental:
         save_checkpoint(
@@ -219,8 +417,12 @@ def run_offline_pipeline(
         )
 
     return {
-        "documents_loaded": len(documents),
-        "chunks_indexed": len(chunks),
+        "documents_loaded": documents_loaded,
+        "chunks_indexed": indexed,
+        "dedup": dedup_stats,
+        "pages_indexed": pages_indexed,
         "pages_deleted": len(to_delete),
         "rag_version": rag_settings.rag_version,
+        "index_generation": index_generation,
+        "collection": write_collection,
     }
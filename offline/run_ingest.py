@@ -1,6 +1,6 @@
 """
 Point d'entrée ingestion (PRD OFF-1, OFF-4).
-Usage : python -m offline.run_ingest [--database-id ID] [--page-ids id1,id2]
+Usage : python -m offline.run_ingest [--database-id ID] [--page-ids id1,id2] [--export-local DIR]
 Charge .env depuis le répertoire racine du projet.
 """
 from __future__ import annotations
@@ -19,8 +19,7 @@ from dotenv import load_dotenv  # noqa: E402
 
 load_dotenv(os.path.join(_REPO_ROOT, ".env"))
 
-from shared.config import NotionSettings, get_rag_settings  # noqa: E402
-from offline.pipeline import run_offline_pipeline  # noqa: E402
+from shared.config import NotionSettings, QdrantSettings, get_rag_settings  # noqa: E402
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,8 +35,18 @@ def main() -> None:
     g.add_argument("--page-ids", type=str, help="IDs de pages séparés par des virgules")
     parser.add_argument("--incremental", action="store_true", help="Ingestion incrémentale (checkpoint)")
     parser.add_argument("--checkpoint-path", type=str, default=None, help="Chemin du fichier checkpoint")
+    parser.add_argument(
+        "--export-local",
+        type=str,
+        default=None,
+        help="Après ingestion, exporter l'index embarqué dans ce répertoire",
+    )
     args = parser.parse_args()
 
+    # Imports différés : --help et erreurs d'arguments sans charger Notion/LangChain/Qdrant
+    from offline.export_local import export_local_index
+    from offline.pipeline import get_qdrant_client, run_offline_pipeline
+
     notion = NotionSettings()
     rag = get_rag_settings()
     if args.incremental:
@@ -59,6 +68,9 @@ def main() -> None:
         rag_settings=rag,
     )
     logger.info("Résultat: %s", result)
+    if args.export_local:
+        qdrant = QdrantSettings()
+        export_local_index(get_qdrant_client(qdrant), qdrant.collection_name, args.export_local)
 
 
 if __name__ == "__main__":
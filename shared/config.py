@@ -4,7 +4,9 @@ Aligné sur PRD : NOTION_TOKEN, QDRANT_*, COHERE_*, MISTRAL_*, LANGSMITH_*.
 """
 from __future__ import annotations
 
-from pydantic import Field
+from typing import Literal
+
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,16 +15,58 @@ class NotionSettings(BaseSettings):
     token: str = Field(..., description="Token d'intégration Notion")
 
 
+class NotionRateSettings(BaseSettings):
+    """Régulation des appels Notion (limite documentée : ~3 requêtes/s par intégration)."""
+    model_config = SettingsConfigDict(env_prefix="NOTION_RATE_", extra="ignore")
+    requests_per_second: float = Field(default=3.0, gt=0, description="Débit moyen (token bucket)")
+    burst: int = Field(default=3, ge=1, description="Rafale maximale au-delà du débit moyen")
+    initial_concurrency: int = Field(
+        default=3, ge=1, description="Requêtes simultanées au démarrage (AIMD)"
+    )
+    max_concurrency: int = Field(
+        default=10, ge=1, description="Plafond de requêtes simultanées (AIMD)"
+    )
+    max_retries: int = Field(default=6, ge=0, description="Tentatives sur 429 / 5xx / timeout")
+    max_backoff_s: float = Field(
+        default=30.0, gt=0, description="Délai maximal entre deux tentatives (s)"
+    )
+
+
 class QdrantSettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="QDRANT_", extra="ignore")
-    url: str = Field(..., description="URL Qdrant (Cloud ou local)")
+    url: str | None = Field(None, description="URL Qdrant (Cloud ou local)")
+    # Réplica en lecture : index exporté sur disque (offline.export_local), ouvert en mode embarqué
+    local_path: str | None = Field(
+        None,
+        description="Répertoire d'un index embarqué (QdrantClient(path=...)) ; prioritaire sur url",
+    )
     api_key: str | None = Field(None, description="API key Qdrant Cloud")
     collection_name: str = Field(default="rag_notion", description="Nom de la collection")
+    # Transport et pool de connexions (partagés API + offline)
+    prefer_grpc: bool = Field(default=False, description="Utiliser gRPC plutôt que REST")
+    grpc_port: int = Field(default=6334, description="Port gRPC Qdrant")
+    timeout_s: int | None = Field(default=None, ge=1, description="Timeout des requêtes Qdrant (s)")
+    pool_size: int = Field(
+        default=10, ge=1, description="Connexions HTTP (ou canaux gRPC) par client"
+    )
+    keepalive_s: float = Field(
+        default=30.0, ge=0,
+        description="Durée de vie des connexions inactives / ping keep-alive gRPC (s)",
+    )
+
+    @model_validator(mode="after")
+    def _url_or_local_path(self) -> QdrantSettings:
+        if not self.url and not self.local_path:
+            raise ValueError("QDRANT_URL ou QDRANT_LOCAL_PATH requis")
+        return self
 
 
 class CohereSettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="COHERE_", extra="ignore")
     api_key: str = Field(..., description="Clé API Cohere (embeddings + rerank)")
+    base_url: str | None = Field(
+        None, description="URL de l'API Cohere (None = API publique ; ex: stub de load test)"
+    )
 
 
 class MistralSettings(BaseSettings):
@@ -31,6 +75,16 @@ class MistralSettings(BaseSettings):
     model: str = Field(default="mistral-small-latest", description="Modèle Mistral")
     temperature: float = Field(default=0.2, ge=0, le=2)
     max_tokens: int = Field(default=1024, ge=1, le=4096)
+    base_url: str | None = Field(
+        None, description="URL de l'API Mistral (None = API publique ; ex: stub de load test)"
+    )
+    # Routage LLM (RAG_LLM_ROUTING=adaptive) : modèle des questions simples et repli hors budget
+    fast_model: str | None = Field(
+        None, description="Modèle Mistral rapide (ex: ministral-8b-latest)"
+    )
+    fast_max_tokens: int = Field(
+        default=512, ge=1, le=4096, description="Plafond de sortie du modèle rapide"
+    )
 
 
 class LangSmithSettings(BaseSettings):
@@ -50,6 +104,102 @@ class APISettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="API_", extra="ignore")
     rate_limit_chat: str = Field(default="10/minute", description="Rate limit pour POST /chat (ex: 10/minute)")
     feature_rerank: bool | None = Field(default=None, description="Override rerank (si None, utilise RAG_RERANK_ENABLED)")
+    rate_limit_chat_batch: str = Field(
+        default="2/minute", description="Rate limit pour POST /chat/batch"
+    )
+    batch_max_questions: int = Field(
+        default=50, ge=1, le=500, description="Nombre max de questions par lot"
+    )
+    batch_llm_concurrency: int = Field(
+        default=8, ge=1, le=64, description="Générations LLM simultanées par lot"
+    )
+    single_flight_enabled: bool = Field(
+        default=True,
+        description="Coalescer les questions identiques en cours (une seule exécution partagée)",
+    )
+    warmup_enabled: bool = Field(
+        default=True,
+        description="Appels de chauffe au démarrage (infos collection Qdrant, embedding factice)",
+    )
+    # Chauffe en échec au démarrage : nouvelles tentatives en arrière-plan (backoff exponentiel)
+    warmup_retry_initial_s: float = Field(
+        default=1.0, gt=0, description="Délai avant la première nouvelle tentative (s)"
+    )
+    warmup_retry_max_s: float = Field(
+        default=30.0, gt=0, description="Délai maximal entre deux tentatives (s)"
+    )
+    # Multi-workspace : collections servables en plus de QDRANT_COLLECTION_NAME
+    # (JSON, ex: ["rh","eng"])
+    collections: list[str] = Field(
+        default_factory=list, description="Collections acceptées dans ChatRequest.collection"
+    )
+    chain_cache_size: int = Field(
+        default=8, ge=1, le=256, description="Chaînes par collection gardées en cache (LRU)"
+    )
+    chain_idle_ttl_s: float | None = Field(
+        default=900.0, ge=1,
+        description="Éviction d'une chaîne inutilisée depuis N secondes (None = jamais)",
+    )
+    # Sessions de conversation (ChatRequest.session_id) : working set des chunks retrouvés
+    session_max: int = Field(default=1000, ge=1, description="Sessions gardées en mémoire (LRU)")
+    session_ttl_s: float = Field(
+        default=1800.0, ge=1, description="Expiration d'une session inactive (s)"
+    )
+    session_max_chunks: int = Field(
+        default=40, ge=1, le=500, description="Chunks gardés par session"
+    )
+    session_reuse_min_score: float = Field(
+        default=0.5, ge=-1, le=1,
+        description="Cosinus minimal question/chunk pour servir depuis la session",
+    )
+    # Contrôle d'admission de POST /chat (par process) : au-delà, 503 + Retry-After
+    admission_enabled: bool = Field(
+        default=True, description="Limiter les requêtes /chat simultanées"
+    )
+    admission_max_in_flight: int = Field(
+        default=32, ge=1, description="Requêtes /chat exécutées simultanément"
+    )
+    admission_max_queue: int = Field(
+        default=64, ge=0, description="Requêtes /chat en attente d'un slot"
+    )
+    admission_max_wait_s: float = Field(
+        default=2.0, gt=0, description="Attente maximale d'un slot avant rejet (s)"
+    )
+    admission_retry_after_s: int = Field(
+        default=1, ge=0, description="En-tête Retry-After des rejets 503 (s)"
+    )
+
+
+class AnswerCacheSettings(BaseSettings):
+    """Cache de réponses (exact + quasi-doublons), invalidé par génération d'index."""
+    model_config = SettingsConfigDict(env_prefix="ANSWER_CACHE_", extra="ignore")
+    enabled: bool = Field(default=False, description="Activer le cache de réponses")
+    collection_name: str = Field(
+        default="rag_notion_answer_cache", description="Collection Qdrant du cache"
+    )
+    similarity_threshold: float = Field(
+        default=0.95, ge=0, le=1, description="Similarité cosinus minimale pour un quasi-doublon"
+    )
+    generation_refresh_s: float = Field(
+        default=30.0, ge=0,
+        description="Intervalle de relecture du marqueur de génération d'index (s)",
+    )
+
+
+class ProfilingSettings(BaseSettings):
+    """Profilage cProfile de POST /chat à la demande (en-tête admin) ou échantillonné."""
+    model_config = SettingsConfigDict(env_prefix="PROFILE_", extra="ignore")
+    admin_token: str | None = Field(
+        None,
+        description="Jeton attendu dans X-Profile-Token (None = profilage par en-tête désactivé)",
+    )
+    sample_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Part des requêtes /chat profilées"
+    )
+    dir: str = Field(default="data/profiles", description="Répertoire des profils (.prof + .json)")
+    max_files: int = Field(
+        default=200, ge=1, description="Profils conservés (les plus anciens supprimés)"
+    )
 
 
 class LangfuseSettings(BaseSettings):
@@ -67,12 +217,105 @@ class RAGPipelineSettings(BaseSettings):
     # Offline — chunking
     chunk_size: int = Field(default=512, ge=64, le=2048)
     chunk_overlap: int = Field(default=64, ge=0, le=512)
+    # Offline — déduplication des chunks quasi identiques (MinHash/LSH) avant embedding
+    dedup_enabled: bool = Field(
+        default=False, description="Un seul chunk embeddé par groupe de quasi-doublons"
+    )
+    dedup_threshold: float = Field(
+        default=0.9, gt=0, le=1, description="Similarité de Jaccard estimée minimale"
+    )
+    dedup_num_perm: int = Field(
+        default=128, ge=16, le=1024, description="Permutations MinHash (signature)"
+    )
+    dedup_shingle_size: int = Field(
+        default=5, ge=1, le=20, description="Taille des shingles (mots)"
+    )
+    # Offline — index de pages (collection <collection>__pages) pour le retrieval en deux étapes
+    page_index_enabled: bool = Field(
+        default=False, description="Indexer aussi un vecteur par page (titre + début)"
+    )
+    page_summary_chars: int = Field(
+        default=1000, ge=100, le=8000,
+        description="Caractères de contenu embeddés avec le titre de la page",
+    )
 
     # Online — retrieval
     top_k: int = Field(default=20, ge=1, le=100, description="Nombre de chunks récupérés avant MMR/rerank")
     top_n: int = Field(default=5, ge=1, le=20, description="Nombre de chunks après rerank (ou gardés pour le prompt)")
     mmr_lambda: float = Field(default=0.5, ge=0, le=1, description="MMR : 0 = diversité max, 1 = pertinence max")
     rerank_enabled: bool = Field(default=False, description="Activer Cohere rerank")
+    rerank_policy: Literal["always", "adaptive"] = Field(
+        default="always",
+        description="adaptive (mode mmr) : rerank sauté si la distribution des scores denses "
+        "est piquée",
+    )
+    rerank_skip_min_margin: float = Field(
+        default=0.1, ge=0, le=2, description="Marge top-1 minimale pour sauter le rerank"
+    )
+    rerank_skip_max_entropy: float = Field(
+        default=0.5, ge=0, le=1,
+        description="Entropie normalisée maximale des scores pour sauter le rerank",
+    )
+    rerank_score_window: int = Field(
+        default=8, ge=2, le=100,
+        description="Meilleurs scores denses examinés par la politique adaptive",
+    )
+    context_max_tokens: int = Field(
+        default=2000, ge=100, le=32000,
+        description="Budget de tokens du contexte (chunks regroupés par page, "
+        "chevauchements retirés)",
+    )
+    retrieval_mode: Literal["mmr", "hybrid"] = Field(
+        default="mmr",
+        description="mmr = dense + MMR côté Qdrant (serveur >= 1.15) ; "
+        "hybrid = dense + sparse BM25 fusionnés (RRF) côté Qdrant. "
+        "En offline, hybrid indexe aussi les vecteurs sparse.",
+    )
+    two_stage_retrieval: bool = Field(
+        default=False,
+        description="Pages candidates (index <collection>__pages) puis chunks filtrés "
+        "sur leurs page_id",
+    )
+    page_candidates: int = Field(
+        default=20, ge=1, le=500, description="Pages candidates du retrieval en deux étapes"
+    )
+
+    # Online — budgets de latence (None = pas de limite)
+    budget_total_ms: int | None = Field(
+        default=None, ge=1, description="Budget total par requête (ms)"
+    )
+    budget_rerank_ms: int | None = Field(
+        default=None, ge=1, description="Budget rerank (ms) ; dépassé → ordre MMR conservé"
+    )
+    budget_llm_ms: int | None = Field(
+        default=None, ge=1,
+        description="Budget LLM (ms) ; dépassé → réponse extractive depuis les sources",
+    )
+
+    # Online — routage LLM (modèle principal MISTRAL_MODEL / rapide MISTRAL_FAST_MODEL)
+    llm_routing: Literal["off", "adaptive"] = Field(
+        default="off",
+        description="adaptive : modèle rapide pour les questions simples ou si le principal est "
+        "trop lent pour le budget LLM (EWMA), repli sur le rapide quand le principal dépasse "
+        "son budget",
+    )
+    llm_route_simple_max_question_chars: int = Field(
+        default=160, ge=0, description="Longueur maximale d'une question simple (caractères)"
+    )
+    llm_route_simple_max_context_tokens: int = Field(
+        default=800, ge=0,
+        description="Contexte empaqueté maximal d'une question simple (tokens estimés)",
+    )
+    llm_route_ewma_alpha: float = Field(
+        default=0.2, gt=0, le=1,
+        description="Poids de la dernière latence observée dans l'EWMA par modèle",
+    )
+    llm_route_fallback: bool = Field(
+        default=True,
+        description="Principal en échec ou hors budget → nouvel essai sur le modèle rapide "
+        "dans le temps restant de RAG_BUDGET_TOTAL_MS (sans budget total : pas de repli) "
+        "avant l'extractif",
+    )
 
     # Traçabilité
     rag_version: str = Field(default="v1", description="Version du pipeline pour logs")
@@ -81,6 +324,12 @@ class RAGPipelineSettings(BaseSettings):
     incremental: bool = Field(default=False, description="Activer ingestion incrémentale (checkpoint)")
     checkpoint_path: str | None = Field(default=None, description="Chemin du fichier checkpoint (défaut: data/ingest_checkpoint.json)")
 
+    # Réindexation complète blue/green (collection versionnée + alias QDRANT_COLLECTION_NAME)
+    reindex_retention_hours: float = Field(
+        default=24.0, ge=0,
+        description="Conservation des générations précédentes (rollback) avant suppression",
+    )
+
 
 def get_rag_settings() -> RAGPipelineSettings:
     return RAGPipelineSettings()
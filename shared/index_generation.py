@@ -0,0 +1,58 @@
+"""
+Marqueur de génération d'index : incrémenté à chaque ingestion qui modifie la collection.
+Partagé entre offline (bump) et api (lecture, invalidation du cache de réponses).
+Stocké dans une petite collection Qdrant compagnon `<collection>__meta` (un seul point).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+
+logger = logging.getLogger(__name__)
+
+META_COLLECTION_SUFFIX = "__meta"
+_MARKER_POINT_ID = 0
+
+
+def meta_collection_name(collection_name: str) -> str:
+    return f"{collection_name}{META_COLLECTION_SUFFIX}"
+
+
+def read_index_generation(client: QdrantClient, collection_name: str) -> int:
+    """Retourne la génération courante de l'index (0 si jamais incrémentée)."""
+    meta = meta_collection_name(collection_name)
+    if not client.collection_exists(meta):
+        return 0
+    records = client.retrieve(collection_name=meta, ids=[_MARKER_POINT_ID], with_payload=True)
+    if not records:
+        return 0
+    return int((records[0].payload or {}).get("index_generation", 0))
+
+
+def bump_index_generation(client: QdrantClient, collection_name: str) -> int:
+    """Incrémente la génération de l'index et retourne la nouvelle valeur."""
+    meta = meta_collection_name(collection_name)
+    if not client.collection_exists(meta):
+        client.create_collection(
+            collection_name=meta,
+            vectors_config=qm.VectorParams(size=1, distance=qm.Distance.DOT),
+        )
+    generation = read_index_generation(client, collection_name) + 1
+    client.upsert(
+        collection_name=meta,
+        points=[
+            qm.PointStruct(
+                id=_MARKER_POINT_ID,
+                vector=[0.0],
+                payload={
+                    "index_generation": generation,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+        ],
+    )
+    logger.info("Génération d'index %s → %s", collection_name, generation)
+    return generation
@@ -0,0 +1,26 @@
+"""
+Statistiques de latence (percentiles) communes aux benchmarks, à l'éval et au load test.
+"""
+from __future__ import annotations
+
+import math
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Percentile q (0-100) par interpolation linéaire ; 0.0 si aucune valeur."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """p50 / p95 / p99 / moyenne d'une série de latences (ms)."""
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else 0.0,
+    }
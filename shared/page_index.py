@@ -0,0 +1,102 @@
+"""
+Index de pages : collection compagnon `<collection>__pages`, un point par page Notion
+(vecteur du titre + début du contenu, mêmes métadonnées que les chunks).
+Écrit par l'offline (RAG_PAGE_INDEX_ENABLED) ; lu par l'API en retrieval en deux étapes
+(RAG_TWO_STAGE_RETRIEVAL) : pages candidates d'abord, puis chunks filtrés sur leurs page_id.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+
+logger = logging.getLogger(__name__)
+
+PAGE_COLLECTION_SUFFIX = "__pages"
+PAGE_ID_KEY = "metadata.page_id"
+# Chunks dédupliqués (offline.dedup) : un point partagé par plusieurs pages
+PAGE_IDS_KEY = "metadata.page_ids"
+
+
+def page_collection_name(collection_name: str) -> str:
+    return f"{collection_name}{PAGE_COLLECTION_SUFFIX}"
+
+
+def page_point_id(page_id: str) -> str:
+    """Identifiant stable par page : une réindexation incrémentale écrase le point existant."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"notion-page:{page_id}"))
+
+
+def page_summary(title: str, text: str, max_chars: int) -> str:
+    """Texte embeddé pour une page : titre + début du contenu."""
+    return f"{title}\n\n{text[:max_chars]}".strip()
+
+
+def upsert_pages(
+    client: QdrantClient,
+    collection_name: str,
+    pages: Sequence[tuple[str, dict[str, Any]]],
+    vectors: Sequence[list[float]],
+) -> None:
+    """pages : (texte résumé, métadonnées) ; payload au format QdrantVectorStore (filtres)."""
+    client.upsert(
+        collection_name=collection_name,
+        points=[
+            qm.PointStruct(
+                id=page_point_id(metadata["page_id"]),
+                vector=vector,
+                payload={"page_content": text, "metadata": metadata},
+            )
+            for (text, metadata), vector in zip(pages, vectors)
+        ],
+    )
+
+
+def search_page_ids(
+    client: QdrantClient,
+    collection_name: str,
+    query_vectors: Sequence[list[float]],
+    limit: int,
+    query_filter: qm.Filter | None = None,
+) -> list[list[str]]:
+    """page_id des `limit` pages les plus proches de chaque question (un seul appel Qdrant)."""
+    responses = client.query_batch_points(
+        collection_name=collection_name,
+        requests=[
+            qm.QueryRequest(
+                query=vector, filter=query_filter, limit=limit, with_payload=[PAGE_ID_KEY]
+            )
+            for vector in query_vectors
+        ],
+    )
+    return [
+        [(p.payload or {}).get("metadata", {}).get("page_id") for p in r.points if p.payload]
+        for r in responses
+    ]
+
+
+def page_match(page_ids: list[str]) -> qm.Filter:
+    """Chunks de ces pages : page_id, ou page_ids d'un point partagé par des quasi-doublons."""
+    return qm.Filter(
+        should=[
+            qm.FieldCondition(key=PAGE_ID_KEY, match=qm.MatchAny(any=page_ids)),
+            qm.FieldCondition(key=PAGE_IDS_KEY, match=qm.MatchAny(any=page_ids)),
+        ]
+    )
+
+
+def restrict_to_pages(query_filter: qm.Filter | None, page_ids: list[str]) -> qm.Filter | None:
+    """
+    Filtre des chunks restreint aux pages candidates (combiné au filtre utilisateur).
+    Aucune page candidate : filtre inchangé (index de pages vide ou en retard sur les chunks).
+    """
+    if not page_ids:
+        return query_filter
+    condition = page_match(page_ids)
+    if query_filter is None:
+        return qm.Filter(must=[condition])
+    return qm.Filter(must=[query_filter, condition])
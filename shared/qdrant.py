@@ -0,0 +1,46 @@
+"""
+Fabrique du client Qdrant partagée par l'API et l'offline (transport, pool, keep-alive).
+"""
+from __future__ import annotations
+
+import httpx
+from qdrant_client import QdrantClient
+
+from shared.config import QdrantSettings
+
+
+def build_qdrant_client(qdrant: QdrantSettings) -> QdrantClient:
+    """
+    Client Qdrant réglé pour un service à fort QPS :
+    - local_path : index embarqué sur disque, recherche dans le process
+      (aucun aller-retour réseau) ;
+    - gRPC (prefer_grpc) : pool de canaux + pings keep-alive pour garder les connexions ouvertes ;
+    - REST : pool httpx borné avec connexions keep-alive réutilisées.
+    """
+    if qdrant.local_path:
+        # Verrou fichier : un seul process par répertoire (un worker uvicorn par réplica)
+        return QdrantClient(path=qdrant.local_path)
+    if qdrant.prefer_grpc:
+        keepalive_ms = int(qdrant.keepalive_s * 1000)
+        return QdrantClient(
+            url=qdrant.url,
+            api_key=qdrant.api_key,
+            prefer_grpc=True,
+            grpc_port=qdrant.grpc_port,
+            timeout=qdrant.timeout_s,
+            pool_size=qdrant.pool_size,
+            grpc_options={
+                "grpc.keepalive_time_ms": keepalive_ms,
+                "grpc.keepalive_permit_without_calls": 1,
+            },
+        )
+    return QdrantClient(
+        url=qdrant.url,
+        api_key=qdrant.api_key,
+        timeout=qdrant.timeout_s,
+        limits=httpx.Limits(
+            max_connections=qdrant.pool_size,
+            max_keepalive_connections=qdrant.pool_size,
+            keepalive_expiry=qdrant.keepalive_s,
+        ),
+    )
@@ -3,6 +3,8 @@ Schémas partagés pour les documents et métadonnées indexés (PRD OFF-3.2).
 """
 from __future__ import annotations
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -13,6 +15,22 @@ class ChunkMetadata(BaseModel):
     source_url: str | None = Field(None, description="URL Notion si disponible")
     last_edited_time: str | None = Field(None, description="Dernière modification (ISO)")
     chunk_index: int = Field(default=0, description="Index du chunk dans la page")
+    ancestor_ids: list[str] = Field(
+        default_factory=list,
+        description="Pages parentes (de la racine d'ingestion au parent direct)",
+    )
+
+
+class ChatFilters(BaseModel):
+    """Filtres optionnels de retrieval (traduits en filtres payload Qdrant)."""
+    subtree_root_id: str | None = Field(
+        None, description="Restreindre à une page et toutes ses sous-pages"
+    )
+    page_ids: list[str] | None = Field(
+        None, min_length=1, max_length=100, description="Restreindre à ces pages"
+    )
+    edited_after: datetime | None = Field(None, description="last_edited_time >= (ISO 8601)")
+    edited_before: datetime | None = Field(None, description="last_edited_time <= (ISO 8601)")
 
 
 class ChatSource(BaseModel):
@@ -28,3 +46,12 @@ class ChatResponse(BaseModel):
     answer: str
     sources: list[ChatSource] = Field(default_factory=list)
     rag_version: str = "v1"
+    degraded: list[str] = Field(
+        default_factory=list,
+        description="Étapes dégradées faute de budget (ex: rerank_timeout, llm_timeout)",
+    )
+
+
+class ChatBatchResponse(BaseModel):
+    """Réponses d'un lot de questions, dans l'ordre des questions."""
+    results: list[ChatResponse] = Field(default_factory=list)
@@ -0,0 +1,60 @@
+"""
+Vecteurs creux BM25 (mots-clés) pour la recherche hybride dense + sparse.
+Le poids TF (saturation BM25) est calculé ici ; l'IDF est appliqué côté serveur
+par Qdrant (Modifier.IDF sur la config du vecteur sparse). Aucune dépendance externe :
+les tokens sont hachés (crc32) vers des indices stables entre processus.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+import zlib
+from collections import Counter
+
+from langchain_qdrant import SparseEmbeddings, SparseVector
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Mots vides FR/EN les plus fréquents : ils n'apportent rien au matching lexical
+_STOPWORDS = frozenset(
+    """
+    le la les un une des du de d l et ou en au aux a à est sont ce cet cette ces
+    qui que quoi dont où pour par sur dans avec sans pas ne se sa son ses leur
+    il elle ils elles on nous vous je tu y the of and or to in on for is are an
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Tokens normalisés (minuscules, sans accents), hors mots vides et tokens d'un caractère."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [t for t in _TOKEN_RE.findall(text) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def _token_index(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8"))
+
+
+class BM25SparseEmbeddings(SparseEmbeddings):
+    """Encodeur BM25 : documents pondérés par TF saturé, requêtes en poids binaires."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_len: float = 80.0) -> None:
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_len = avg_doc_len
+
+    def _encode_document(self, text: str) -> SparseVector:
+        tokens = tokenize(text)
+        counts = Counter(_token_index(t) for t in tokens)
+        norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_doc_len)
+        indices = list(counts)
+        values = [tf * (self.k1 + 1) / (tf + norm) for tf in counts.values()]
+        return SparseVector(indices=indices, values=values)
+
+    def embed_documents(self, texts: list[str]) -> list[SparseVector]:
+        return [self._encode_document(t) for t in texts]
+
+    def embed_query(self, text: str) -> SparseVector:
+        indices = sorted({_token_index(t) for t in tokenize(text)})
+        return SparseVector(indices=indices, values=[1.0] * len(indices))
@@ -0,0 +1,69 @@
+"""Helpers de test partagés : chaîne RAG sur Qdrant local en mémoire (aucun appel réseau)."""
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_qdrant import QdrantVectorStore, RetrievalMode
+from qdrant_client import QdrantClient
+
+from api.rag_chain import RAGWithSources
+from offline.pipeline import ensure_collection
+from shared.config import RAGPipelineSettings
+from shared.prompts import get_rag_prompt
+from shared.sparse import BM25SparseEmbeddings
+
+
+def _meta(page_id: str, title: str, ancestors: list[str], edited: str) -> dict:
+    return {
+        "page_id": page_id,
+        "title": title,
+        "chunk_index": 0,
+        "ancestor_ids": ancestors,
+        "last_edited_time": edited,
+    }
+
+
+DOCS = [
+    Document(
+        page_content="La politique de congés prévoit 25 jours par an.",
+        metadata=_meta("conges", "Congés", ["rh"], "2024-03-01T10:00:00.000Z"),
+    ),
+    Document(
+        page_content="Le support se contacte par email à support@example.com.",
+        metadata=_meta("support", "Support", ["rh"], "2025-06-01T10:00:00.000Z"),
+    ),
+    Document(
+        page_content="La documentation technique est dans le wiki Engineering.",
+        metadata=_meta("doc", "Doc", ["eng"], "2025-09-01T10:00:00.000Z"),
+    ),
+]
+
+
+def build_test_chain(
+    settings: RAGPipelineSettings, llm_sleep: float | None = None
+) -> RAGWithSources:
+    """Chaîne complète sur Qdrant en mémoire, embeddings déterministes et LLM factice."""
+    client = QdrantClient(":memory:")
+    embeddings = DeterministicFakeEmbedding(size=16)
+    hybrid = settings.retrieval_mode == "hybrid"
+    ensure_collection(client, "test", 16, sparse=hybrid)
+    extra = (
+        {"retrieval_mode": RetrievalMode.HYBRID, "sparse_embedding": BM25SparseEmbeddings()}
+        if hybrid
+        else {}
+    )
+    vectorstore = QdrantVectorStore(
+        client=client, collection_name="test", embedding=embeddings, **extra
+    )
+    vectorstore.add_documents(DOCS)
+    retriever = vectorstore.as_retriever(
+        search_type="mmr",
+        search_kwargs={
+            "k": settings.top_n,
+            "fetch_k": settings.top_k,
+            "lambda_mult": settings.mmr_lambda,
+        },
+    )
+    llm = FakeListChatModel(responses=["Réponse de test."], sleep=llm_sleep)
+    return RAGWithSources(
+        retriever=retriever, prompt=get_rag_prompt(), llm=llm, rag_settings=settings
+    )
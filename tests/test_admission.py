@@ -0,0 +1,88 @@
+"""Tests du contrôle d'admission de /chat (slots, file FIFO bornée, délestage)."""
+import asyncio
+
+from api.admission import AdmissionController
+
+
+def test_admits_up_to_limit_then_sheds_when_queue_full():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=2, max_queue=0, max_wait_s=1.0)
+        assert await admission.acquire() is None
+        assert await admission.acquire() is None
+        assert await admission.acquire() == "queue_full"
+        admission.release()
+        assert await admission.acquire() is None
+        return admission.in_flight
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_queued_request_times_out():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, max_wait_s=0.05)
+        await admission.acquire()
+        rejected = await admission.acquire()
+        return rejected, admission.queue_depth, admission.in_flight
+
+    assert asyncio.run(scenario()) == ("timeout", 0, 1)
+
+
+def test_release_hands_slot_to_waiters_in_fifo_order():
+    async def scenario():
+        states = []
+        admission = AdmissionController(
+            max_in_flight=1, max_queue=4, max_wait_s=1.0,
+            on_change=lambda a: states.append((a.in_flight, a.queue_depth)),
+        )
+        await admission.acquire()
+        order = []
+
+        async def waiter(name):
+            assert await admission.acquire() is None
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(n)) for n in ("a", "b")]
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 2
+        admission.release()
+        await asyncio.sleep(0)
+        admission.release()
+        await asyncio.gather(*tasks)
+        admission.release()
+        return order, admission.in_flight, states
+
+    order, in_flight, states = asyncio.run(scenario())
+    assert order == ["a", "b"]
+    assert in_flight == 0
+    assert (1, 2) in states and states[-1] == (0, 0)
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, max_wait_s=1.0)
+        await admission.acquire()
+        task = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        admission.release()
+        return admission.queue_depth, admission.in_flight
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_slot_granted_as_wait_times_out_is_released(monkeypatch):
+    admission = AdmissionController(max_in_flight=1, max_queue=4, max_wait_s=1.0)
+
+    async def racing_wait_for(waiter, timeout):
+        # Slot transmis puis timeout levé quand même (course de wait_for, Python >= 3.12)
+        admission.release()
+        raise asyncio.TimeoutError
+
+    async def scenario():
+        await admission.acquire()
+        monkeypatch.setattr(asyncio, "wait_for", racing_wait_for)
+        rejected = await admission.acquire()
+        return rejected, admission.in_flight, admission.queue_depth
+
+    assert asyncio.run(scenario()) == ("timeout", 0, 0)
@@ -0,0 +1,86 @@
+"""Tests cache de réponses et marqueur de génération d'index (Qdrant local en mémoire)."""
+import pytest
+from qdrant_client import QdrantClient
+
+from api.answer_cache import AnswerCache, normalize_question
+from shared.config import AnswerCacheSettings
+from shared.index_generation import bump_index_generation, read_index_generation
+from shared.schemas import ChatResponse, ChatSource
+
+
+@pytest.fixture
+def client():
+    return QdrantClient(":memory:")
+
+
+@pytest.fixture
+def cache(client):
+    settings = AnswerCacheSettings(similarity_threshold=0.9, generation_refresh_s=0)
+    return AnswerCache(client, "rag_notion", settings)
+
+
+def _response(answer: str = "Oui.") -> ChatResponse:
+    source = ChatSource(page_id="p1", title="Page", url=None, snippet="...")
+    return ChatResponse(answer=answer, sources=[source], rag_version="v1")
+
+
+def test_normalize_question():
+    assert normalize_question("  Quelle est la  POLITIQUE ?  ") == "quelle est la politique"
+
+
+def test_index_generation_bump(client):
+    assert read_index_generation(client, "rag_notion") == 0
+    assert bump_index_generation(client, "rag_notion") == 1
+    assert bump_index_generation(client, "rag_notion") == 2
+    assert read_index_generation(client, "rag_notion") == 2
+
+
+def test_exact_and_similar_hits(cache):
+    cache.put("Quelle est la politique ?", [1.0, 0.0, 0.0], _response())
+    assert cache.get_exact("quelle est la politique", "v1").answer == "Oui."
+    assert cache.get_exact("quelle est la politique", "v2") is None
+    assert cache.get_similar([0.99, 0.05, 0.0], "v1").answer == "Oui."
+    assert cache.get_similar([0.0, 1.0, 0.0], "v1") is None
+
+
+def test_generation_bump_invalidates(client, cache):
+    cache.put("Question", [1.0, 0.0, 0.0], _response())
+    bump_index_generation(client, "rag_notion")
+    assert cache.get_exact("Question", "v1") is None
+    assert cache.get_similar([1.0, 0.0, 0.0], "v1") is None
+
+
+def test_entries_scoped_by_index_collection(client):
+    settings = AnswerCacheSettings(similarity_threshold=0.9, generation_refresh_s=0)
+    rh = AnswerCache(client, "rh", settings)
+    eng = AnswerCache(client, "eng", settings)
+    rh.put("Quelle est la politique ?", [1.0, 0.0, 0.0], _response())
+    assert rh.get_exact("quelle est la politique", "v1") is not None
+    assert eng.get_exact("quelle est la politique", "v1") is None
+    assert eng.get_similar([1.0, 0.0, 0.0], "v1") is None
+
+
+def test_collection_existence_checked_once_and_recreated(client, cache, monkeypatch):
+    calls = 0
+    exists = client.collection_exists
+
+    def counting_exists(name):
+        nonlocal calls
+        # Marqueur de génération d'index (collection méta) : hors du périmètre mesuré
+        calls += name == cache.collection_name
+        return exists(name)
+
+    monkeypatch.setattr(client, "collection_exists", counting_exists)
+    assert cache.get_exact("Question", "v1") is None
+    cache.put("Question", [1.0, 0.0, 0.0], _response())
+    for _ in range(3):
+        assert cache.get_exact("Question", "v1") is not None
+        assert cache.get_similar([1.0, 0.0, 0.0], "v1") is not None
+    # Une vérification au premier lookup, une au premier put (collection alors absente) :
+    # plus aucune ensuite
+    assert calls == 2
+    # Collection supprimée hors de l'instance : lookup raté, puis recréée au put suivant
+    client.delete_collection(cache.collection_name)
+    assert cache.get_exact("Question", "v1") is None
+    cache.put("Question", [1.0, 0.0, 0.0], _response())
+    assert cache.get_exact("Question", "v1") is not None
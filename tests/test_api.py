@@ -0,0 +1,182 @@
+"""Tests API FastAPI avec une chaîne RAG locale (aucun appel réseau)."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as main
+from offline.pipeline import ensure_collection
+from shared.config import RAGPipelineSettings
+from tests.helpers import build_test_chain
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "_rag", None)
+    monkeypatch.setattr(main, "_chains", None)
+    monkeypatch.setattr(main, "_readiness", {"chain": False})
+    monkeypatch.setattr(
+        main, "build_rag_chain", lambda: build_test_chain(RAGPipelineSettings(top_n=2))
+    )
+    monkeypatch.setattr(main._api_settings, "collections", ["test_copy"])
+    # Compteurs slowapi en mémoire, partagés entre tests
+    main.limiter.reset()
+    with TestClient(main.app) as c:
+        yield c
+
+
+def test_ready_after_warmup(client):
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.json()["checks"] == {"chain": True, "qdrant": True, "embeddings": True}
+
+
+def test_not_ready_when_chain_fails(monkeypatch):
+    def failing_build():
+        raise RuntimeError("qdrant unreachable")
+
+    monkeypatch.setattr(main, "_rag", None)
+    monkeypatch.setattr(main, "_readiness", {"chain": False})
+    monkeypatch.setattr(main, "build_rag_chain", failing_build)
+    with TestClient(main.app) as c:
+        assert c.get("/health").status_code == 200
+        assert c.get("/ready").status_code == 503
+
+
+def test_ready_after_warmup_retry(monkeypatch):
+    attempts = []
+
+    def flaky_build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("qdrant unreachable")
+        return build_test_chain(RAGPipelineSettings(top_n=2))
+
+    monkeypatch.setattr(main, "_rag", None)
+    monkeypatch.setattr(main, "_chains", None)
+    monkeypatch.setattr(main, "_readiness", {"chain": False})
+    monkeypatch.setattr(main, "build_rag_chain", flaky_build)
+    monkeypatch.setattr(main._api_settings, "warmup_retry_initial_s", 0.01)
+    with TestClient(main.app) as c:
+        assert c.get("/ready").status_code == 503
+        for _ in range(200):
+            if c.get("/ready").status_code == 200:
+                break
+            time.sleep(0.01)
+        assert c.get("/ready").status_code == 200
+    assert len(attempts) == 2
+
+
+def test_chat(client):
+    resp = client.post("/chat", json={"question": "politique de congés"})
+    assert resp.status_code == 200
+    assert resp.json()["answer"] == "Réponse de test."
+
+
+def test_metrics_expose_stage_histograms(client):
+    client.post("/chat", json={"question": "politique de congés"})
+    body = client.get("/metrics").text
+    assert 'rag_stage_duration_seconds_count{rag_version="v1",stage="llm"}' in body
+    assert "rag_sources_returned_total" in body
+
+
+def test_chat_batch(client):
+    questions = ["politique de congés", "support email", "documentation technique"]
+    resp = client.post("/chat/batch", json={"questions": questions})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert len(results) == 3
+    assert all(r["answer"] == "Réponse de test." for r in results)
+
+
+def test_chat_batch_rejects_empty(client):
+    assert client.post("/chat/batch", json={"questions": []}).status_code == 422
+
+
+def test_chat_with_filters(client):
+    resp = client.post(
+        "/chat", json={"question": "documentation", "filters": {"page_ids": ["support"]}}
+    )
+    assert resp.status_code == 200
+    assert {s["page_id"] for s in resp.json()["sources"]} == {"support"}
+
+
+def test_chat_routes_to_collection(client):
+    base = main.get_rag()
+    ensure_collection(base.vectorstore.client, "test_copy", 16)
+    resp = client.post("/chat", json={"question": "politique de congés", "collection": "test_copy"})
+    assert resp.status_code == 200
+    assert resp.json()["sources"] == []
+    assert main._chains.keys() == ["test_copy"]
+    assert main.get_rag("test_copy").vectorstore.client is base.vectorstore.client
+
+
+@pytest.mark.parametrize("collection", ["autre", "test_copy"])
+def test_chat_unknown_collection(client, collection):
+    # "test_copy" est autorisée mais absente de Qdrant
+    resp = client.post("/chat", json={"question": "politique de congés", "collection": collection})
+    assert resp.status_code == 404
+
+
+def test_chat_session_follow_up(client, monkeypatch):
+    monkeypatch.setattr(main._sessions, "_min_score", -1.0)
+    for _ in range(2):
+        resp = client.post(
+            "/chat", json={"question": "politique de congés", "session_id": "conv-1"}
+        )
+        assert resp.status_code == 200
+    body = client.get("/metrics").text
+    assert 'rag_session_retrievals_total{rag_version="v1",result="reuse"}' in body
+
+
+def test_chat_profiled_by_admin_header(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main._profiling_settings, "admin_token", "secret")
+    monkeypatch.setattr(main._profiling_settings, "dir", str(tmp_path))
+    resp = client.post(
+        "/chat", json={"question": "politique de congés"}, headers={"X-Profile-Token": "wrong"}
+    )
+    assert "X-Profile-Id" not in resp.headers
+    resp = client.post(
+        "/chat", json={"question": "politique de congés"}, headers={"X-Profile-Token": "secret"}
+    )
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+    assert client.get(f"/debug/profiles/{profile_id}").status_code == 403
+    summary = client.get(
+        f"/debug/profiles/{profile_id}", headers={"X-Profile-Token": "secret"}
+    ).json()
+    assert summary["rag_version"] == "v1"
+    assert {"search", "llm"} <= set(summary["stages_ms"])
+    assert summary["top_functions"]
+    pstats_resp = client.get(
+        f"/debug/profiles/{profile_id}/pstats", headers={"X-Profile-Token": "secret"}
+    )
+    assert (
+        pstats_resp.status_code == 200
+        and "attachment" in pstats_resp.headers["content-disposition"]
+    )
+
+
+def test_chat_profile_sampling(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main._profiling_settings, "sample_rate", 1.0)
+    monkeypatch.setattr(main._profiling_settings, "dir", str(tmp_path))
+    monkeypatch.setattr(main._profiling_settings, "max_files", 1)
+    for _ in range(2):
+        resp = client.post("/chat", json={"question": "politique de congés"})
+        # Profil échantillonné : stocké, identifiant non exposé au client
+        assert resp.status_code == 200 and "X-Profile-Id" not in resp.headers
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".json", ".prof"]
+
+
+def test_chat_shed_when_saturated(client, monkeypatch):
+    admission = main.AdmissionController(max_in_flight=1, max_queue=0, max_wait_s=0.05)
+    admission.in_flight = 1
+    monkeypatch.setattr(main, "_admission", admission)
+    resp = client.post("/chat", json={"question": "politique de congés"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(main._api_settings.admission_retry_after_s)
+    # Les autres routes ne sont pas soumises à l'admission
+    assert client.get("/health").status_code == 200
+    admission.in_flight = 0
+    assert client.post("/chat", json={"question": "politique de congés"}).status_code == 200
+    assert 'rag_admission_shed_total{reason="queue_full"}' in client.get("/metrics").text
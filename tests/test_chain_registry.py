@@ -0,0 +1,47 @@
+"""Tests du registre LRU de chaînes par collection."""
+import pytest
+
+from api.chain_registry import ChainRegistry, UnknownCollectionError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_builds_once_then_hits():
+    built: list[str] = []
+    registry = ChainRegistry(lambda key: built.append(key) or f"chain-{key}", max_size=2)
+    assert registry.get("rh") == ("chain-rh", False)
+    assert registry.get("rh") == ("chain-rh", True)
+    assert built == ["rh"]
+
+
+def test_lru_eviction():
+    registry = ChainRegistry(lambda key: key, max_size=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    assert registry.keys() == ["a", "c"]
+
+
+def test_idle_eviction():
+    clock = _Clock()
+    registry = ChainRegistry(lambda key: key, max_size=4, idle_ttl_s=60, clock=clock)
+    registry.get("a")
+    clock.now = 30
+    registry.get("b")
+    clock.now = 75
+    assert registry.get("b") == ("b", True)
+    assert registry.keys() == ["b"]
+
+
+def test_unknown_collection_rejected():
+    registry = ChainRegistry(lambda key: key, max_size=2, allowed={"rh"})
+    with pytest.raises(UnknownCollectionError):
+        registry.get("eng")
+    assert len(registry) == 0
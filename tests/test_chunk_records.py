@@ -0,0 +1,37 @@
+"""Tests des chunks compacts (offsets + métadonnées partagées par page)."""
+from langchain_core.documents import Document
+
+from offline.chunk_records import materialize_batches
+from offline.pipeline import build_text_splitter, prepare_chunk_records, prepare_docs_with_metadata
+from shared.config import RAGPipelineSettings
+
+PAGE = Document(
+    page_content="# Congés\n\n"
+    + " ".join(f"Règle {i} : les congés se posent dans l'outil RH." for i in range(60)),
+    metadata={
+        "page_id": "conges",
+        "title": "Congés",
+        "source_url": "https://notion.so/conges",
+        "ancestor_ids": ["rh"],
+    },
+)
+
+
+def test_chunks_match_langchain_split():
+    splitter = build_text_splitter(RAGPipelineSettings(chunk_size=200, chunk_overlap=40))
+    expected = splitter.split_documents([PAGE])
+    docs = prepare_docs_with_metadata([PAGE], splitter)
+    assert [d.page_content for d in docs] == [d.page_content for d in expected]
+    assert [d.metadata["chunk_index"] for d in docs] == list(range(len(expected)))
+    assert docs[0].metadata["ancestor_ids"] == ["rh"]
+    assert docs[0].metadata["last_edited_time"] is None
+
+
+def test_records_share_page_metadata_and_batch():
+    splitter = build_text_splitter(RAGPipelineSettings(chunk_size=200, chunk_overlap=40))
+    records = prepare_chunk_records([PAGE], splitter)
+    assert len({id(r.page.metadata) for r in records}) == 1
+    assert not hasattr(records[0], "__dict__")
+    batches = list(materialize_batches(records, batch_size=4))
+    assert [len(b) for b in batches[:-1]] == [4] * (len(batches) - 1)
+    assert sum(len(b) for b in batches) == len(records)
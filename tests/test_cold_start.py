@@ -0,0 +1,18 @@
+"""Imports différés : les points d'entrée ne chargent pas les SDK fournisseurs à l'import."""
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    ("module", "deferred"),
+    [
+        ("api.main", ["langchain_cohere", "langchain_mistralai"]),
+        ("offline.run_ingest", ["langchain_cohere", "notion_client", "qdrant_client"]),
+    ],
+)
+def test_entry_point_defers_heavy_imports(module, deferred):
+    code = f"import sys, {module}; print(','.join(m for m in {deferred!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
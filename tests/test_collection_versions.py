@@ -0,0 +1,93 @@
+"""Tests réindexation blue/green : collections versionnées et bascule d'alias (Qdrant local)."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+
+from offline.collection_versions import (
+    LegacyCollectionError,
+    bootstrap_alias,
+    garbage_collect_versions,
+    migrate_to_alias,
+    resolve_alias,
+    swap_alias,
+    versioned_collection_name,
+)
+from offline.pipeline import ensure_collection
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client():
+    return QdrantClient(":memory:")
+
+
+def _version(client: QdrantClient, at: datetime, points: int) -> str:
+    name = versioned_collection_name("rag", at)
+    ensure_collection(client, name, 2)
+    client.upsert(name, points=[qm.PointStruct(id=i, vector=[1.0, 0.0]) for i in range(points)])
+    return name
+
+
+def test_swap_alias_is_blue_green(client):
+    blue = _version(client, T0, points=2)
+    assert swap_alias(client, "rag", blue) is None
+    green = _version(client, T0 + timedelta(hours=1), points=3)
+    assert swap_alias(client, "rag", green) == blue
+    assert resolve_alias(client, "rag") == green
+    # Pas de doublons : l'alias ne voit que la nouvelle génération
+    assert client.count("rag").count == 3
+
+
+def test_swap_alias_refuses_physical_collection(client):
+    ensure_collection(client, "rag", 2)
+    with pytest.raises(LegacyCollectionError):
+        swap_alias(client, "rag", _version(client, T0, points=1))
+    # Index existant intact : l'API continue de le servir
+    assert "rag" in {c.name for c in client.get_collections().collections}
+
+
+def test_bootstrap_alias_creates_version_then_full_reindex_swaps(client):
+    created = bootstrap_alias(client, "rag", lambda name: ensure_collection(client, name, 2))
+    assert resolve_alias(client, "rag") == created
+    assert bootstrap_alias(client, "rag", lambda name: ensure_collection(client, name, 2)) is None
+    # Aucune collection physique au nom de l'alias : la réindexation complète peut basculer
+    green = _version(client, T0, points=1)
+    assert swap_alias(client, "rag", green) == created
+
+
+def test_migrate_to_alias_copies_then_aliases(client):
+    ensure_collection(client, "rag", 2)
+    client.upsert(
+        "rag", points=[qm.PointStruct(id=i, vector=[1.0, 0.0], payload={"i": i}) for i in range(3)]
+    )
+    target = migrate_to_alias(client, "rag", batch_size=2)
+    assert resolve_alias(client, "rag") == target
+    assert client.count("rag").count == 3
+    assert migrate_to_alias(client, "rag") is None
+    green = _version(client, T0, points=1)
+    assert swap_alias(client, "rag", green) == target
+
+
+def test_migrate_to_alias_recovers_missing_alias(client):
+    # Échec précédent entre la suppression de l'original et la création de l'alias
+    older = _version(client, T0, points=1)
+    latest = _version(client, T0 + timedelta(hours=1), points=2)
+    assert migrate_to_alias(client, "rag") == latest != older
+    assert client.count("rag").count == 2
+
+
+def test_garbage_collect_keeps_current_and_recent(client):
+    old = _version(client, T0, points=1)
+    recent = _version(client, T0 + timedelta(hours=20), points=1)
+    current = _version(client, T0 + timedelta(hours=30), points=1)
+    ensure_collection(client, "rag__meta", 1)
+    swap_alias(client, "rag", current)
+    deleted = garbage_collect_versions(
+        client, "rag", timedelta(hours=24), now=T0 + timedelta(hours=30)
+    )
+    assert deleted == [old]
+    remaining = {c.name for c in client.get_collections().collections}
+    assert {recent, current, "rag__meta"} <= remaining
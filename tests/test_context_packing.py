@@ -0,0 +1,48 @@
+"""Tests assemblage du contexte (regroupement par page, chevauchement, budget)."""
+from langchain_core.documents import Document
+
+from api.context_packing import pack_context, strip_overlap
+
+
+def _chunk(page_id: str, index: int, text: str) -> Document:
+    return Document(
+        page_content=text,
+        metadata={"page_id": page_id, "title": page_id.upper(), "chunk_index": index},
+    )
+
+
+def test_strip_overlap():
+    assert (
+        strip_overlap("abc def ghi jkl mno stu", "def ghi jkl mno stu pqr", max_overlap=64)
+        == " pqr"
+    )
+    assert strip_overlap("alpha.", "delta", max_overlap=20) == "\n\ndelta"
+    # Coïncidence courte (« a. » / « a. ») : pas de texte supprimé
+    assert strip_overlap("une idée a.", "a. suite", max_overlap=20) == "\n\na. suite"
+
+
+def test_groups_by_page_orders_chunks_and_merges_adjacent():
+    docs = [
+        _chunk("a", 1, "the second part. tail"),
+        _chunk("b", 0, "other page"),
+        _chunk("a", 0, "first part. the second part."),
+        _chunk("a", 3, "far chunk"),
+    ]
+    context, used = pack_context(docs, max_tokens=1000, max_overlap=64)
+    assert context.count("[Source: A]") == 1
+    assert "first part. the second part. tail\n[…]\nfar chunk" in context
+    assert context.index("[Source: A]") < context.index("[Source: B]")
+    assert len(used) == 4
+
+
+def test_respects_token_budget():
+    docs = [_chunk("a", 0, "x" * 400), _chunk("b", 0, "y" * 400)]
+    context, used = pack_context(docs, max_tokens=120, max_overlap=0)
+    assert len(context) <= 120 * 4
+    assert [d.metadata["page_id"] for d in used] == ["a"]
+
+
+def test_first_chunk_truncated_when_over_budget():
+    context, used = pack_context([_chunk("a", 0, "x" * 2000)], max_tokens=100, max_overlap=0)
+    assert 0 < len(context) <= 400
+    assert len(used) == 1
@@ -0,0 +1,76 @@
+"""Déduplication MinHash/LSH des chunks quasi identiques avant embedding."""
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+
+from offline.dedup import dedup_chunks, near_duplicate_groups
+from offline.pipeline import (
+    build_text_splitter,
+    delete_points_by_page_ids,
+    ensure_collection,
+    pages_sharing_points,
+    prepare_chunk_records,
+)
+from shared.config import RAGPipelineSettings
+from shared.page_index import page_match
+
+TEMPLATE = (
+    "Fiche client. Contexte du compte, interlocuteurs principaux, historique des échanges, "
+    "prochaines étapes et risques identifiés. "
+    "Mettre à jour après chaque rendez-vous avec le client {}."
+)
+
+
+def _row(i: int, ancestor: str) -> Document:
+    return Document(
+        page_content=TEMPLATE.format(f"numéro {i}"),
+        metadata={"page_id": f"row-{i}", "title": f"Client {i}", "ancestor_ids": [ancestor]},
+    )
+
+
+DISTINCT = Document(
+    page_content="La politique de congés prévoit 25 jours ouvrés par an, posés dans l'outil RH.",
+    metadata={"page_id": "conges", "title": "Congés", "ancestor_ids": ["rh"]},
+)
+
+
+def test_groups_template_rows_only():
+    texts = [TEMPLATE.format(i) for i in range(5)] + [DISTINCT.page_content, ""]
+    assert near_duplicate_groups(texts, threshold=0.7) == [[0, 1, 2, 3, 4]]
+
+
+def test_dedup_keeps_one_representative_with_all_pages():
+    docs = [_row(0, "crm"), _row(1, "crm-archive"), _row(2, "crm"), DISTINCT]
+    chunks = prepare_chunk_records(docs, build_text_splitter(RAGPipelineSettings()))
+    kept, stats = dedup_chunks(chunks, threshold=0.7)
+    assert stats == {
+        "chunks_in": 4,
+        "chunks_out": 2,
+        "clusters": 1,
+        "duplicates_removed": 2,
+        "largest_cluster": 3,
+        "pages_in_clusters": 3,
+    }
+    representative = kept[0].to_document()
+    assert representative.metadata["page_id"] == "row-0"
+    assert representative.metadata["page_ids"] == ["row-0", "row-1", "row-2"]
+    assert representative.metadata["ancestor_ids"] == ["crm", "crm-archive"]
+    assert "page_ids" not in kept[1].to_document().metadata
+
+
+def test_shared_point_matched_and_deleted_by_any_page():
+    client = QdrantClient(":memory:")
+    ensure_collection(client, "test", 16)
+    docs = [_row(0, "crm"), _row(1, "crm"), DISTINCT]
+    kept, _ = dedup_chunks(
+        prepare_chunk_records(docs, build_text_splitter(RAGPipelineSettings())), threshold=0.7
+    )
+    vectorstore = QdrantVectorStore(
+        client=client, collection_name="test", embedding=DeterministicFakeEmbedding(size=16)
+    )
+    vectorstore.add_documents([c.to_document() for c in kept])
+    assert client.count("test", count_filter=page_match(["row-1"])).count == 1
+    assert pages_sharing_points(client, "test", ["row-1"]) == {"row-0"}
+    delete_points_by_page_ids(client, "test", ["row-1"])
+    assert client.count("test").count == 1
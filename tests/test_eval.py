@@ -0,0 +1,13 @@
+"""Tests runner d'évaluation (chaîne locale, concurrence bornée)."""
+from eval.run_eval import run_eval
+from shared.config import RAGPipelineSettings
+from tests.helpers import build_test_chain
+
+
+def test_run_eval_records_stage_timings_in_dataset_order():
+    chain = build_test_chain(RAGPipelineSettings(top_n=2))
+    dataset = [{"id": f"q{i}", "question": q} for i, q in enumerate(["congés", "support", "doc"])]
+    dataset.append({"id": "empty", "question": ""})
+    results = run_eval(chain, dataset, concurrency=3)
+    assert [r["id"] for r in results] == ["q0", "q1", "q2"]
+    assert {"embed", "search", "prompt", "llm"} <= set(results[0]["stages_ms"])
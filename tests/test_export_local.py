@@ -0,0 +1,30 @@
+"""Tests export vers un index embarqué (Qdrant local sur disque)."""
+from qdrant_client import QdrantClient
+
+from offline.export_local import export_local_index
+from shared.config import QdrantSettings, RAGPipelineSettings
+from shared.index_generation import bump_index_generation, read_index_generation
+from shared.qdrant import build_qdrant_client
+from tests.helpers import build_test_chain
+
+
+def test_export_then_open_embedded(tmp_path):
+    chain = build_test_chain(RAGPipelineSettings(top_n=3))
+    source: QdrantClient = chain.vectorstore.client
+    bump_index_generation(source, "test")
+    output = str(tmp_path / "qdrant_local")
+
+    assert export_local_index(source, "test", output, batch_size=2) == 3
+    # Réexport : remplace l'index existant
+    assert export_local_index(source, "test", output) == 3
+
+    embedded = build_qdrant_client(QdrantSettings(local_path=output))
+    try:
+        assert embedded.count("test").count == 3
+        assert read_index_generation(embedded, "test") == 1
+        query = chain.embed_query("politique de congés")
+        remote_ids = [p.id for p in source.query_points("test", query=query, limit=3).points]
+        local_ids = [p.id for p in embedded.query_points("test", query=query, limit=3).points]
+        assert local_ids == remote_ids
+    finally:
+        embedded.close()
@@ -0,0 +1,69 @@
+"""Tests du routage LLM (choix du modèle, EWMA de latence)."""
+import pytest
+
+from api.llm_router import FAST, PRIMARY, LatencyEWMA, LLMRouter, ModelRoute
+
+
+def _router(**kwargs) -> LLMRouter:
+    params = {
+        "simple_max_question_chars": 40,
+        "simple_max_context_tokens": 100,
+        "ewma_alpha": 0.5,
+        **kwargs,
+    }
+    return LLMRouter(
+        primary=ModelRoute(PRIMARY, "mistral-large-latest", object(), 1024),
+        fast=ModelRoute(FAST, "ministral-8b-latest", object(), 256),
+        **params,
+    )
+
+
+def test_ewma_first_observation_then_smoothing():
+    ewma = LatencyEWMA(alpha=0.5)
+    assert ewma.get(PRIMARY) is None
+    ewma.observe(PRIMARY, 1000)
+    ewma.observe(PRIMARY, 2000)
+    assert ewma.get(PRIMARY) == pytest.approx(1500)
+
+
+@pytest.mark.parametrize(
+    "question, context_tokens, expected",
+    [
+        ("Qui valide les congés ?", 50, (FAST, "simple")),
+        ("Qui valide les congés ?", 500, (PRIMARY, "complex")),
+        (
+            "Comparer les politiques de congés et de télétravail des deux entités",
+            50,
+            (PRIMARY, "complex"),
+        ),
+    ],
+)
+def test_choose_by_question_and_context(question, context_tokens, expected):
+    route, reason = _router().choose(question, context_tokens, budget_ms=None)
+    assert (route.name, reason) == expected
+
+
+def test_slow_primary_routed_to_fast_model_within_budget():
+    router = _router()
+    question = "Comparer les politiques de congés et de télétravail des deux entités"
+    router.latency.observe(PRIMARY, 5000)
+    assert router.choose(question, 500, budget_ms=None)[1] == "complex"
+    assert router.choose(question, 500, budget_ms=8000)[1] == "complex"
+    route, reason = router.choose(question, 500, budget_ms=3000)
+    assert (route.name, reason) == (FAST, "latency")
+    # Modèle rapide encore plus lent : rester sur le principal
+    router.latency.observe(FAST, 6000)
+    assert router.choose(question, 500, budget_ms=3000)[0].name == PRIMARY
+
+
+def test_timed_records_latency_even_on_error():
+    router = _router()
+
+    def failing():
+        raise RuntimeError("mistral indisponible")
+
+    with pytest.raises(RuntimeError):
+        router.timed(router.routes[FAST], failing)()
+    assert router.latency.get(FAST) is not None
+    assert router.timed(router.routes[PRIMARY], lambda: 42)() == 42
+    assert router.latency.get(PRIMARY) is not None
@@ -0,0 +1,48 @@
+"""Stubs du load test : formats de réponse compatibles avec les clients Cohere / Mistral."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from bench import provider_stubs
+from bench.provider_stubs import EMBED_DIM, app, embed_text
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    for name in ("EMBED_LATENCY_S", "RERANK_LATENCY_S", "LLM_TTFT_S", "LLM_TOKEN_S"):
+        monkeypatch.setattr(provider_stubs, name, 0.0)
+    return TestClient(app)
+
+
+def test_embed_text_is_deterministic_and_normalized():
+    vector = embed_text("politique de congés")
+    assert vector == embed_text("politique de congés")
+    assert len(vector) == EMBED_DIM
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_embed_by_type(stubs):
+    body = stubs.post("/v1/embed", json={"texts": ["a", "b"], "embedding_types": ["float"]}).json()
+    assert body["response_type"] == "embeddings_by_type"
+    assert len(body["embeddings"]["float"]) == 2
+
+
+def test_rerank_orders_by_overlap(stubs):
+    body = stubs.post(
+        "/v2/rerank",
+        json={
+            "query": "congés payés",
+            "documents": ["support", "congés payés annuels"],
+            "top_n": 1,
+        },
+    ).json()
+    assert body["results"] == [{"index": 1, "relevance_score": 1.0}]
+
+
+def test_chat_completion_respects_max_tokens(stubs):
+    body = stubs.post(
+        "/v1/chat/completions",
+        json={"model": "m", "messages": [{"role": "user", "content": "q"}], "max_tokens": 3},
+    ).json()
+    assert body["usage"]["completion_tokens"] == 3
+    assert body["choices"][0]["message"]["content"] == "réponse réponse réponse"
@@ -0,0 +1,155 @@
+"""Tests du régulateur Notion : Retry-After, AIMD, token bucket (sans appel réseau)."""
+import asyncio
+import time
+
+import httpx
+import pytest
+from notion_client.errors import APIResponseError
+
+from offline.notion_governor import GovernedAsyncClient, NotionRateGovernor, map_bounded
+from shared.config import NotionRateSettings
+
+
+def _error(status: int, retry_after: str | None = None) -> APIResponseError:
+    headers = httpx.Headers({"retry-after": retry_after} if retry_after else {})
+    return APIResponseError(
+        "rate_limited" if status == 429 else "object_not_found", status, "err", headers, ""
+    )
+
+
+def _governor(**overrides) -> NotionRateGovernor:
+    settings = {"requests_per_second": 1000.0, "burst": 1000, "max_backoff_s": 0.05, **overrides}
+    return NotionRateGovernor(NotionRateSettings(**settings))
+
+
+def _flaky(errors: list[Exception], result: str = "ok"):
+    async def call() -> str:
+        if errors:
+            raise errors.pop(0)
+        return result
+    return call
+
+
+def test_retries_throttled_call_after_retry_after():
+    governor = _governor(initial_concurrency=4)
+    start = time.perf_counter()
+    assert asyncio.run(governor.call(_flaky([_error(429, retry_after="0.05")]))) == "ok"
+    assert time.perf_counter() - start >= 0.05
+    assert governor.stats()["throttled"] == 1
+    # Décroissance multiplicative sur 429
+    assert governor.concurrency_limit == 2
+
+
+def test_non_transient_error_is_not_retried():
+    governor = _governor()
+    with pytest.raises(APIResponseError):
+        asyncio.run(governor.call(_flaky([_error(404), _error(404)])))
+    assert governor.retries == 0
+
+
+def test_gives_up_after_max_retries():
+    governor = _governor(max_retries=2)
+    with pytest.raises(APIResponseError):
+        asyncio.run(governor.call(_flaky([_error(503)] * 5)))
+    assert governor.retries == 2
+
+
+def test_additive_increase_up_to_max():
+    governor = _governor(initial_concurrency=1, max_concurrency=3)
+
+    async def run() -> None:
+        for _ in range(20):
+            await governor.call(_flaky([]))
+
+    asyncio.run(run())
+    assert governor.concurrency_limit == 3
+
+
+def test_token_bucket_bounds_rate():
+    governor = _governor(requests_per_second=50.0, burst=1, initial_concurrency=10)
+
+    async def run() -> None:
+        await asyncio.gather(*(governor.call(_flaky([])) for _ in range(6)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - start >= 5 / 50 * 0.9
+
+
+def test_governed_client_retries_http_429():
+    responses = [
+        httpx.Response(
+            429,
+            headers={"retry-after": "0"},
+            json={"object": "error", "code": "rate_limited", "message": "slow down"},
+        ),
+        httpx.Response(200, json={"object": "page", "id": "p1"}),
+    ]
+    transport = httpx.MockTransport(lambda request: responses.pop(0))
+    governor = _governor()
+    client = GovernedAsyncClient(
+        governor, auth="secret", client=httpx.AsyncClient(transport=transport)
+    )
+    page = asyncio.run(client.pages.retrieve(page_id="p1"))
+    assert page["id"] == "p1"
+    assert governor.stats()["throttled"] == 1
+
+
+def test_waiters_woken_on_release_without_polling(monkeypatch):
+    governor = _governor(initial_concurrency=2, max_concurrency=2)
+    active = peak = 0
+    sleeps = 0
+    real_sleep = asyncio.sleep
+
+    async def counting_sleep(delay, *args, **kwargs):
+        nonlocal sleeps
+        sleeps += 1
+        return await real_sleep(delay, *args, **kwargs)
+
+    async def call() -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await real_sleep(0.01)
+        active -= 1
+
+    async def run() -> None:
+        await asyncio.gather(*(governor.call(call) for _ in range(8)))
+
+    monkeypatch.setattr(asyncio, "sleep", counting_sleep)
+    asyncio.run(run())
+    assert peak == 2
+    # Les appels bloqués par la concurrence attendent leur réveil, sans asyncio.sleep de scrutation
+    assert sleeps == 0
+    assert governor.requests == 8
+
+
+def test_map_bounded_limits_workers_and_keeps_order():
+    active = peak = 0
+
+    async def double(x: int) -> int:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return 2 * x
+
+    assert asyncio.run(map_bounded(double, list(range(20)), limit=3)) == [2 * x for x in range(20)]
+    assert peak == 3
+
+
+def test_cancelled_call_releases_its_slot():
+    governor = _governor(initial_concurrency=1, max_concurrency=1)
+
+    async def hang() -> None:
+        await asyncio.sleep(10)
+
+    async def run() -> str:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(governor.call(hang), 0.01)
+        # Sans place rendue, cet appel attendrait indéfiniment
+        return await asyncio.wait_for(governor.call(_flaky([])), 1)
+
+    assert asyncio.run(run()) == "ok"
+    assert governor.concurrency_limit == 1
@@ -0,0 +1,21 @@
+import math
+
+import pytest
+
+from api.rerank_policy import RerankPolicy, normalized_entropy, top1_margin
+
+
+def test_margin_and_entropy():
+    assert top1_margin([0.5, 0.9, 0.7]) == 0.9 - 0.7
+    assert math.isinf(top1_margin([0.8]))
+    assert normalized_entropy([0.6, 0.6, 0.6]) == pytest.approx(1.0)
+    assert normalized_entropy([0.9, 0.4, 0.3]) < 0.05
+
+
+def test_policy_skips_only_peaked_distributions():
+    policy = RerankPolicy(min_margin=0.1, max_entropy=0.5, score_window=8)
+    assert policy.should_skip([0.9, 0.6, 0.55, 0.5])
+    # Marge insuffisante : candidats ex aequo en tête
+    assert not policy.should_skip([0.9, 0.88, 0.5])
+    # Aucun candidat : rien à décider, rerank (no-op)
+    assert not policy.should_skip([])
@@ -0,0 +1,38 @@
+"""Tests du contexte de session (working set de chunks, LRU / TTL)."""
+from langchain_core.documents import Document
+
+from api.session_store import SessionStore, WorkingSet
+
+
+def _doc(point_id: int) -> Document:
+    return Document(page_content=f"chunk {point_id}", metadata={"_id": point_id})
+
+
+def test_match_returns_closest_above_threshold():
+    ws = WorkingSet(max_chunks=10, min_score=0.8)
+    ws.add([_doc(1), _doc(2)], [[1.0, 0.0], [0.0, 1.0]])
+    assert [d.metadata["_id"] for d in ws.match([0.9, 0.1], k=2)] == [1, 2]
+    assert ws.match([0.7, 0.7], k=2) is None
+
+
+def test_working_set_is_bounded_and_deduplicated():
+    ws = WorkingSet(max_chunks=2, min_score=0.0)
+    ws.add([_doc(1), _doc(2)], [[1.0, 0.0], [0.0, 1.0]])
+    ws.add([_doc(1), _doc(3)], [[1.0, 0.0], [1.0, 1.0]])
+    assert len(ws) == 2
+    assert {d.metadata["_id"] for d in ws.match([1.0, 0.0], k=5)} == {1, 3}
+
+
+def test_sessions_lru_and_ttl():
+    now = [0.0]
+    store = SessionStore(
+        max_sessions=2, ttl_s=60, max_chunks=5, min_score=0.5, clock=lambda: now[0]
+    )
+    a = store.get("a")
+    store.get("b")
+    assert store.get("a") is a
+    store.get("c")
+    assert len(store) == 2
+    now[0] = 100
+    assert store.get("a") is not a
+    assert len(store) == 1
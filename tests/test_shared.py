@@ -1,5 +1,6 @@
 """Tests unitaires shared (config, schémas)."""
 from shared.config import RAGPipelineSettings
+from shared.latency import percentile, summarize
 from shared.schemas import ChatSource, ChatResponse
 
 
@@ -20,3 +21,11 @@ def test_chat_source_schema():
     s = ChatSource(page_id="abc", title="Page", url="https://notion.so/abc", snippet="Extrait...")
     assert s.page_id == "abc"
     assert s.title == "Page"
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.5
+    assert percentile([], 95) == 0.0
+    assert summarize([10.0, 20.0])["mean"] == 15.0
+
@@ -0,0 +1,49 @@
+"""Tests single-flight (coalescence des appels concurrents identiques)."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def slow() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.2)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.do, "q", slow)
+        started.wait()
+        followers = [pool.submit(flight.do, "q", slow) for _ in range(4)]
+        results = [leader.result()] + [f.result() for f in followers]
+    assert calls == 1
+    assert [r for r, _ in results] == [42] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert flight.in_flight() == 0
+
+
+def test_error_propagates_to_followers():
+    flight: SingleFlight[int] = SingleFlight()
+    started = threading.Event()
+
+    def failing() -> int:
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "q", failing)
+        started.wait()
+        follower = pool.submit(flight.do, "q", failing)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()